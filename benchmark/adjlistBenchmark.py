@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This script measures the throughput of the adjacency list parser on a
+synthetic RMG species dictionary. The dictionary contains randomly generated
+acyclic and monocyclic C/O species with explicit hydrogen atoms, in the same
+format read by :func:`rmgpy.chemkin.loadSpeciesDictionary`. The dictionary is
+parsed once with the parse cache disabled, once to fill the cache, and once
+more to read it back from the cache.
+"""
+
+import os.path
+import random
+import tempfile
+import time
+
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.molecule.adjlist import fromAdjacencyList, _adjlist_cache
+
+################################################################################
+
+def generateSpeciesDictionary(path, count, seed=0):
+    """
+    Write a species dictionary containing `count` random species to the file
+    at `path`.
+    """
+    random.seed(seed)
+    with open(path, 'w') as f:
+        for index in range(count):
+            # Build a random tree of heavy atoms, with no O-O bonds
+            numAtoms = random.randint(1, 12)
+            elements = ['C'] + [random.choice('CCCO') for i in range(numAtoms - 1)]
+            radicals = [0] * numAtoms
+            bonds = {}
+            for i in range(1, numAtoms):
+                candidates = [j for j in range(i) if not (elements[i] == 'O' and elements[j] == 'O')]
+                bonds[i] = random.choice(candidates)
+            # Close a ring some of the time
+            ring = None
+            if numAtoms >= 5 and random.random() < 0.25:
+                if elements[0] == 'C' and elements[numAtoms - 1] == 'C' and bonds[numAtoms - 1] != 0:
+                    ring = (0, numAtoms - 1)
+            if random.random() < 0.5:
+                radicals[random.choice([i for i in range(numAtoms) if elements[i] == 'C'])] = 1
+            lines = []
+            for i in range(numAtoms):
+                neighbors = [j for j in range(numAtoms) if bonds.get(j) == i or bonds.get(i) == j]
+                if ring and i in ring:
+                    neighbors.append(ring[1] if i == ring[0] else ring[0])
+                lines.append('{0} {1} {2} 0 {3}'.format(i + 1, elements[i], radicals[i],
+                    ' '.join(['{{{0},S}}'.format(j + 1) for j in sorted(neighbors)])))
+            molecule = Molecule().fromAdjacencyList('\n'.join(lines), saturateH=True)
+            f.write(molecule.toAdjacencyList(label='S{0:d}'.format(index + 1)))
+            f.write('\n')
+
+def readAdjacencyLists(path):
+    """
+    Return the list of adjacency lists in the species dictionary at `path`,
+    split in the same way as :func:`rmgpy.chemkin.loadSpeciesDictionary`.
+    """
+    adjlists = []
+    with open(path, 'r') as f:
+        adjlist = ''
+        for line in f:
+            if line.strip() == '' and adjlist.strip() != '':
+                adjlists.append(adjlist)
+                adjlist = ''
+            else:
+                adjlist += line
+    if adjlist.strip() != '':
+        adjlists.append(adjlist)
+    return adjlists
+
+def timeParse(label, adjlists, function):
+    """
+    Call `function` on each of `adjlists` and print the throughput.
+    """
+    t0 = time.time()
+    for adjlist in adjlists:
+        function(adjlist)
+    t = time.time() - t0
+    print '{0:<45} {1:8.3f} s {2:10.0f} species/s'.format(label, t, len(adjlists) / t)
+
+def runBenchmark(count):
+    """
+    Generate a species dictionary with `count` species and time parsing it.
+    """
+    path = os.path.join(tempfile.mkdtemp(), 'species_dictionary.txt')
+    generateSpeciesDictionary(path, count)
+    adjlists = readAdjacencyLists(path)
+    print 'Parsing {0:d} species from {1}'.format(len(adjlists), path)
+
+    timeParse('fromAdjacencyList (no cache)', adjlists, lambda adjlist: fromAdjacencyList(adjlist, useCache=False))
+    _adjlist_cache.clear()
+    timeParse('fromAdjacencyList (filling cache)', adjlists, fromAdjacencyList)
+    timeParse('fromAdjacencyList (cached)', adjlists, fromAdjacencyList)
+    _adjlist_cache.clear()
+    timeParse('Molecule.fromAdjacencyList (filling cache)', adjlists, lambda adjlist: Molecule().fromAdjacencyList(adjlist))
+    timeParse('Molecule.fromAdjacencyList (cached)', adjlists, lambda adjlist: Molecule().fromAdjacencyList(adjlist))
+
+################################################################################
+
+if __name__ == '__main__':
+
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmark the RMG adjacency list parser.')
+    parser.add_argument('-n', '--species', metavar='N', type=int, default=10000,
+        help='the number of species in the dictionary (default 10000)')
+    args = parser.parse_args()
+
+    runBenchmark(args.species)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This script measures the speed of the VF2 graph isomorphism algorithm on a set
+of molecules like those used in the unit tests, plus some larger and more
+symmetric hydrocarbons: n-alkanes, highly branched alkanes, and cycloalkanes
+with up to 20 carbon atoms. Each molecule is compared to a copy of itself with
+its atoms shuffled and to its isomers, and several functional groups are
+matched against it. Run the script on two revisions of RMG to compare the
+implementations.
+"""
+
+import random
+import time
+
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.molecule.group import Group
+from rmgpy.molecule.vf2 import VF2
+
+################################################################################
+
+# Molecules taken from the unit tests
+unitTestAdjacencyLists = [
+    # 1-methylallyl radical
+    """
+    1 C 1 0 {2,S} {4,S}
+    2 C 0 0 {1,S} {3,D}
+    3 C 0 0 {2,D}
+    4 C 0 0 {1,S}
+    """,
+    # Ethylperoxy radical
+    """
+    1 C 0 0 {2,S}
+    2 C 0 0 {1,S} {3,S}
+    3 O 0 0 {2,S} {4,S}
+    4 O 1 0 {3,S}
+    """,
+    # Acetaldehyde
+    """
+    1 C 0 0 {2,S}
+    2 C 0 0 {1,S} {3,D}
+    3 O 0 0 {2,D}
+    """,
+    # Benzene
+    """
+    1 C 0 0 {2,B} {6,B}
+    2 C 0 0 {1,B} {3,B}
+    3 C 0 0 {2,B} {4,B}
+    4 C 0 0 {3,B} {5,B}
+    5 C 0 0 {4,B} {6,B}
+    6 C 0 0 {5,B} {1,B}
+    """,
+    # Cyclohexane
+    """
+    1 C 0 0 {2,S} {6,S}
+    2 C 0 0 {1,S} {3,S}
+    3 C 0 0 {2,S} {4,S}
+    4 C 0 0 {3,S} {5,S}
+    5 C 0 0 {4,S} {6,S}
+    6 C 0 0 {5,S} {1,S}
+    """,
+]
+
+# Functional groups to match against the molecules
+groupAdjacencyLists = [
+    """
+    1 *1 C 0 0 {2,S}
+    2 *2 C 0 0 {1,S}
+    """,
+    """
+    1 *1 C 0 0 {2,S} {3,S}
+    2 *2 H 0 0 {1,S}
+    3    C 0 0 {1,S}
+    """,
+    """
+    1 *1 R!H 1 0 {2,S}
+    2    R!H 0 0 {1,S}
+    """,
+]
+
+def buildMolecule(bonds, count):
+    """
+    Return a saturated hydrocarbon with `count` carbon atoms, joined by the
+    single bonds in the list of index pairs `bonds`.
+    """
+    lines = []
+    for i in range(count):
+        neighbors = sorted([b for a, b in bonds if a == i] + [a for a, b in bonds if b == i])
+        lines.append('{0} C 0 0 {1}'.format(i + 1, ' '.join(['{{{0},S}}'.format(j + 1) for j in neighbors])))
+    return Molecule().fromAdjacencyList('\n'.join(lines), saturateH=True)
+
+def getAlkane(count):
+    """
+    Return the n-alkane with `count` carbon atoms.
+    """
+    return buildMolecule([(i, i + 1) for i in range(count - 1)], count)
+
+def getCycloalkane(count):
+    """
+    Return the cycloalkane with `count` carbon atoms.
+    """
+    return buildMolecule([(i, i + 1) for i in range(count - 1)] + [(0, count - 1)], count)
+
+def getBranchedAlkane(levels):
+    """
+    Return the highly branched alkane made by replacing every hydrogen atom of
+    methane with a methyl group, `levels` times. Also return the isomer made
+    by moving one of the outermost methyl groups.
+    """
+    bonds = []
+    leaves = [0]
+    count = 1
+    for level in range(levels):
+        newLeaves = []
+        for leaf in leaves:
+            for i in range(4 if leaf == 0 else 3):
+                bonds.append((leaf, count))
+                newLeaves.append(count)
+                count += 1
+        leaves = newLeaves
+    isomerBonds = bonds[:-1] + [(bonds[-1][1] - 1, bonds[-1][1])]
+    return buildMolecule(bonds, count), buildMolecule(isomerBonds, count)
+
+def shuffleMolecule(molecule, seed):
+    """
+    Return a copy of `molecule` with its atoms in a random order.
+    """
+    molecule = molecule.copy(deep=True)
+    random.seed(seed)
+    random.shuffle(molecule.vertices)
+    return molecule
+
+def getTestCases():
+    """
+    Return a list of (name, molecule, isomers) tuples to use in the benchmark.
+    """
+    cases = []
+    for index, adjlist in enumerate(unitTestAdjacencyLists):
+        molecule = Molecule().fromAdjacencyList(adjlist, saturateH=True)
+        cases.append(('unit test molecule {0:d}'.format(index + 1), molecule, []))
+    for count in [5, 10, 15, 20]:
+        alkane = getAlkane(count)
+        cycloalkane = getCycloalkane(count)
+        isomer = buildMolecule([(i, i + 1) for i in range(count - 2)] + [(1, count - 1)], count)
+        cases.append(('n-C{0:d}H{1:d}'.format(count, 2 * count + 2), alkane, [isomer]))
+        cases.append(('cyclo-C{0:d}H{1:d}'.format(count, 2 * count), cycloalkane, []))
+    for levels in [2, 3]:
+        molecule, isomer = getBranchedAlkane(levels)
+        count = len([atom for atom in molecule.vertices if atom.isCarbon()])
+        cases.append(('branched C{0:d}H{1:d}'.format(count, 2 * count + 2), molecule, [isomer]))
+    return cases
+
+def timeFunction(function, repeat):
+    """
+    Call `function` `repeat` times and return the average time per call in
+    milliseconds.
+    """
+    t0 = time.time()
+    for i in range(repeat):
+        function()
+    return (time.time() - t0) / repeat * 1000.
+
+def runBenchmark(repeat):
+    """
+    Time each of the isomorphism functions of :class:`VF2` on each test case,
+    repeating each call `repeat` times.
+    """
+    vf2 = VF2()
+    groups = [Group().fromAdjacencyList(adjlist) for adjlist in groupAdjacencyLists]
+    total = {}
+
+    print '{0:<24} {1:>10} {2:>10} {3:>10} {4:>10} {5:>10}'.format('Molecule', 'iso (ms)', 'noniso', 'findIso', 'subgraph', 'findSub')
+    for name, molecule, isomers in getTestCases():
+        shuffled = shuffleMolecule(molecule, 0)
+        times = [
+            timeFunction(lambda: vf2.isIsomorphic(molecule, shuffled, None), repeat),
+            timeFunction(lambda: [vf2.isIsomorphic(molecule, isomer, None) for isomer in isomers], repeat),
+            # Enumerating all automorphisms is only feasible for small molecules
+            timeFunction(lambda: vf2.findIsomorphism(molecule, shuffled, None), repeat) if len(molecule.vertices) <= 20 else 0.0,
+            timeFunction(lambda: [vf2.isSubgraphIsomorphic(molecule, group, None) for group in groups], repeat),
+            timeFunction(lambda: [vf2.findSubgraphIsomorphisms(molecule, group, None) for group in groups], repeat),
+        ]
+        for i, t in enumerate(times):
+            total[i] = total.get(i, 0.0) + t
+        print '{0:<24} {1:10.3f} {2:10.3f} {3:10.3f} {4:10.3f} {5:10.3f}'.format(name, *times)
+    print '{0:<24} {1:10.3f} {2:10.3f} {3:10.3f} {4:10.3f} {5:10.3f}'.format('Total', *[total[i] for i in range(5)])
+
+################################################################################
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the RMG graph isomorphism algorithm.')
+    parser.add_argument('-n', '--repeat', metavar='N', type=int, default=20,
+        help='the number of times to repeat each comparison (default 20)')
+    args = parser.parse_args()
+
+    runBenchmark(args.repeat)
@@ -1,36 +1,287 @@
 """
-This scripts runs tests on the database 
+This scripts runs tests on the database
+
+The kinetics families, thermo group trees, and thermo and kinetics libraries
+are each loaded and checked on their own, optionally using a pool of worker
+processes, and the problems found are collected into a single report in
+database.log. The components to check can be selected by name, and the
+components whose source files are unchanged since they last passed the checks
+can be skipped.
 """
 import os.path
 import logging
+import hashlib
 
 from rmgpy import settings
-from rmgpy.data.rmg import RMGDatabase
-
-def checkFamilies(FullDatabase):
-    databaseLog=logging.getLogger('databaseLog')
-    familyStatus={}
-    for family in FullDatabase.kinetics.families:
-        databaseLog.error('\nChecking ' + family + "...")
-        print 'Checking ' + family + "..."
-        familyStatus[family]=FullDatabase.kinetics.families[family].checkWellFormed()
-    
+from rmgpy.data.base import DatabaseError
+
+################################################################################
+
+class _MessageCollector(logging.Handler):
+    """
+    A logging handler that collects the messages it receives in a list.
+    """
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+def getCheckTasks(databaseDirectory, families=None, groups=None, libraries=None):
+    """
+    Return a list of the components of the database in `databaseDirectory`
+    (RMG-database/input) to check, as ``(name, kind, path)`` tuples. If none
+    of the lists of `families`, thermo `groups`, or thermo and kinetics
+    `libraries` labels are given, every component is checked; otherwise only
+    the selected ones are.
+    """
+    selected = families is not None or groups is not None or libraries is not None
+    tasks = []
+
+    path = os.path.join(databaseDirectory, 'kinetics', 'families')
+    for label in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+        if not label.startswith('.') and os.path.isdir(os.path.join(path, label)):
+            if not selected or (families is not None and label in families):
+                tasks.append(('kinetics/families/' + label, 'family', os.path.join(path, label)))
+
+    path = os.path.join(databaseDirectory, 'thermo', 'groups')
+    for f in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+        label, ext = os.path.splitext(f)
+        if ext.lower() == '.py':
+            if not selected or (groups is not None and label in groups):
+                tasks.append(('thermo/groups/' + label, 'thermo groups', os.path.join(path, f)))
+
+    for kind, component in [('thermo library', 'thermo'), ('kinetics library', 'kinetics')]:
+        path = os.path.join(databaseDirectory, component, 'libraries')
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for f in sorted(files):
+                if os.path.splitext(f)[1].lower() != '.py':
+                    continue
+                label = os.path.relpath(os.path.join(root, f), path)[:-3]
+                if not selected or (libraries is not None and label in libraries):
+                    tasks.append(('{0}/libraries/{1}'.format(component, label), kind, os.path.join(root, f)))
+
+    if selected:
+        names = set([name.split('/', 2)[2] for name, kind, path in tasks])
+        for label in (families or []) + (groups or []) + (libraries or []):
+            if label not in names:
+                logging.warning('No database component named {0} was found.'.format(label))
+
+    return tasks
+
+def getSourceHash(path):
+    """
+    Return a hash of the contents of the file at `path` on disk, or of all of
+    the files in the directory at `path`.
+    """
+    if os.path.isdir(path):
+        paths = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted([d for d in dirs if not d.startswith('.')])
+            paths.extend([os.path.join(root, f) for f in sorted(files) if not f.startswith('.') and not f.endswith('.pyc')])
+    else:
+        paths = [path]
+    sourceHash = hashlib.md5()
+    for filePath in paths:
+        with open(filePath, 'rb') as f:
+            sourceHash.update('{0}\0{1}\0'.format(os.path.relpath(filePath, path), hashlib.md5(f.read()).hexdigest()))
+    return sourceHash.hexdigest()
+
+def readBaseline(path):
+    """
+    Read the baseline file at `path` on disk, returning a dict of the source
+    hashes of the components that last passed the checks.
+    """
+    baseline = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    sourceHash, name = line.rstrip('\n').split(' ', 1)
+                    baseline[name] = sourceHash
+    return baseline
+
+def saveBaseline(path, baseline):
+    """
+    Save the dict `baseline` of the source hashes of the components that
+    passed the checks to the file at `path` on disk.
+    """
+    with open(path, 'w') as f:
+        for name in sorted(baseline):
+            f.write('{0} {1}\n'.format(baseline[name], name))
+
+def checkGroupTree(label, groups):
+    """
+    Check that each node of the `groups` database with the given `label` is in
+    the tree with proper parents, logging any problems to the 'databaseLog'
+    logger.
+    """
+    databaseLog = logging.getLogger('databaseLog')
+    for nodeName, nodeGroup in groups.entries.iteritems():
+        ascendParent = nodeGroup
+        while ascendParent not in groups.top:
+            child = ascendParent
+            ascendParent = ascendParent.parent
+            if ascendParent is None or child not in ascendParent.children:
+                databaseLog.error("Node {0} in {1} groups was found in the tree without a proper parent.".format(nodeName, label))
+                break
+
+def checkThermoLibrary(library):
+    """
+    Check that each entry of the thermo `library` has thermo data, logging
+    any problems to the 'databaseLog' logger. (Entries with the same
+    structure are already rejected when the library is loaded.)
+    """
+    databaseLog = logging.getLogger('databaseLog')
+    for entry in library.entries.values():
+        if entry.data is None:
+            databaseLog.error("Entry {0} in thermo library {1} has no thermo data.".format(entry.label, library.label))
+
+def checkKineticsLibrary(library):
+    """
+    Check that each reaction of the kinetics `library` is balanced and that
+    duplicate reactions are marked, logging any problems to the 'databaseLog'
+    logger.
+    """
+    databaseLog = logging.getLogger('databaseLog')
+    for entry in library.entries.values():
+        if not entry.item.isBalanced():
+            databaseLog.error("Reaction {0} in kinetics library {1} is not balanced.".format(entry.item, library.label))
+    try:
+        library.checkForDuplicates()
+    except DatabaseError, e:
+        databaseLog.error(str(e))
+
+def _checkComponent(args):
+    """
+    Load and check a component of the database, where `args` is a tuple
+    ``(name, kind, path)`` as returned by :func:`getCheckTasks`. Returns the
+    list of problems found. Used by :func:`checkDatabase` as the task run by
+    each worker process.
+    """
+    from rmgpy.data.thermo import ThermoDatabase, ThermoGroups, ThermoLibrary
+    from rmgpy.data.kinetics import KineticsDatabase, KineticsFamily, KineticsLibrary
+
+    name, kind, path = args
+    label = name.split('/', 2)[2]
+    databaseLog = logging.getLogger('databaseLog')
+    collector = _MessageCollector()
+    databaseLog.addHandler(collector)
+    try:
+        if kind == 'family':
+            database = KineticsDatabase()
+            family = KineticsFamily(label=label)
+            family.load(path, database.local_context, database.global_context)
+            family.checkWellFormed()
+        elif kind == 'thermo groups':
+            database = ThermoDatabase()
+            groups = ThermoGroups(label=label).load(path, database.local_context, database.global_context)
+            checkGroupTree(label, groups)
+        elif kind == 'thermo library':
+            database = ThermoDatabase()
+            library = ThermoLibrary(label=label)
+            library.load(path, database.local_context, database.global_context)
+            library.label = label
+            checkThermoLibrary(library)
+        elif kind == 'kinetics library':
+            database = KineticsDatabase()
+            library = KineticsLibrary(label=label)
+            library.load(path, database.local_context, database.global_context)
+            checkKineticsLibrary(library)
+    except Exception, e:
+        databaseLog.error('Unable to load and check {0}: {1}: {2}'.format(name, e.__class__.__name__, e))
+    finally:
+        databaseLog.removeHandler(collector)
+    return collector.messages
+
+def checkDatabase(databaseDirectory, logPath, families=None, groups=None, libraries=None, processes=1, baselinePath=None, changed=False):
+    """
+    Check the components of the database in `databaseDirectory` selected by
+    the lists of `families`, thermo `groups`, and `libraries` labels (see
+    :func:`getCheckTasks`) using `processes` worker processes, and write a
+    report of the problems found to `logPath`. If a `baselinePath` is given,
+    the source hashes of the components that pass are recorded there, and if
+    `changed` is ``True``, the components that are unchanged since they last
+    passed are skipped. Returns the number of components with problems.
+    """
+    tasks = getCheckTasks(databaseDirectory, families, groups, libraries)
+    baseline = readBaseline(baselinePath) if baselinePath else {}
+    hashes = dict([(name, getSourceHash(path)) for name, kind, path in tasks])
+    if changed:
+        count = len(tasks)
+        tasks = [task for task in tasks if baseline.get(task[0]) != hashes[task[0]]]
+        print 'Skipping {0:d} unchanged components.'.format(count - len(tasks))
+
+    if processes > 1 and len(tasks) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_checkComponent, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(_checkComponent, tasks)
+
+    failed = []
+    with open(logPath, 'w') as f:
+        for (name, kind, path), messages in zip(tasks, results):
+            f.write('\nChecking {0}...\n'.format(name))
+            for message in messages:
+                f.write(message + '\n')
+            if messages:
+                failed.append(name)
+                baseline.pop(name, None)
+            else:
+                baseline[name] = hashes[name]
+        f.write('\nChecked {0:d} components; {1:d} had problems.\n'.format(len(tasks), len(failed)))
+        for name in failed:
+            f.write('    {0}\n'.format(name))
+    if baselinePath:
+        saveBaseline(baselinePath, baseline)
+
+    print 'Checked {0:d} components; {1:d} had problems.'.format(len(tasks), len(failed))
+    for name in failed:
+        print '    ' + name
+    return len(failed)
+
+################################################################################
+
 if __name__ == '__main__':
-    # Set up paths for database and logger
-    databaseDirectory = settings['database.directory']    # RMG-database/input    
+
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-f', '--families', type=str, nargs='+', default=None,
+        metavar='FAMILY', help='check only the given kinetics families')
+    parser.add_argument('-g', '--groups', type=str, nargs='+', default=None,
+        metavar='GROUPS', help='check only the given thermo group trees')
+    parser.add_argument('-l', '--libraries', type=str, nargs='+', default=None,
+        metavar='LIBRARY', help='check only the given thermo and kinetics libraries')
+    parser.add_argument('-n', '--processes', type=int, default=1,
+        metavar='N', help='use N processes to check the database')
+    parser.add_argument('-c', '--changed', action='store_true',
+        help='check only the components changed since they last passed')
+    parser.add_argument('-b', '--baseline', type=str, nargs=1, default=None,
+        metavar='FILE', help='record the components that pass in FILE')
+    args = parser.parse_args()
+
+    # Keep the messages of the checks out of the console; they are collected
+    # into the report instead
+    logging.getLogger('databaseLog').propagate = False
+
+    # Set up paths for database, report, and baseline
+    databaseDirectory = settings['database.directory']    # RMG-database/input
     logPath = os.path.join(databaseDirectory, '..', 'database.log')
-    #clear logger if it exists
-    if os.path.exists(logPath):
-        with open(logPath, 'w'): 
-            pass
-    databaseLog=logging.getLogger('databaseLog')
-    fh=logging.FileHandler(logPath)
-    fh.setLevel(logging.DEBUG)
-    databaseLog.addHandler(fh)
-    databaseLog.propagate=False #prevents these logging messages to being sent to ancestors (so that it doesn't print on console)
-#     logging.basicConfig(filename=logpath, level=logging.ERROR)
-
-    FullDatabase=RMGDatabase()
-    FullDatabase.load(databaseDirectory, kineticsFamilies='all')
-    checkFamilies(FullDatabase)
+    baselinePath = os.path.abspath(args.baseline[0]) if args.baseline else os.path.join(databaseDirectory, '..', 'database.baseline')
 
+    checkDatabase(databaseDirectory, logPath,
+        families = args.families,
+        groups = args.groups,
+        libraries = args.libraries,
+        processes = args.processes,
+        baselinePath = baselinePath,
+        changed = args.changed,
+    )
@@ -17,6 +17,7 @@ import pydot
 
 from rmgpy.chemkin import loadChemkinFile
 from rmgpy.rmg.main import RMG
+from rmgpy.rmg.output import drawSpecies
 from rmgpy.solver.base import TerminationTime, TerminationConversion
 from rmgpy.solver.simple import SimpleReactor
 
@@ -481,10 +482,7 @@ def loadRMGJavaJob(inputFile, chemkinFile=None, speciesDict=None):
         os.mkdir(speciesPath)
     except OSError:
         pass
-    for species in speciesList:
-
-        path = os.path.join(speciesPath + '/{0!s}.png'.format(species))
-        species.molecule[0].draw(str(path))
+    drawSpecies([(species, os.path.join(speciesPath, '{0!s}.png'.format(species))) for species in speciesList])
     
     return rmg
 
@@ -538,10 +536,7 @@ def loadRMGPyJob(inputFile, chemkinFile=None, speciesDict=None, generateImages=T
             os.mkdir(speciesPath)
         except OSError:
             pass
-        for species in speciesList:
-            path = os.path.join(speciesPath, '{0!s}.png'.format(species))
-            if not os.path.exists(path):
-                species.molecule[0].draw(str(path))
+        drawSpecies([(species, os.path.join(speciesPath, '{0!s}.png'.format(species))) for species in speciesList])
     
     return rmg
 
@@ -77,6 +77,8 @@ def parseCommandLineArguments():
         metavar='DIR', help='use DIR as scratch directory')
     parser.add_argument('-l', '--library-directory', type=str, nargs=1, default='',
         metavar='DIR', help='use DIR as library directory')
+    parser.add_argument('-n', '--processes', type=int, default=1,
+        metavar='N', help='use N processes to load the database')
     
     args = parser.parse_args()
     args.walltime = '0'
@@ -84,6 +84,9 @@ def parseCommandLineArguments():
     parser.add_argument('-t', '--walltime', type=str, nargs=1, default='0',
         metavar='HH:MM:SS', help='set the maximum execution time')
 
+    parser.add_argument('-n', '--processes', type=int, default=1,
+        metavar='N', help='use N processes to load the database')
+
     return parser.parse_args()
 
 ################################################################################
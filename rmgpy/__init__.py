@@ -67,6 +67,8 @@ class Settings(dict):
     def __setitem__(self, key, value):
         if key == 'database.directory':
             value = os.path.abspath(os.path.expandvars(value))
+        elif key == 'cache.directory':
+            value = os.path.abspath(os.path.expanduser(os.path.expandvars(value)))
         else:
             print('Unexpecting setting "{0}" encountered.'.format(key))
         self.sources[key] = '-'
@@ -142,6 +144,8 @@ class Settings(dict):
         rmgpy_module_dir = os.path.abspath(os.path.dirname(__file__))
         self['database.directory'] = os.path.realpath(os.path.join(rmgpy_module_dir, '..', '..', 'RMG-database', 'input'))
         self.sources['database.directory'] = 'Default, relative to RMG-Py source code'
+        self['cache.directory'] = os.path.join(os.path.expanduser('~'), '.rmg', 'cache')
+        self.sources['cache.directory'] = 'Default, in the user\'s $HOME/.rmg directory'
 
 # The global settings object
 settings = Settings()
@@ -35,6 +35,7 @@ components of the RMG database.
 """
 
 import os
+import itertools
 import logging
 import re
 import codecs
@@ -43,7 +44,8 @@ try:
 except ImportError:
     logging.warning("Upgrade to Python 2.7 or later to ensure your database entries are read and written in the same order each time!")
     OrderedDict = dict
-from rmgpy.molecule import Molecule, Group, InvalidAdjacencyListError
+from rmgpy.molecule import Molecule, Atom, Group, InvalidAdjacencyListError
+from rmgpy.molecule.groupmatch import getMatchPlan
 
 from reference import Reference, Article, Book, Thesis
 
@@ -163,6 +165,10 @@ class Database:
         self.name = name
         self.shortDesc = shortDesc
         self.longDesc = longDesc
+        # The discrimination index of the children of each tree node
+        self._childIndex = {}
+        # The indices of the entries, from getEntryIndex()
+        self._entryIndex = {}
 
     def load(self, path, local_context=None, global_context=None):
         """
@@ -219,6 +225,58 @@ class Database:
         # Return the loaded database (to allow for Database().load() syntax)
         return self
 
+    def getEntryIndex(self, name, getKeys):
+        """
+        Return the index named `name` of the entries in this database. The
+        index is a dict mapping keys to lists of ``(position, entry)`` tuples,
+        where `position` is the position of the entry in :attr:`entries`. The
+        function `getKeys` is called with each entry and returns the list of
+        keys to index it under; entries that cannot be indexed should be put
+        under the key ``None``, which callers treat as matching anything.
+        Entries added since the index was last used are added to it; if
+        entries have been removed or :attr:`entries` replaced, the index is
+        rebuilt. Items modified in place are not detected.
+        """
+        try:
+            entries, count, last, index = self._entryIndex[name]
+        except KeyError:
+            entries = None
+        if entries is not None:
+            # Check that the last indexed entry is still in the same position
+            if entries is not self.entries or count > len(entries):
+                entries = None
+            elif count > 0:
+                if count == len(entries) and isinstance(entries, OrderedDict):
+                    entry = entries[next(reversed(entries))]
+                else:
+                    entry = next(itertools.islice(entries.itervalues(), count - 1, None))
+                if entry is not last:
+                    entries = None
+        if entries is None:
+            entries, count, last, index = self.entries, 0, None, {}
+        elif count == len(entries):
+            return index
+        for position, entry in enumerate(itertools.islice(entries.itervalues(), count, None), count):
+            for key in getKeys(entry):
+                index.setdefault(key, []).append((position, entry))
+            last = entry
+        self._entryIndex[name] = (entries, len(entries), last, index)
+        return index
+
+    def getCandidateEntries(self, molecules):
+        """
+        Return the entries in this database whose items might be isomorphic to
+        any of the molecules in the list `molecules`, in the order they appear
+        in :attr:`entries`. These are the entries with molecule items of the
+        same structure key, as given by :func:`getStructureKey`, plus all
+        entries whose items are not molecules.
+        """
+        index = self.getEntryIndex('structure', getStructureKeys)
+        candidates = dict(index.get(None, []))
+        for molecule in molecules:
+            candidates.update(index.get(getStructureKey(molecule), []))
+        return [candidates[position] for position in sorted(candidates)]
+
     def getEntriesToSave(self):
         """
         Return a sorted list of the entries in this database that should be
@@ -971,6 +1029,11 @@ class Database:
         if isinstance(group, LogicNode):
             return group.matchToStructure(self, structure, atoms)
         else:
+            # Molecules are first screened using the local features of the
+            # labeled atoms in the group's compiled match plan
+            plan = getMatchPlan(group) if isinstance(structure, Molecule) else None
+            if plan is not None and not plan.matchCenters(atoms):
+                return False
             # try to pair up labeled atoms
             centers = group.getLabeledAtoms()
             initialMap = {}
@@ -1007,20 +1070,92 @@ class Database:
                 # Passed semantic checks, so add to maps of already-matched atoms
                 initialMap[atom] = center
             # Labeled atoms in the structure that are not in the group should
-            # not be considered in the isomorphism check, so remove them temporarily
+            # not be considered in the isomorphism check
             # Without this we would hit a lot of nodes that are ambiguous
-            removedAtoms = []
-            for label, atom in structure.getLabeledAtoms().iteritems():
-                if label not in centers:
-                    removedAtoms.append(atom)
-                    structure.atoms.remove(atom)
+            excludedAtoms = [atom for label, atom in structure.getLabeledAtoms().iteritems() if label not in centers]
             # use mapped (labeled) atoms to try to match subgraph
-            result = structure.isSubgraphIsomorphic(group, initialMap)
-            # Restore atoms removed in previous step
-            for atom in removedAtoms:
-                structure.atoms.append(atom)
+            # Molecules are matched using the group's compiled match plan,
+            # which skips the excluded atoms without modifying the structure
+            if plan is not None:
+                return plan.isSubgraphIsomorphic(structure, initialMap, excludedAtoms)
+            # Otherwise remove the excluded atoms temporarily, making sure that
+            # no properties of the structure are cached without them
+            for atom in excludedAtoms:
+                structure.atoms.remove(atom)
+            if isinstance(structure, Molecule): structure.resetCache()
+            try:
+                result = structure.isSubgraphIsomorphic(group, initialMap)
+            finally:
+                # Restore atoms removed in previous step
+                for atom in excludedAtoms:
+                    structure.atoms.append(atom)
+                if isinstance(structure, Molecule): structure.resetCache()
             return result
 
+    def getChildIndex(self, node):
+        """
+        Return the discrimination index of the children of the tree node
+        `node`, compiling it on first use. The index is a tuple of the list of
+        children it was compiled for, the key label, a dict of the children
+        that can match a structure whose key-labeled atom has each atom type,
+        and the list of children for any other atom type. Children are
+        indexed by the atom types accepted by their atom with the key label,
+        which is chosen to be the label shared by the most children; children
+        without such an atom (including logic nodes) are in every list. Each
+        list keeps the children in their original order. The index is
+        recompiled if the children of `node` change.
+        """
+        try:
+            index = self._childIndex[node]
+        except KeyError:
+            pass
+        else:
+            if index[0] == node.children:
+                return index
+
+        # Find the atom types accepted by each labeled atom of each child
+        centers = []
+        counts = {}
+        for child in node.children:
+            plan = getMatchPlan(child.item) if isinstance(child.item, Group) else None
+            atomTypes = {}
+            if plan is not None:
+                for center in plan.centers:
+                    atomTypes[center.label] = set([atomType.label for atomType in center.atomTypes])
+                    counts[center.label] = counts.get(center.label, 0) + 1
+            centers.append(atomTypes)
+
+        # Index the children on the label shared by the most of them
+        label = min(counts.iterkeys(), key=lambda label: (-counts[label], label)) if counts else None
+        others = [child for child, atomTypes in zip(node.children, centers) if label not in atomTypes]
+        buckets = {}
+        for atomTypes in centers:
+            for atomType in atomTypes.get(label, []):
+                if atomType in buckets: continue
+                buckets[atomType] = [child for child, atomTypes in zip(node.children, centers)
+                    if label not in atomTypes or atomType in atomTypes[label]]
+
+        index = (list(node.children), label, buckets, others)
+        self._childIndex[node] = index
+        return index
+
+    def getCandidateChildren(self, node, structure, atoms):
+        """
+        Return the children of the tree node `node` that might match the
+        local structure around `atoms` in `structure`, in their original
+        order. For molecules, the children are looked up in the
+        discrimination index from :meth:`getChildIndex` using the atom type
+        of the atom with the key label; otherwise all children are returned.
+        """
+        if not isinstance(structure, Molecule):
+            return node.children
+        children, label, buckets, others = self.getChildIndex(node)
+        atom = atoms.get(label)
+        if not isinstance(atom, Atom):
+            return node.children
+        # An atom with no atom type only matches children without the key label
+        return buckets.get(atom.atomType.label if atom.atomType is not None else None, others)
+
     def descendTree(self, structure, atoms, root=None):
         """
         Descend the tree in search of the functional group node that best
@@ -1029,6 +1164,11 @@ class Database:
         If root=None then uses the first matching top node.
 
         Returns None if there is no matching root.
+
+        Only the children returned by :meth:`getCandidateChildren` are
+        matched to the structure at each level, and each of them is screened
+        using the local features of its labeled atoms before the full
+        subgraph isomorphism check is made.
         """
 
         if root is None:
@@ -1041,7 +1181,7 @@ class Database:
             return None
         
         next = []
-        for child in root.children:
+        for child in self.getCandidateChildren(root, structure, atoms):
             if self.matchNodeToStructure(child, structure, atoms):
                 next.append(child)
 
@@ -1246,6 +1386,25 @@ def getAllCombinations(nodeLists):
 
     return items
 
+def getStructureKey(molecule):
+    """
+    Return a hashable key summarizing the structure of `molecule`, made from
+    its fingerprint and graph invariants. Isomorphic molecules always have
+    the same key, so the key can be used to index molecules before checking
+    for isomorphism.
+    """
+    return (molecule.getFingerprint(), molecule.getInvariants())
+
+def getStructureKeys(entry):
+    """
+    Return a list containing the structure key of the item of `entry`, as
+    given by :func:`getStructureKey`, or ``None`` if the item is not a
+    molecule.
+    """
+    if isinstance(entry.item, Molecule):
+        return [getStructureKey(entry.item)]
+    return [None]
+
 ################################################################################
 
 class ForbiddenStructureException(Exception):
@@ -1258,14 +1417,93 @@ class ForbiddenStructures(Database):
     """
     A database consisting solely of structures that are forbidden
     from occurring.
+
+    The result of :meth:`isMoleculeForbidden` is memoized per molecular
+    structure, since the same reactant and product structures are checked
+    many times during reaction generation. Only atom labels that actually
+    appear in the forbidden structures are part of the memo key. The memo is
+    discarded automatically whenever the set of forbidden entries changes,
+    or whenever it grows beyond `cacheSize` structures.
     """
-    
+
+    cacheSize = 20000
+
+    def __init__(self,
+                 entries=None,
+                 top=None,
+                 label='',
+                 name='',
+                 shortDesc='',
+                 longDesc='',
+                 ):
+        Database.__init__(self, entries, top, label, name, shortDesc, longDesc)
+        self.clearCache()
+
+    def clearCache(self):
+        """
+        Discard all memoized results of :meth:`isMoleculeForbidden`.
+        """
+        self._cache = {}
+        self._cacheCount = 0
+        self._cacheSignature = None
+        self._cacheLabels = set()
+
+    def __checkCache(self):
+        """
+        Clear the memo if the forbidden entries have changed since it was
+        last used, and update the set of atom labels that the entries honor.
+        """
+        signature = tuple([(label, id(entry.item)) for label, entry in self.entries.iteritems()])
+        if signature != self._cacheSignature or self._cacheCount > self.cacheSize:
+            self.clearCache()
+            self._cacheSignature = signature
+            for entry in self.entries.values():
+                self._cacheLabels.update(entry.item.getLabeledAtoms().keys())
+
     def isMoleculeForbidden(self, molecule):
         """
         Return ``True`` if the given :class:`Molecule` object `molecule`
         contains forbidden functionality, or ``False`` if not. Labeled atoms
         on the forbidden structures and the molecule are honored.
         """
+        self.__checkCache()
+
+        # Only the labels used by the forbidden structures affect the result
+        labeledAtoms = {}
+        for label, atom in molecule.getLabeledAtoms().iteritems():
+            if label in self._cacheLabels:
+                if isinstance(atom, list):
+                    # Atoms sharing a label have no unique initial mapping,
+                    # so don't try to memoize the result
+                    return self.__isMoleculeForbidden(molecule)
+                labeledAtoms[label] = atom
+        key = (molecule.getFingerprint(), tuple(sorted(labeledAtoms.keys())))
+
+        # Return the memoized result if we have seen this structure before
+        bucket = self._cache.get(key)
+        if bucket is not None:
+            for other, result in bucket:
+                otherLabeledAtoms = other.getLabeledAtoms()
+                initialMap = {}
+                for label, atom in labeledAtoms.iteritems():
+                    initialMap[atom] = otherLabeledAtoms[label]
+                if molecule.isMappingValid(other, initialMap) and molecule.isIsomorphic(other, initialMap):
+                    return result
+        else:
+            bucket = []
+            self._cache[key] = bucket
+
+        result = self.__isMoleculeForbidden(molecule)
+        bucket.append((molecule.copy(deep=True), result))
+        self._cacheCount += 1
+        return result
+
+    def __isMoleculeForbidden(self, molecule):
+        """
+        Return ``True`` if the given :class:`Molecule` object `molecule`
+        contains forbidden functionality, or ``False`` if not, without
+        consulting the memo.
+        """
         for entry in self.entries.values():
             entryLabeledAtoms = entry.item.getLabeledAtoms()
             moleculeLabeledAtoms = molecule.getLabeledAtoms()
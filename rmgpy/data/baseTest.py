@@ -6,7 +6,7 @@ import unittest
 from external.wip import work_in_progress
 
 from rmgpy import settings
-from rmgpy.data.base import Entry, Database
+from rmgpy.data.base import Entry, Database, ForbiddenStructures
 from rmgpy.molecule import Group, Molecule
 
 ################################################################################
@@ -69,6 +69,39 @@ class TestBaseDatabase(unittest.TestCase):
 
         # entry3 contains fewer labels than entry1, therefore it can be matched
         self.assertTrue(self.database.matchNodeToStructure(entry1,entry3.item,atoms=entry3.item.getLabeledAtoms()))
+
+    def testMatchNodeToStructureExtraLabels(self):
+        """
+        Test that matching a node to a molecule with more labeled atoms than
+        the node ignores the extra labeled atoms without modifying the molecule.
+        """
+        methane = Molecule().fromAdjacencyList("""
+        1 *1 C 0 0 {2,S} {3,S} {4,S} {5,S}
+        2 *2 H 0 0 {1,S}
+        3 *3 H 0 0 {1,S}
+        4    H 0 0 {1,S}
+        5    H 0 0 {1,S}
+        """)
+        entry1 = Entry(item=Group().fromAdjacencyList("""
+        1 *1 C 0 {2,S} {3,S} {4,S}
+        2 *2 H 0 {1,S}
+        3    H 0 {1,S}
+        4    H 0 {1,S}
+        """))
+        entry2 = Entry(item=Group().fromAdjacencyList("""
+        1 *1 C 0 {2,S} {3,S} {4,S} {5,S}
+        2 *2 H 0 {1,S}
+        3    H 0 {1,S}
+        4    H 0 {1,S}
+        5    H 0 {1,S}
+        """))
+        atoms = methane.atoms[:]
+        self.assertTrue(self.database.matchNodeToStructure(entry1, methane, atoms=methane.getLabeledAtoms()))
+        self.assertFalse(self.database.matchNodeToStructure(entry2, methane, atoms=methane.getLabeledAtoms()))
+        self.assertEqual(methane.atoms, atoms)
+        self.assertEqual(methane.getFormula(), 'CH4')
+        self.assertEqual(methane.getNumAtoms('H'), 4)
+        self.assertTrue(methane.isIsomorphic(Molecule().fromAdjacencyList("1 C 0 0", saturateH=True)))
         
     def testMatchNodeToNode(self):
         """
@@ -89,6 +122,170 @@ class TestBaseDatabase(unittest.TestCase):
         )
         self.assertTrue(self.database.matchNodeToNode(entry1,entry1))
         self.assertFalse(self.database.matchNodeToNode(entry1,entry2))
+
+    def testDescendTree(self):
+        """
+        Test that descending the tree using the discrimination index of each
+        node gives the same node as matching every child.
+        """
+        database = self.database
+        def addEntry(label, adjlist, parent=None):
+            entry = Entry(label=label, item=Group().fromAdjacencyList(adjlist), parent=parent)
+            database.entries[label] = entry
+            if parent is None:
+                database.top.append(entry)
+            else:
+                parent.children.append(entry)
+            return entry
+        root = addEntry('R', '1 * R 0')
+        carbon = addEntry('Cs', '1 * Cs 0', root)
+        addEntry('Cd', '1 * Cd 0', root)
+        addEntry('O', '1 * O 0', root)
+        addEntry('Others-R', '1 * N 0', root)
+        addEntry('Cs-HHHH', """
+        1 * Cs 0 {2,S} {3,S} {4,S} {5,S}
+        2   H  0 {1,S}
+        3   H  0 {1,S}
+        4   H  0 {1,S}
+        5   H  0 {1,S}
+        """, carbon)
+        addEntry('Cs-CsHHH', """
+        1 * Cs 0 {2,S} {3,S} {4,S} {5,S}
+        2   Cs 0 {1,S}
+        3   H  0 {1,S}
+        4   H  0 {1,S}
+        5   H  0 {1,S}
+        """, carbon)
+        addEntry('Cs-OsHHH', """
+        1 * Cs 0 {2,S} {3,S} {4,S} {5,S}
+        2   Os 0 {1,S}
+        3   H  0 {1,S}
+        4   H  0 {1,S}
+        5   H  0 {1,S}
+        """, carbon)
+
+        def descendAllChildren(structure, atoms, root):
+            # The descent without the discrimination index
+            next = [child for child in root.children if database.matchNodeToStructure(child, structure, atoms)]
+            if len(next) == 0:
+                if len(root.children) > 0 and root.children[-1].label.startswith('Others-'):
+                    return root.children[-1]
+                return root
+            return descendAllChildren(structure, atoms, next[0])
+
+        molecule = Molecule().fromAdjacencyList("""
+        1 C 0 {2,S}
+        2 C 0 {1,S} {3,S}
+        3 O 0 {2,S}
+        """, saturateH=True)
+        labels = []
+        for atom in molecule.atoms:
+            atoms = {'*': atom}
+            node = database.descendTree(molecule, atoms)
+            self.assertTrue(node is descendAllChildren(molecule, atoms, root))
+            labels.append(node.label)
+        self.assertEqual(labels, ['Cs-CsHHH', 'Cs', 'O'] + ['Others-R'] * 6)
+
+        # The index only offers the children that accept the atom type
+        children = database.getCandidateChildren(root, molecule, {'*': molecule.atoms[2]})
+        self.assertEqual([child.label for child in children], ['O'])
+        # The index is compiled again when the children change
+        addEntry('Os', '1 * Os 0', root)
+        children = database.getCandidateChildren(root, molecule, {'*': molecule.atoms[2]})
+        self.assertEqual([child.label for child in children], ['O', 'Os'])
+
+    def testGetCandidateEntries(self):
+        """
+        Test that the structure index offers every entry isomorphic to a
+        molecule, in database order, and is updated as entries are added.
+        """
+        database = self.database
+        adjlists = [
+            "1 C 0",
+            "1 O 0",
+            "1 C 0 {2,S}\n2 C 0 {1,S}",
+            "1 C 1",
+            "1 C 0 {2,S}\n2 O 0 {1,S}",
+        ]
+        for index, adjlist in enumerate(adjlists):
+            database.entries['S{0:d}'.format(index)] = Entry(index=index, label='S{0:d}'.format(index),
+                item=Molecule().fromAdjacencyList(adjlist, saturateH=True))
+        database.entries['G'] = Entry(label='G', item=Group().fromAdjacencyList("1 * C 0"))
+
+        for entry in database.entries.values():
+            if not isinstance(entry.item, Molecule): continue
+            candidates = database.getCandidateEntries([entry.item.copy(deep=True)])
+            self.assertTrue(entry in candidates)
+            self.assertTrue(database.entries['G'] in candidates)
+            self.assertTrue(len(candidates) < len(database.entries))
+        candidates = database.getCandidateEntries([database.entries['S4'].item, database.entries['S0'].item])
+        self.assertEqual([entry.label for entry in candidates], ['S0', 'S4', 'G'])
+
+        # Entries added later are indexed on the next lookup
+        database.entries['S5'] = Entry(index=5, label='S5', item=Molecule().fromAdjacencyList("1 C 0", saturateH=True))
+        candidates = database.getCandidateEntries([database.entries['S0'].item])
+        self.assertEqual([entry.label for entry in candidates], ['S0', 'G', 'S5'])
+        del database.entries['S0']
+        candidates = database.getCandidateEntries([database.entries['S5'].item])
+        self.assertEqual([entry.label for entry in candidates], ['G', 'S5'])
+        del database.entries['S1']
+        database.entries['S6'] = Entry(index=6, label='S6', item=Molecule().fromAdjacencyList("1 O 0", saturateH=True))
+        candidates = database.getCandidateEntries([database.entries['S6'].item])
+        self.assertEqual([entry.label for entry in candidates], ['G', 'S6'])
+
+################################################################################
+
+class TestForbiddenStructures(unittest.TestCase):
+    """
+    Contains unit tests of the ForbiddenStructures class.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        self.forbidden = ForbiddenStructures()
+        self.forbidden.loadEntry(label='O-O biradical', group=
+        """
+        1 O 1 {2,S}
+        2 O 1 {1,S}
+        """)
+        self.peroxide = Molecule().fromAdjacencyList(
+        """
+        1 O 1 {2,S}
+        2 O 1 {1,S}
+        """)
+        self.water = Molecule().fromAdjacencyList(
+        """
+        1 O 0 {2,S} {3,S}
+        2 H 0 {1,S}
+        3 H 0 {1,S}
+        """)
+
+    def testIsMoleculeForbidden(self):
+        """
+        Test that repeated forbidden checks give the same results.
+        """
+        for i in range(3):
+            self.assertTrue(self.forbidden.isMoleculeForbidden(self.peroxide))
+            self.assertFalse(self.forbidden.isMoleculeForbidden(self.water))
+            self.assertTrue(self.forbidden.isMoleculeForbidden(self.peroxide.copy(deep=True)))
+
+    def testCacheInvalidation(self):
+        """
+        Test that the memoized results are discarded when the entries change.
+        """
+        self.assertFalse(self.forbidden.isMoleculeForbidden(self.water))
+        self.forbidden.loadEntry(label='water', group=
+        """
+        1 O 0 {2,S} {3,S}
+        2 H 0 {1,S}
+        3 H 0 {1,S}
+        """)
+        self.assertTrue(self.forbidden.isMoleculeForbidden(self.water))
+        del self.forbidden.entries['water']
+        self.assertFalse(self.forbidden.isMoleculeForbidden(self.water))
+
 ################################################################################
 
 if __name__ == '__main__':
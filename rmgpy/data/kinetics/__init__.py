@@ -43,16 +43,41 @@ from rmgpy.species import Species
 from rmgpy.reaction import Reaction
 from rmgpy.data.base import LogicNode, DatabaseError
 
-from .common import KineticsError, saveEntry
+from .common import KineticsError, saveEntry, getCandidateReactionEntries
 from .depository import DepositoryReaction, KineticsDepository
 from .family import TemplateReaction, KineticsFamily, KineticsGroups, \
     ReactionRecipe, InvalidActionError, ReactionPairsError, \
-    UndeterminableKineticsError
+    UndeterminableKineticsError, getDepositoryLabels
 from .library import LibraryReaction, KineticsLibrary
 from .rules import KineticsRules
 
 ################################################################################
 
+def _loadFamily(args):
+    """
+    Load and return the kinetics family with the given label from the given
+    path, loading the depositories with the given labels. Used to load
+    families in worker processes.
+    """
+    label, path, depositoryLabels = args
+    database = KineticsDatabase()
+    family = KineticsFamily(label=label)
+    family.load(path, database.local_context, database.global_context, depositoryLabels=depositoryLabels)
+    return family
+
+def _loadLibrary(args):
+    """
+    Load and return the kinetics library with the given label from the given
+    path. Used to load libraries in worker processes.
+    """
+    label, path = args
+    database = KineticsDatabase()
+    library = KineticsLibrary(label=label)
+    library.load(path, database.local_context, database.global_context)
+    return library
+
+################################################################################
+
 class KineticsDatabase(object):
     """
     A class for working with the RMG kinetics database.
@@ -84,6 +109,7 @@ class KineticsDatabase(object):
         A helper function used when pickling a KineticsDatabase object.
         """
         d = {
+            'recommendedFamilies': self.recommendedFamilies,
             'families': self.families,
             'libraries': self.libraries,
             'libraryOrder': self.libraryOrder,
@@ -94,18 +120,21 @@ class KineticsDatabase(object):
         """
         A helper function used when unpickling a KineticsDatabase object.
         """
+        self.recommendedFamilies = d['recommendedFamilies']
         self.families = d['families']
         self.libraries = d['libraries']
         self.libraryOrder = d['libraryOrder']
 
-    def load(self, path, families=None, libraries=None, depositories=None):
+    def load(self, path, families=None, libraries=None, depositories=None, pool=None):
         """
         Load the kinetics database from the given `path` on disk, where `path`
-        points to the top-level folder of the families database.
+        points to the top-level folder of the families database. If a
+        :class:`multiprocessing.Pool` `pool` is given, the families and
+        libraries are loaded by its worker processes.
         """
         self.loadRecommendedFamiliesList(os.path.join(path, 'families', 'recommended.py')),
-        self.loadFamilies(os.path.join(path, 'families'), families, depositories)
-        self.loadLibraries(os.path.join(path, 'libraries'), libraries)
+        self.loadFamilies(os.path.join(path, 'families'), families, depositories, pool=pool)
+        self.loadLibraries(os.path.join(path, 'libraries'), libraries, pool=pool)
 
     def loadRecommendedFamiliesList(self, filepath):
         """
@@ -132,10 +161,14 @@ class KineticsDatabase(object):
             if not isinstance(recommended, bool):
                 raise DatabaseError("recommendedFamilies dictionary should contain only True or False values")
 
-    def loadFamilies(self, path, families=None, depositories=None):
+    def loadFamilies(self, path, families=None, depositories=None, lazy=True, pool=None):
         """
         Load the kinetics families from the given `path` on disk, where `path`
-        points to the top-level folder of the kinetics families.
+        points to the top-level folder of the kinetics families. If `lazy` is
+        ``True``, the files of each family are only read when the family is
+        first used, as described in :meth:`KineticsFamily.load`. If a
+        :class:`multiprocessing.Pool` `pool` is given, the families are instead
+        loaded in full by its worker processes.
         """
         
         familiesToLoad = []
@@ -188,30 +221,36 @@ class KineticsDatabase(object):
         
         # Now we know what families to load, so let's load them
         self.families = {}
+        if pool is not None and familiesToLoad:
+            depositories = getDepositoryLabels(depositories)
+            tasks = [(label, os.path.join(path, label), depositories) for label in familiesToLoad]
+            for family in pool.map(_loadFamily, tasks):
+                self.families[family.label] = family
+            return
         for label in familiesToLoad:
             familyPath = os.path.join(path, label)
             family = KineticsFamily(label=label)
-            family.load(familyPath, self.local_context, self.global_context, depositoryLabels=depositories)
+            family.load(familyPath, self.local_context, self.global_context, depositoryLabels=depositories, lazy=lazy)
             self.families[label] = family
 
-    def loadLibraries(self, path, libraries=None):
+    def loadLibraries(self, path, libraries=None, pool=None):
         """
         Load the listed kinetics libraries from the given `path` on disk.
         
         Loads them all if `libraries` list is not specified or `None`.
         The `path` points to the folder of kinetics libraries in the database,
         and the libraries should be in files like :file:`<path>/<library>.py`.
+        If a :class:`multiprocessing.Pool` `pool` is given, the libraries are
+        loaded by its worker processes.
         """
         self.libraries = {}
         
+        tasks = []
         if libraries is not None:
             for library_name in libraries:
                 library_file = os.path.join(path, library_name+'.py')
                 if os.path.exists(library_file):
-                    logging.info('Loading kinetics library {0} from {1}...'.format(library_name, library_file))
-                    library = KineticsLibrary(label=library_name)
-                    library.load(library_file, self.local_context, self.global_context)
-                    self.libraries[library.label] = library
+                    tasks.append((library_name, library_file))
                 else:
                     raise IOError("Couldn't find kinetics library {0}".format(library_file))
             # library order should've been set prior to this, with the given seed mechs and reaction libraries
@@ -224,11 +263,20 @@ class KineticsDatabase(object):
                     if ext.lower() == '.py':
                         library_file = os.path.join(root, f)
                         label=library_file[len(path)+1:-3]
-                        logging.info('Loading kinetics library {0} from {1}...'.format(label, library_file))
-                        library = KineticsLibrary(label=label)
-                        library.load(library_file, self.local_context, self.global_context)
-                        self.libraries[library.label] = library
-                        self.libraryOrder.append((library.label,'Reaction Library'))
+                        tasks.append((label, library_file))
+                        self.libraryOrder.append((label,'Reaction Library'))
+
+        if pool is not None and len(tasks) > 1:
+            for label, library_file in tasks:
+                logging.info('Loading kinetics library {0} from {1}...'.format(label, library_file))
+            for library in pool.map(_loadLibrary, tasks):
+                self.libraries[library.label] = library
+        else:
+            for label, library_file in tasks:
+                logging.info('Loading kinetics library {0} from {1}...'.format(label, library_file))
+                library = KineticsLibrary(label=label)
+                library.load(library_file, self.local_context, self.global_context)
+                self.libraries[library.label] = library
 
     def save(self, path):
         """
@@ -385,7 +433,11 @@ class KineticsDatabase(object):
         searches the depository.
         """
         reactionList = []
-        for entry in library.entries.values():
+        if len(reactants) > 2:
+            entries = library.entries.values()
+        else:
+            entries = getCandidateReactionEntries(library, reactants)
+        for entry in entries:
             if entry.item.matchesMolecules(reactants):
                 reaction = LibraryReaction(
                     reactants = entry.item.reactants[:],
@@ -33,7 +33,9 @@ This module contains classes and functions that are used by multiple modules
 in this subpackage.
 """
 
-from rmgpy.data.base import DatabaseError, LogicNode
+import itertools
+
+from rmgpy.data.base import DatabaseError, LogicNode, getStructureKey
 from rmgpy.reaction import Reaction, ReactionError
 from rmgpy.molecule import Molecule, Group
 from rmgpy.species import Species
@@ -107,6 +109,86 @@ class UndeterminableKineticsError(ReactionError):
 
 ################################################################################
 
+def getReactionKeys(structures):
+    """
+    Return a list of the keys that a reaction side made up of the given
+    `structures` can be matched by. Each key is a sorted tuple of the structure
+    keys of one molecule of each structure, as given by
+    :func:`rmgpy.data.base.getStructureKey`, so that two sides can only be
+    isomorphic if they have a key in common. A list containing ``None`` is
+    returned if the structures are not all :class:`Species` or
+    :class:`Molecule` objects or if there are more than three of them, as
+    such sides cannot be indexed.
+    """
+    if len(structures) > 3:
+        return [None]
+    keyLists = []
+    for structure in structures:
+        if isinstance(structure, Species):
+            keyLists.append(set([getStructureKey(molecule) for molecule in structure.molecule]))
+        elif isinstance(structure, Molecule):
+            keyLists.append([getStructureKey(structure)])
+        else:
+            return [None]
+    return list(set([tuple(sorted(keys)) for keys in itertools.product(*keyLists)]))
+
+def getReactantKeys(entry):
+    """
+    Return the keys of the reactants of the reaction in `entry`, as given by
+    :func:`getReactionKeys`.
+    """
+    if isinstance(entry.item, Reaction):
+        return getReactionKeys(entry.item.reactants)
+    return [None]
+
+def getProductKeys(entry):
+    """
+    Return the keys of the products of the reaction in `entry`, as given by
+    :func:`getReactionKeys`.
+    """
+    if isinstance(entry.item, Reaction):
+        return getReactionKeys(entry.item.products)
+    return [None]
+
+def getCandidateReactionEntries(database, reactants, products=None):
+    """
+    Return the entries in `database` whose reactions might match the given
+    `reactants`, in the order they appear in the database. If `products` is
+    ``None``, these are the entries whose reactants or products might be
+    isomorphic to `reactants`, as checked by :meth:`Reaction.matchesMolecules`.
+    Otherwise, they are the entries whose reactions might be isomorphic in
+    either direction to the reaction from `reactants` to `products`, as checked
+    by :meth:`Reaction.isIsomorphic`. The entries are looked up in indices of
+    the reactants and products of the entries in the database, so only
+    a few full isomorphism checks are needed.
+    """
+    def getCandidates(index, keys):
+        candidates = dict(index.get(None, []))
+        for key in keys:
+            candidates.update(index.get(key, []))
+        return candidates
+
+    reactantKeys = getReactionKeys(reactants)
+    productKeys = getReactionKeys(products) if products is not None else []
+    if None in reactantKeys or None in productKeys:
+        return database.entries.values()
+    reactantIndex = database.getEntryIndex('reactants', getReactantKeys)
+    productIndex = database.getEntryIndex('products', getProductKeys)
+    candidates = getCandidates(reactantIndex, reactantKeys)
+    reverseCandidates = getCandidates(productIndex, reactantKeys)
+    if products is not None:
+        forwardProducts = getCandidates(productIndex, productKeys)
+        reverseProducts = getCandidates(reactantIndex, productKeys)
+        candidates = dict([(position, entry) for position, entry in candidates.iteritems() if position in forwardProducts])
+        for position, entry in reverseCandidates.iteritems():
+            if position in reverseProducts:
+                candidates[position] = entry
+    else:
+        candidates.update(reverseCandidates)
+    return [candidates[position] for position in sorted(candidates)]
+
+################################################################################
+
 def saveEntry(f, entry):
     """
     Save an `entry` in the kinetics database by writing a string to
@@ -48,7 +48,7 @@ from rmgpy.molecule import Bond, GroupBond, Group, Molecule
 from rmgpy.species import Species
 
 from .common import KineticsError, UndeterminableKineticsError, saveEntry, \
-                    UNIMOLECULAR_KINETICS_FAMILIES, BIMOLECULAR_KINETICS_FAMILIES
+                    getCandidateReactionEntries, UNIMOLECULAR_KINETICS_FAMILIES, BIMOLECULAR_KINETICS_FAMILIES
 from .depository import KineticsDepository
 from .groups import KineticsGroups
 from .rules import KineticsRules
@@ -300,6 +300,76 @@ class ReactionRecipe:
         """
         return self.__apply(struct, False, unique)
 
+def saveRecipeState(structures):
+    """
+    Return the state of the parts of the :class:`Molecule` objects
+    `structures` that can be modified by applying a reaction recipe to them
+    and generating the electronic states of the products: the labeled atoms
+    and their bonds, the radical atoms, and the connectivity values and
+    sorting labels of all atoms. The structures can be returned to this state
+    using :func:`restoreRecipeState`.
+    """
+    state = []; sorting = []
+    for struct in structures:
+        for atom in struct.atoms:
+            if atom.label != '':
+                bonds = [(bond, bond.order) for bond in atom.edges.itervalues()]
+                state.append((atom, atom.label, atom.atomType, atom.radicalElectrons, atom.spinMultiplicity, atom.lonePairs, atom.charge, atom.edges.copy(), bonds))
+            elif atom.radicalElectrons > 0:
+                state.append((atom, atom.label, atom.atomType, atom.radicalElectrons, atom.spinMultiplicity, atom.lonePairs, atom.charge, None, None))
+            sorting.append((atom, atom.connectivity1, atom.connectivity2, atom.connectivity3, atom.sortingLabel))
+    return state, sorting
+
+def restoreRecipeState(state):
+    """
+    Restore the structures whose state was saved by :func:`saveRecipeState`
+    to that state.
+    """
+    state, sorting = state
+    for atom, label, atomType, radicalElectrons, spinMultiplicity, lonePairs, charge, edges, bonds in state:
+        atom.label = label
+        atom.atomType = atomType
+        atom.radicalElectrons = radicalElectrons
+        atom.spinMultiplicity = spinMultiplicity
+        atom.lonePairs = lonePairs
+        atom.charge = charge
+        if edges is not None:
+            # Bonds are only formed or broken between labeled atoms, so
+            # restoring their edges also restores those of their neighbors
+            atom.edges.clear()
+            atom.edges.update(edges)
+            for bond, order in bonds:
+                bond.order = order
+    # Applying the recipe resets and updates the connectivity values of the
+    # atoms of the merged reactants
+    for atom, connectivity1, connectivity2, connectivity3, sortingLabel in sorting:
+        atom.connectivity1 = connectivity1
+        atom.connectivity2 = connectivity2
+        atom.connectivity3 = connectivity3
+        atom.sortingLabel = sortingLabel
+
+
+################################################################################
+
+def getDepositoryLabels(depositoryLabels):
+    """
+    Return the labels of the depositories to load for a kinetics family when
+    the given `depositoryLabels` are requested, as described in
+    :meth:`KineticsFamily.load`. A list of labels is updated in place.
+    """
+    if depositoryLabels == 'all':
+        return depositoryLabels
+    if not depositoryLabels:
+        # If depository labels is None or there are no depositories listed, then use the training
+        # depository and add them to the RMG rate rules by default:
+        depositoryLabels = ['training']
+    # If there are depository labels, load them in the order specified, but 
+    # append the training reactions unless the user specifically declares it not
+    # to be included with a '!training' flag
+    if '!training' not in depositoryLabels:
+        if 'training' not in depositoryLabels:
+            depositoryLabels.append('training')
+    return depositoryLabels
 
 ################################################################################
 
@@ -328,8 +398,18 @@ class KineticsFamily(Database):
     There are a few reaction families that are their own reverse (hydrogen
     abstraction and intramolecular hydrogen migration); for these
     `reverseTemplate` and `reverseRecipe` will both be ``None``.
+
+    The reaction-path degeneracies computed by :meth:`calculateDegeneracy` are
+    memoized per reaction structure, up to `degeneracyCacheSize` reactions.
     """
 
+    degeneracyCacheSize = 20000
+
+    # The attributes set by the two parts of a lazily loaded family
+    lazyGroupAttributes = ['name', 'reverse', 'forwardTemplate', 'forwardRecipe', 'reverseTemplate',
+                           'reverseRecipe', 'forbidden', 'ownReverse', 'groups']
+    lazyRuleAttributes = ['rules', 'depositories']
+
     def __init__(self,
                  entries=None,
                  top=None,
@@ -356,6 +436,7 @@ class KineticsFamily(Database):
         self.groups = None
         self.rules = None
         self.depositories = []
+        self.clearDegeneracyCache()
 
     def __repr__(self):
         return '<ReactionFamily "{0}">'.format(self.label)
@@ -515,7 +596,7 @@ class KineticsFamily(Database):
         
         ftemp.close()
     
-    def load(self, path, local_context=None, global_context=None, depositoryLabels=None):
+    def load(self, path, local_context=None, global_context=None, depositoryLabels=None, lazy=False):
         """
         Load a kinetics database from a file located at `path` on disk.
         
@@ -525,7 +606,66 @@ class KineticsFamily(Database):
         
         If depositoryLabels is None then load 'training' first then everything else.
         If depositoryLabels is not None then load in the order specified in depositoryLabels.
+
+        If `lazy` is ``True``, the files are not read yet. Instead, the groups,
+        template, recipe and forbidden structures are loaded the first time
+        one of them is used, and the rules and depositories are loaded the
+        first time either of them is used.
         """
+        self.clearDegeneracyCache()
+        depositoryLabels = getDepositoryLabels(depositoryLabels)
+
+        if not lazy:
+            self.__loadGroups(path, local_context, global_context)
+            self.__loadRules(path, local_context, global_context, depositoryLabels)
+            return
+
+        # Remove the attributes set by the files from the family, so that
+        # __getattr__() is called to load them when they are first used
+        path = os.path.abspath(path)
+        local_context = dict(local_context or {})
+        global_context = dict(global_context or {})
+        if depositoryLabels != 'all':
+            depositoryLabels = depositoryLabels[:]
+        groupAttributes = dict([(name, self.__dict__.pop(name)) for name in self.lazyGroupAttributes])
+        ruleAttributes = dict([(name, self.__dict__.pop(name)) for name in self.lazyRuleAttributes])
+        self._lazyGroups = (groupAttributes, path, local_context, global_context)
+        self._lazyRules = (ruleAttributes, path, local_context, global_context, depositoryLabels)
+
+    def __getattr__(self, name):
+        """
+        Load the part of a lazily loaded family that sets the attribute `name`,
+        as described in :meth:`load`, and return the attribute.
+        """
+        if name in self.lazyGroupAttributes and '_lazyGroups' in self.__dict__:
+            attributes, path, local_context, global_context = self.__dict__.pop('_lazyGroups')
+            self.__dict__.update(attributes)
+            self.__loadGroups(path, local_context, global_context)
+            return getattr(self, name)
+        elif name in self.lazyRuleAttributes and '_lazyRules' in self.__dict__:
+            attributes, path, local_context, global_context, depositoryLabels = self.__dict__.pop('_lazyRules')
+            self.__dict__.update(attributes)
+            self.__loadRules(path, local_context, global_context, depositoryLabels)
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def __getstate__(self):
+        """
+        A helper function used when pickling or copying a KineticsFamily
+        object. Any lazily loaded parts of the family are loaded first.
+        """
+        if '_lazyGroups' in self.__dict__:
+            getattr(self, 'groups')
+        if '_lazyRules' in self.__dict__:
+            getattr(self, 'rules')
+        return self.__dict__
+
+    def __loadGroups(self, path, local_context, global_context):
+        """
+        Load the groups, template, recipe and forbidden structures of the
+        family from the :file:`groups.py` file in the directory `path`.
+        """
+        self.clearDegeneracyCache()
         local_context['recipe'] = self.loadRecipe
         local_context['template'] = self.loadTemplate
         local_context['forbidden'] = self.loadForbidden
@@ -552,7 +692,13 @@ class KineticsFamily(Database):
             self.reverseRecipe = self.forwardRecipe.getReverse()
         
         self.groups.numReactants = len(self.forwardTemplate.reactants)
-            
+
+    def __loadRules(self, path, local_context, global_context, depositoryLabels):
+        """
+        Load the rules of the family from the :file:`rules.py` file in the
+        directory `path`, and the depositories with the given
+        `depositoryLabels` from the other files there.
+        """
         self.rules = KineticsRules(label='{0}/rules'.format(self.label))
         logging.debug("Loading kinetics family rules from {0}".format(os.path.join(path, 'rules.py')))
         self.rules.load(os.path.join(path, 'rules.py'), local_context, global_context)
@@ -574,18 +720,6 @@ class KineticsFamily(Database):
                         depository.load(fpath, local_context, global_context)
                         self.depositories.append(depository)
             return
-                    
-        if not depositoryLabels:
-            # If depository labels is None or there are no depositories listed, then use the training
-            # depository and add them to the RMG rate rules by default:
-            depositoryLabels = ['training']
-        if depositoryLabels:
-            # If there are depository labels, load them in the order specified, but 
-            # append the training reactions unless the user specifically declares it not
-            # to be included with a '!training' flag
-            if '!training' not in depositoryLabels:
-                if 'training' not in depositoryLabels:
-                    depositoryLabels.append('training')
             
         for name in depositoryLabels :
             if name == '!training':
@@ -600,9 +734,7 @@ class KineticsFamily(Database):
             logging.debug("Loading kinetics family depository from {0}".format(fpath))
             depository.load(fpath, local_context, global_context)
             self.depositories.append(depository)
-        
 
-            
     def loadTemplate(self, reactants, products, ownReverse=False):
         """
         Load information about the reaction template.
@@ -927,6 +1059,8 @@ class KineticsFamily(Database):
             except KeyError:
                 self.rules.entries[new_entry.label] = [new_entry]
             index += 1
+        
+        self.rules.clearEstimates()
     
     def getRootTemplate(self):
         """
@@ -976,23 +1110,72 @@ class KineticsFamily(Database):
         of the reactant structures must already be tagged with the appropriate
         labels. Returns a list of structures corresponding to the products
         after checking that the correct number of products was produced.
+
+        The reactant structures are not modified. Rather than copying
+        :class:`Molecule` reactants before applying the recipe, the recipe is
+        applied to the reactant atoms themselves, and only the products of a
+        successful application are copied before the reactants are restored.
+        """
+        if isinstance(reactantStructures[0], Group):
+            # Merge copies of the reactant structures so we don't modify the
+            # originals
+            reactantStructure = Group()
+            for s in reactantStructures:
+                reactantStructure = reactantStructure.merge(s.copy(deep=True))
+            productStructures = self.__applyRecipe(reactantStructure, forward, unique)
+        else:
+            state = saveRecipeState(reactantStructures)
+            try:
+                productStructures = self.__applyRecipe(self.__mergeReactants(reactantStructures), forward, unique)
+                if productStructures is not None:
+                    productStructures = [struct.copy(deep=True) for struct in productStructures]
+            finally:
+                restoreRecipeState(state)
+        if productStructures is None:
+            return None
+
+        for product in productStructures:
+            product.updateConnectivityValues()
+
+        # If product structures are Molecule objects, update their atom types
+        for struct in productStructures:
+            if isinstance(struct, Molecule):
+                struct.updateAtomTypes()
+
+        # Return the product structures
+        return productStructures
+
+    def __mergeReactants(self, reactantStructures):
+        """
+        Return a single :class:`Molecule` object containing the atoms of each
+        of the :class:`Molecule` objects `reactantStructures`. The atoms are
+        not copied, so modifying the merged structure modifies the reactants.
+        """
+        atoms = []
+        for index, struct in enumerate(reactantStructures):
+            # The same molecule may be given more than once (e.g. A + A), in
+            # which case each repeat needs its own atoms
+            for other in reactantStructures[:index]:
+                if struct is other:
+                    struct = struct.copy(deep=True)
+                    break
+            atoms.extend(struct.atoms)
+        return Molecule(atoms=atoms)
+
+    def __applyRecipe(self, reactantStructure, forward, unique):
+        """
+        Apply the recipe for this reaction family to `reactantStructure`, a
+        single structure containing all of the reactants, whose atoms must
+        already be tagged with the appropriate labels. The structure is
+        modified in place. Returns a list of the product structures, which
+        share their atoms with `reactantStructure`, or ``None`` if the wrong
+        number of products was produced.
         """
 
         # There is some hardcoding of reaction families in this function, so
         # we need the label of the reaction family for this
         label = self.label.lower()
 
-        # Merge reactant structures into single structure
-        # Also copy structures so we don't modify the originals
-        # Since the tagging has already occurred, both the reactants and the
-        # products will have tags
-        if isinstance(reactantStructures[0], Group):
-            reactantStructure = Group()
-        else:
-            reactantStructure = Molecule()
-        for s in reactantStructures:
-            reactantStructure = reactantStructure.merge(s.copy(deep=True))
-
         # Hardcoding of reaction family for radical recombination (colligation)
         # because the two reactants are identical, they have the same tags
         # In this case, we must change the labels from '*' and '*' to '*1' and
@@ -1055,8 +1238,6 @@ class KineticsFamily(Database):
 
         # Split product structure into multiple species if necessary
         productStructures = productStructure.split()
-        for product in productStructures:
-            product.updateConnectivityValues()
 
         # Make sure we've made the expected number of products
         if len(template.products) != len(productStructures):
@@ -1077,12 +1258,6 @@ class KineticsFamily(Database):
                 productStructures[1].containsLabeledAtom('*1'):
                 productStructures.reverse()
 
-        # If product structures are Molecule objects, update their atom types
-        for struct in productStructures:
-            if isinstance(struct, Molecule):
-                struct.updateAtomTypes()
-
-        # Return the product structures
         return productStructures
 
     def __generateProductStructures(self, reactantStructures, maps, forward, failsSpeciesConstraints=None):
@@ -1114,201 +1289,135 @@ class KineticsFamily(Database):
             if self.isMoleculeForbidden(struct):
                 raise ForbiddenStructureException()
 
-        # Generate the product structures by applying the forward reaction recipe
+        # Generate the product structures by applying the forward reaction
+        # recipe to the reactant atoms themselves; the products are only
+        # copied when generating their electronic states, once they have
+        # passed the species constraints, and the reactants are then restored
+        state = saveRecipeState(reactantStructures)
         try:
-            productStructures = self.applyRecipe(reactantStructures, forward=forward)
-            if not productStructures: return None
-        except InvalidActionError:
-#            logging.error('Unable to apply reaction recipe!')
-#            logging.error('Reaction family is {0} in {1} direction'.format(self.label, 'forward' if forward else 'reverse'))
-#            logging.error('Reactant structures are:')
-#            for struct in reactantStructures:
-#                logging.error(struct.toAdjacencyList())
-            # If unable to apply the reaction recipe, then return no product structures
-            return None
+            try:
+                productStructures = self.__applyRecipe(self.__mergeReactants(reactantStructures), forward, True)
+                if not productStructures: return None
+            except InvalidActionError:
+#                logging.error('Unable to apply reaction recipe!')
+#                logging.error('Reaction family is {0} in {1} direction'.format(self.label, 'forward' if forward else 'reverse'))
+#                logging.error('Reactant structures are:')
+#                for struct in reactantStructures:
+#                    logging.error(struct.toAdjacencyList())
+                # If unable to apply the reaction recipe, then return no product structures
+                return None
 
-        # If there are two product structures, place the one containing '*1' first
-        if len(productStructures) == 2:
-            if not productStructures[0].containsLabeledAtom('*1') and \
-                productStructures[1].containsLabeledAtom('*1'):
-                productStructures.reverse()
+            # Apply the generated species constraints (if given)
+            if failsSpeciesConstraints:
+                for struct in productStructures:
+                    if failsSpeciesConstraints(struct):
+                        raise ForbiddenStructureException() 
+
+            # Generate other possible electronic states
+            electronicStructuresList1 = self.__generateElectronicStates(productStructures[0])
+            electronicStructuresList2 = []
+            if len(productStructures) == 2:
+                electronicStructuresList2 = self.__generateElectronicStates(productStructures[1])
+        finally:
+            restoreRecipeState(state)
 
-        # Apply the generated species constraints (if given)
-        if failsSpeciesConstraints:
-            for struct in productStructures:
-                if failsSpeciesConstraints(struct):
-                    raise ForbiddenStructureException() 
+        if len(productStructures) == 2:
+            
+            for structa in electronicStructuresList1:
+                for structb in electronicStructuresList2:
+                    if not (self.isMoleculeForbidden(structa) or self.isMoleculeForbidden(structb)):
+                        productStructuresList.append([structa,structb])
+        elif len(productStructures) == 1:
+            
+            for structa in electronicStructuresList1:
+                if not (self.isMoleculeForbidden(structa)):
+                    productStructuresList.append([structa])
+                    
+        return productStructuresList
 
+    def __generateElectronicStates(self, struct):
+        """
+        Return a list of copies of the product structure `struct`, one for
+        each of its possible electronic states, as obtained by changing the
+        spin multiplicity of its radical atoms. The spin multiplicities of the
+        atoms of `struct` itself are modified in the process.
+        """
+        electronicStructures = []
+        structa = struct.copy(True)
+        structa.updateAtomTypes()
+        electronicStructures.append(structa)
+        atoms = struct.getRadicalAtoms()
         
-        # Generate other possible electronic states
-        electronicStructuresList1 = []
-        electronicStructuresList2 = []
-        
-        struct1 = productStructures[0]
-        struct1a = struct1.copy(True)
-        struct1a.updateAtomTypes()
-        electronicStructuresList1.append(struct1a)
-        atoms1 = struct1.getRadicalAtoms()
-        
-        for atom1 in atoms1:
+        for atom in atoms:
             
-            radical1 = atom1.radicalElectrons
-            spin1 = atom1.spinMultiplicity
+            radical = atom.radicalElectrons
+            spin = atom.spinMultiplicity
             
-            if atom1.label != '' and radical1 > 1 and radical1 < 4:
+            if atom.label != '' and radical > 1 and radical < 4:
                 
-                if radical1 == 2 and spin1 == 3:
-                    atom1.setSpinMultiplicity(1)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
-                elif radical1 == 2 and spin1 == 1:
-                    atom1.setSpinMultiplicity(3)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
-                elif radical1 == 3 and spin1 == 4:
-                    atom1.setSpinMultiplicity(2)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
-                elif radical1 == 3 and spin1 == 2:
-                    atom1.setSpinMultiplicity(4)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
+                if radical == 2 and spin == 3:
+                    atom.setSpinMultiplicity(1)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
+                elif radical == 2 and spin == 1:
+                    atom.setSpinMultiplicity(3)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
+                elif radical == 3 and spin == 4:
+                    atom.setSpinMultiplicity(2)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
+                elif radical == 3 and spin == 2:
+                    atom.setSpinMultiplicity(4)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
                 
-                for electronicStructures in electronicStructuresList1:
-                    if electronicStructures.isIsomorphic(struct1a):
+                for other in electronicStructures:
+                    if other.isIsomorphic(structa):
                         break
                 else:
-                    electronicStructuresList1.append(struct1a)
+                    electronicStructures.append(structa)
             
-            elif radical1 == 4:
+            elif radical == 4:
                 
-                if spin1 == 5:
-                    atom1.setSpinMultiplicity(3)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
+                if spin == 5:
+                    atom.setSpinMultiplicity(3)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
                 
-                    atom1.setSpinMultiplicity(1)
-                    struct1b = struct1.copy(True)
-                    struct1b.updateAtomTypes()
-                elif spin1 == 3:
-                    atom1.setSpinMultiplicity(5)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
+                    atom.setSpinMultiplicity(1)
+                    structb = struct.copy(True)
+                    structb.updateAtomTypes()
+                elif spin == 3:
+                    atom.setSpinMultiplicity(5)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
                 
-                    atom1.setSpinMultiplicity(1)
-                    struct1b = struct1.copy(True)
-                    struct1b.updateAtomTypes()
-                elif spin1 == 1:
-                    atom1.setSpinMultiplicity(5)
-                    struct1a = struct1.copy(True)
-                    struct1a.updateAtomTypes()
+                    atom.setSpinMultiplicity(1)
+                    structb = struct.copy(True)
+                    structb.updateAtomTypes()
+                elif spin == 1:
+                    atom.setSpinMultiplicity(5)
+                    structa = struct.copy(True)
+                    structa.updateAtomTypes()
                 
-                    atom1.setSpinMultiplicity(3)
-                    struct1b = struct1.copy(True)
-                    struct1b.updateAtomTypes()
+                    atom.setSpinMultiplicity(3)
+                    structb = struct.copy(True)
+                    structb.updateAtomTypes()
                     
-                for electronicStructures in electronicStructuresList1:
-                    if electronicStructures.isIsomorphic(struct1a):
+                for other in electronicStructures:
+                    if other.isIsomorphic(structa):
                         break
                 else:
-                    electronicStructuresList1.append(struct1a)
+                    electronicStructures.append(structa)
                     
-                for electronicStructures in electronicStructuresList1:
-                    if electronicStructures.isIsomorphic(struct1b):
+                for other in electronicStructures:
+                    if other.isIsomorphic(structb):
                         break
                 else:
-                    electronicStructuresList1.append(struct1b)
-                            
-        if len(productStructures) == 2:
-        
-            struct2 = productStructures[1]
-            struct2a = struct2.copy(True)
-            struct2a.updateAtomTypes()
-            electronicStructuresList2.append(struct2a)
-            atoms2 = struct2.getRadicalAtoms()
-        
-            for atom2 in atoms2:
-            
-                radical2 = atom2.radicalElectrons
-                spin2 = atom2.spinMultiplicity
-            
-                if atom2.label != '' and radical2 > 1 and radical2 < 4:
-                    
-                    if radical2 == 2 and spin2 == 3:
-                        atom2.setSpinMultiplicity(1)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                    elif radical2 == 2 and spin2 == 1:
-                        atom2.setSpinMultiplicity(3)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                    elif radical2 == 3 and spin2 == 4:
-                        atom2.setSpinMultiplicity(2)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                    elif radical2 == 3 and spin2 == 2:
-                        atom2.setSpinMultiplicity(4)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                
-                    for electronicStructures in electronicStructuresList2:
-                        if electronicStructures.isIsomorphic(struct2a):
-                            break
-                    else:
-                        electronicStructuresList2.append(struct2a)
-            
-                elif radical2 == 4:
-                
-                    if spin2 == 5:
-                        atom2.setSpinMultiplicity(3)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                
-                        atom2.setSpinMultiplicity(1)
-                        struct2b = struct2.copy(True)
-                        struct2b.updateAtomTypes()
-                    elif spin2 == 3:
-                        atom2.setSpinMultiplicity(5)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                
-                        atom2.setSpinMultiplicity(1)
-                        struct2b = struct2.copy(True)
-                        struct2b.updateAtomTypes()
-                    elif spin2 == 1:
-                        atom2.setSpinMultiplicity(5)
-                        struct2a = struct2.copy(True)
-                        struct2a.updateAtomTypes()
-                
-                        atom2.setSpinMultiplicity(3)
-                        struct2b = struct2.copy(True)
-                        struct2b.updateAtomTypes()
-                    
-                    for electronicStructures in electronicStructuresList2:
-                        if electronicStructures.isIsomorphic(struct2a):
-                            break
-                    else:
-                        electronicStructuresList2.append(struct2a)
-                    
-                    for electronicStructures in electronicStructuresList2:
-                        if electronicStructures.isIsomorphic(struct2b):
-                            break
-                    else:
-                        electronicStructuresList2.append(struct2b)
-        
-        if len(productStructures) == 2:
-            
-            for structa in electronicStructuresList1:
-                for structb in electronicStructuresList2:
-                    if not (self.isMoleculeForbidden(structa) or self.isMoleculeForbidden(structb)):
-                        productStructuresList.append([structa,structb])
-        elif len(productStructures) == 1:
-            
-            for structa in electronicStructuresList1:
-                if not (self.isMoleculeForbidden(structa)):
-                    productStructuresList.append([structa])
-                    
-        return productStructuresList
+                    electronicStructures.append(structb)
+
+        return electronicStructures
 
     def isMoleculeForbidden(self, molecule):
         """
@@ -1423,10 +1532,75 @@ class KineticsFamily(Database):
 
         return reactionList
     
+    def clearDegeneracyCache(self):
+        """
+        Discard all memoized results of :meth:`calculateDegeneracy`.
+        """
+        self._degeneracyCache = {}
+        self._degeneracyCacheCount = 0
+
     def calculateDegeneracy(self, reaction):
         """
         For a `reaction` given in the direction in which the kinetics are
         defined, compute the reaction-path degeneracy.
+
+        This requires generating the reactions of the reactants in the forward
+        direction, so the result is memoized per reaction structure (ignoring
+        atom labels, which do not affect the degeneracy). Reactions found
+        repeatedly in the reverse direction then only pay for this once.
+        """
+        for molecule in reaction.reactants + reaction.products:
+            if not isinstance(molecule, Molecule):
+                return self.__calculateDegeneracy(reaction)
+        
+        key = (tuple(sorted([reactant.getFingerprint() for reactant in reaction.reactants])),
+               tuple(sorted([product.getFingerprint() for product in reaction.products])))
+        bucket = self._degeneracyCache.get(key)
+        if bucket is not None:
+            for reactants, products, degeneracy in bucket:
+                if self.__isSameMoleculeList(reaction.reactants, reactants) and self.__isSameMoleculeList(reaction.products, products):
+                    return degeneracy
+        else:
+            bucket = []
+            self._degeneracyCache[key] = bucket
+        
+        degeneracy = self.__calculateDegeneracy(reaction)
+        
+        if self._degeneracyCacheCount >= self.degeneracyCacheSize:
+            self.clearDegeneracyCache()
+            bucket = []
+            self._degeneracyCache[key] = bucket
+        bucket.append((
+            [reactant.copy(deep=True) for reactant in reaction.reactants],
+            [product.copy(deep=True) for product in reaction.products],
+            degeneracy,
+        ))
+        self._degeneracyCacheCount += 1
+        return degeneracy
+
+    def __isSameMoleculeList(self, molecules1, molecules2):
+        """
+        Return ``True`` if the lists of :class:`Molecule` objects `molecules1`
+        and `molecules2` contain the same structures, in any order, or
+        ``False`` otherwise.
+        """
+        if len(molecules1) != len(molecules2):
+            return False
+        molecules2 = molecules2[:]
+        for molecule1 in molecules1:
+            for molecule2 in molecules2:
+                if molecule1.isIsomorphic(molecule2):
+                    molecules2.remove(molecule2)
+                    break
+            else:
+                return False
+        return True
+
+    def __calculateDegeneracy(self, reaction):
+        """
+        For a `reaction` given in the direction in which the kinetics are
+        defined, compute the reaction-path degeneracy, without consulting the
+        memo.
         """
         reactions = self.__generateReactions(reaction.reactants, products=reaction.products, forward=True)
         if len(reactions) != 1:
@@ -1574,6 +1748,13 @@ class KineticsFamily(Database):
                 if match: 
                     rxnList.append(reaction)
             
+            # All of the remaining reactions give the requested products, so
+            # they are duplicates of the first one; combine them here rather
+            # than comparing every pair of them below
+            if len(rxnList) > 1:
+                rxnList[0].degeneracy = sum([reaction.degeneracy for reaction in rxnList])
+                rxnList = rxnList[:1]
+            
         # The reaction list may contain duplicates of the same reaction
         # These duplicates should be combined (by increasing the degeneracy of
         # one of the copies and removing the others)
@@ -1773,7 +1954,7 @@ class KineticsFamily(Database):
         direction.
         """
         kineticsList = []
-        entries = depository.entries.values()
+        entries = getCandidateReactionEntries(depository, reaction.reactants, reaction.products)
         for entry in entries:
             if reaction.isIsomorphic(entry.item):
                 kineticsList.append([deepcopy(entry.data), entry, reaction.isIsomorphic(entry.item, eitherDirection=False)])
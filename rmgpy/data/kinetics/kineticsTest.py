@@ -7,6 +7,58 @@ from rmgpy.data.kinetics import *
 from rmgpy.data.base import DatabaseError
 ###################################################
 
+def writeTestFamily(path):
+    """
+    Write the files of a small R_Addition_MultipleBond family to the
+    directory `path`.
+    """
+    with open(os.path.join(path, 'groups.py'), 'w') as f:
+        f.write('''
+name = "R_Addition_MultipleBond/groups"
+template(reactants=["Cd_R", "Y_1centerrad"], products=["R_R"], ownReverse=False)
+reverse = "Beta_Scission"
+recipe(actions=[
+    ['CHANGE_BOND', '*1', -1, '*2'],
+    ['FORM_BOND', '*1', 'S', '*3'],
+    ['GAIN_RADICAL', '*2', '1'],
+    ['LOSE_RADICAL', '*3', '1'],
+])
+entry(index=1, label="Cd_R", group="1 *1 Cd 0 0 {2,D}\\n2 *2 Cd 0 0 {1,D}", kinetics=None)
+entry(index=2, label="Y_1centerrad", group="1 *3 R 1 0", kinetics=None)
+tree(\"\"\"
+L1: Cd_R
+L1: Y_1centerrad
+\"\"\")
+''')
+    with open(os.path.join(path, 'rules.py'), 'w') as f:
+        f.write('''
+name = "R_Addition_MultipleBond/rules"
+entry(index=1, label="Cd_R;Y_1centerrad", group1="1 *1 Cd 0 0 {2,D}\\n2 *2 Cd 0 0 {1,D}", group2="1 *3 R 1 0",
+      kinetics=ArrheniusEP(A=(1e13,'cm^3/(mol*s)'), n=0, alpha=0, E0=(5,'kcal/mol')), rank=5)
+''')
+    with open(os.path.join(path, 'training.py'), 'w') as f:
+        f.write('''
+name = "R_Addition_MultipleBond/training"
+entry(index=1, label="C2H4 + H <=> C2H5", reactant1="1 C 0 0 {2,D}\\n2 C 0 0 {1,D}", reactant2="1 H 1 0",
+      product1="1 C 1 0 {2,S}\\n2 C 0 0 {1,S}", kinetics=Arrhenius(A=(1e13,'cm^3/(mol*s)'), n=0, Ea=(2,'kcal/mol'), T0=(1,'K')), rank=3)
+''')
+
+def writeTestLibraries(path):
+    """
+    Write two small kinetics libraries to the directory `path`.
+    """
+    for name, reactant, product in [('H2', 'H\n1 H 1 0', 'H2\n1 H 0 0 {2,S}\n2 H 0 0 {1,S}'),
+                                    ('CH4', 'CH3\n1 C 1 0 {2,S} {3,S} {4,S}\n2 H 0 0 {1,S}\n3 H 0 0 {1,S}\n4 H 0 0 {1,S}',
+                                     'CH4\n1 C 0 0 {2,S} {3,S} {4,S} {5,S}\n2 H 0 0 {1,S}\n3 H 0 0 {1,S}\n4 H 0 0 {1,S}\n5 H 0 0 {1,S}')]:
+        with open(os.path.join(path, name + '.py'), 'w') as f:
+            f.write('''
+name = "{0}"
+entry(index=1, reactant1="""{1}""", reactant2="""H\n1 H 1 0""", product1="""{2}""",
+      kinetics=Arrhenius(A=(1e13,'cm^3/(mol*s)'), n=0, Ea=(0,'kcal/mol'), T0=(1,'K')))
+'''.format(name, reactant, product))
+
+###################################################
+
 class TestKineticsDatabase(unittest.TestCase):
     
     def testLoadFamilies(self):
@@ -23,4 +75,331 @@ class TestKineticsDatabase(unittest.TestCase):
         with self.assertRaises(DatabaseError):
             database.loadFamilies(path, families=['fake_family'])
         with self.assertRaises(DatabaseError):
-            database.loadFamilies(path, families=[])
\ No newline at end of file
+            database.loadFamilies(path, families=[])
+
+    def testLoadInParallel(self):
+        """
+        Test that loading families and libraries with a pool of worker
+        processes gives the same database as loading them serially.
+        """
+        import multiprocessing
+        import shutil
+        import tempfile
+        path = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(path, 'families', 'R_Addition_MultipleBond'))
+            writeTestFamily(os.path.join(path, 'families', 'R_Addition_MultipleBond'))
+            os.makedirs(os.path.join(path, 'libraries'))
+            writeTestLibraries(os.path.join(path, 'libraries'))
+
+            serial = KineticsDatabase()
+            serial.loadFamilies(os.path.join(path, 'families'), families=['R_Addition_MultipleBond'], lazy=False)
+            serial.loadLibraries(os.path.join(path, 'libraries'))
+            parallel = KineticsDatabase()
+            pool = multiprocessing.Pool(2)
+            try:
+                parallel.loadFamilies(os.path.join(path, 'families'), families=['R_Addition_MultipleBond'], pool=pool)
+                parallel.loadLibraries(os.path.join(path, 'libraries'), pool=pool)
+            finally:
+                pool.close()
+                pool.join()
+
+            self.assertEqual(parallel.families.keys(), serial.families.keys())
+            family0 = serial.families['R_Addition_MultipleBond']
+            family = parallel.families['R_Addition_MultipleBond']
+            self.assertEqual(sorted(family.__dict__.keys()), sorted(family0.__dict__.keys()))
+            self.assertEqual(family.groups.entries.keys(), family0.groups.entries.keys())
+            self.assertEqual([entry.label for entry in family.forwardTemplate.products], [entry.label for entry in family0.forwardTemplate.products])
+            self.assertEqual(family.rules.entries.keys(), family0.rules.entries.keys())
+            self.assertEqual([depository.label for depository in family.depositories], [depository.label for depository in family0.depositories])
+
+            self.assertEqual(parallel.libraryOrder, serial.libraryOrder)
+            self.assertEqual(sorted(parallel.libraries.keys()), ['CH4', 'H2'])
+            for label, library0 in serial.libraries.iteritems():
+                library = parallel.libraries[label]
+                self.assertEqual(library.entries.keys(), library0.entries.keys())
+                for entry, entry0 in zip(library.entries.values(), library0.entries.values()):
+                    self.assertTrue(entry.item.isIsomorphic(entry0.item))
+                    self.assertEqual(repr(entry.data), repr(entry0.data))
+        finally:
+            shutil.rmtree(path)
+
+class TestKineticsFamily(unittest.TestCase):
+
+    def testLoadLazily(self):
+        """
+        Test that a lazily loaded family reads its files when first used and
+        ends up the same as an eagerly loaded family.
+        """
+        import shutil
+        import tempfile
+        path = tempfile.mkdtemp()
+        try:
+            writeTestFamily(path)
+            database = KineticsDatabase()
+            eager = KineticsFamily(label='R_Addition_MultipleBond')
+            eager.load(path, database.local_context, database.global_context)
+            lazy = KineticsFamily(label='R_Addition_MultipleBond')
+            lazy.load(path, database.local_context, database.global_context, lazy=True)
+            self.assertTrue('groups' not in lazy.__dict__ and 'rules' not in lazy.__dict__)
+
+            # Using the groups only loads the groups
+            self.assertEqual(lazy.groups.entries.keys(), eager.groups.entries.keys())
+            self.assertTrue('rules' not in lazy.__dict__)
+            self.assertEqual(lazy.reverse, 'Beta_Scission')
+            self.assertEqual([entry.label for entry in lazy.forwardTemplate.reactants], ['Cd_R', 'Y_1centerrad'])
+            self.assertEqual([entry.label for entry in lazy.forwardTemplate.products], [entry.label for entry in eager.forwardTemplate.products])
+            self.assertEqual(len(lazy.forwardRecipe.actions), len(eager.forwardRecipe.actions))
+
+            self.assertEqual(lazy.rules.entries.keys(), eager.rules.entries.keys())
+            self.assertEqual([depository.label for depository in lazy.depositories], ['R_Addition_MultipleBond/training'])
+            self.assertEqual(len(lazy.depositories[0].entries), 1)
+            self.assertTrue('_lazyGroups' not in lazy.__dict__ and '_lazyRules' not in lazy.__dict__)
+            self.assertEqual(sorted(lazy.__dict__.keys()), sorted(eager.__dict__.keys()))
+
+            # Pickling a lazily loaded family loads it first
+            import cPickle
+            lazy = KineticsFamily(label='R_Addition_MultipleBond')
+            lazy.load(path, database.local_context, database.global_context, lazy=True)
+            family = cPickle.loads(cPickle.dumps(lazy, -1))
+            self.assertEqual(family.rules.entries.keys(), eager.rules.entries.keys())
+            self.assertEqual(family.groups.entries.keys(), eager.groups.entries.keys())
+        finally:
+            shutil.rmtree(path)
+
+    def testEstimateKineticsUsingRateRules(self):
+        """
+        Test that rate rule estimates are memoized per template, scaled by
+        the degeneracy of each reaction, and discarded when rules are added.
+        """
+        import shutil
+        import tempfile
+        path = tempfile.mkdtemp()
+        try:
+            writeTestFamily(path)
+            database = KineticsDatabase()
+            family = KineticsFamily(label='R_Addition_MultipleBond')
+            family.load(path, database.local_context, database.global_context)
+            template = [family.groups.entries['Cd_R'], family.groups.entries['Y_1centerrad']]
+
+            kinetics1 = family.estimateKineticsUsingRateRules(template, degeneracy=2)
+            self.assertEqual(kinetics1.comment, 'Exact match found for rate rule (Cd_R,Y_1centerrad)')
+            self.assertAlmostEqual(kinetics1.A.value_si, 2e7, delta=1e-3)
+            kinetics1.comment += ' (modified)'
+            kinetics2 = family.estimateKineticsUsingRateRules(template, degeneracy=1)
+            self.assertFalse(kinetics2 is kinetics1)
+            self.assertEqual(kinetics2.comment, 'Exact match found for rate rule (Cd_R,Y_1centerrad)')
+            self.assertAlmostEqual(kinetics2.A.value_si, 1e7, delta=1e-3)
+            self.assertAlmostEqual(kinetics2.E0.value_si, 5 * 4184., places=6)
+
+            # Add a better ranked rule for the template
+            from rmgpy.data.base import Entry
+            from rmgpy.kinetics import ArrheniusEP
+            entry = family.rules.entries['Cd_R;Y_1centerrad'][0]
+            family.rules.entries['Cd_R;Y_1centerrad'].append(Entry(
+                index = 2,
+                label = 'Cd_R;Y_1centerrad',
+                item = entry.item,
+                data = ArrheniusEP(A=(1e13,'cm^3/(mol*s)'), n=0, alpha=0, E0=(2,'kcal/mol')),
+                rank = 3,
+            ))
+            family.rules.clearEstimates()
+            kinetics3 = family.estimateKineticsUsingRateRules(template, degeneracy=1)
+            self.assertAlmostEqual(kinetics3.E0.value_si, 2 * 4184., places=6)
+        finally:
+            shutil.rmtree(path)
+
+    def testCalculateDegeneracy(self):
+        """
+        Test that the reaction-path degeneracy of reactions generated in the
+        reverse direction matches that of the same reactions generated in the
+        forward direction, and that it is memoized per reaction structure.
+        """
+        import shutil
+        import tempfile
+        import rmgpy.data.rmg
+        from rmgpy.data.base import ForbiddenStructures
+        from rmgpy.molecule import Molecule
+        from rmgpy.reaction import Reaction
+        path = tempfile.mkdtemp()
+        database0 = rmgpy.data.rmg.database
+        try:
+            writeTestFamily(path)
+            rmgpy.data.rmg.database = None
+            rmgpy.data.rmg.RMGDatabase().forbiddenStructures = ForbiddenStructures()
+            database = KineticsDatabase()
+            family = KineticsFamily(label='R_Addition_MultipleBond')
+            family.load(path, database.local_context, database.global_context)
+
+            hydrogen = Molecule().fromAdjacencyList("1 H 1 0")
+            ethylene = Molecule().fromAdjacencyList("1 C 0 0 {2,D}\n2 C 0 0 {1,D}", saturateH=True)
+            ethyl = Molecule().fromAdjacencyList("1 C 1 0 {2,S}\n2 C 0 0 {1,S}", saturateH=True)
+            allyl = Molecule().fromAdjacencyList("1 C 0 0 {2,D}\n2 C 0 0 {1,D} {3,S}\n3 C 1 0 {2,S}", saturateH=True)
+            hexenediyl = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,D}
+2 C 0 0 {1,D} {3,S}
+3 C 0 0 {2,S} {4,S}
+4 C 0 0 {3,S} {5,S}
+5 C 1 0 {4,S} {6,S}
+6 C 1 0 {5,S}
+""", saturateH=True)
+
+            # Reverse reactions get the degeneracy of the forward reaction,
+            # including the halving for identical reactants, whether or not
+            # it was memoized
+            for reactants, product, degeneracy in [([ethylene, hydrogen], ethyl, 2), ([allyl, allyl.copy(deep=True)], hexenediyl, 1)]:
+                forward = family.generateReactions(reactants)
+                forward = [reaction for reaction in forward if reaction.products[0].molecule[0].isIsomorphic(product)]
+                self.assertEqual(len(forward), 1)
+                self.assertEqual(forward[0].degeneracy, degeneracy)
+                for i in range(2):
+                    reverse = family.generateReactions([product])
+                    reverse = [reaction for reaction in reverse if reaction.reactants[0].molecule[0].isIsomorphic(reactants[0])]
+                    self.assertEqual(len(reverse), 1)
+                    self.assertEqual(reverse[0].degeneracy, degeneracy)
+            self.assertEqual(family._degeneracyCacheCount, 3)
+
+            # Memoized results are only used for isomorphic reactions
+            propene = Molecule().fromAdjacencyList("1 C 0 0 {2,D}\n2 C 0 0 {1,D} {3,S}\n3 C 0 0 {2,S}", saturateH=True)
+            propyl = Molecule().fromAdjacencyList("1 C 1 0 {2,S}\n2 C 0 0 {1,S} {3,S}\n3 C 0 0 {2,S}", saturateH=True)
+            isopropyl = Molecule().fromAdjacencyList("1 C 0 0 {2,S}\n2 C 1 0 {1,S} {3,S}\n3 C 0 0 {2,S}", saturateH=True)
+            family.clearDegeneracyCache()
+            self.assertEqual(family.calculateDegeneracy(Reaction(reactants=[propene, hydrogen], products=[isopropyl])), 1)
+            bucket = family._degeneracyCache.values()[0]
+            bucket[0] = bucket[0][:2] + (3,)
+            self.assertEqual(family.calculateDegeneracy(Reaction(reactants=[propene, hydrogen], products=[propyl])), 1)
+            self.assertEqual(family.calculateDegeneracy(Reaction(reactants=[hydrogen, propene.copy(deep=True)], products=[isopropyl.copy(deep=True)])), 3)
+            self.assertEqual(len(family._degeneracyCache), 1)
+            self.assertEqual(family._degeneracyCacheCount, 2)
+
+            # The memo is discarded when it is full
+            family.degeneracyCacheSize = 2
+            self.assertEqual(family.calculateDegeneracy(Reaction(reactants=[ethylene, hydrogen], products=[ethyl])), 2)
+            self.assertEqual(len(family._degeneracyCache), 1)
+            self.assertEqual(family._degeneracyCacheCount, 1)
+        finally:
+            rmgpy.data.rmg.database = database0
+            shutil.rmtree(path)
+
+    def testApplyRecipe(self):
+        """
+        Test that applying a reaction recipe returns new product structures
+        and leaves the reactant structures unchanged.
+        """
+        from rmgpy.molecule import Molecule
+        from rmgpy.reaction import Reaction
+        recipe = ReactionRecipe(actions=[
+            ['CHANGE_BOND', '*1', -1, '*2'],
+            ['FORM_BOND', '*1', 'S', '*3'],
+            ['GAIN_RADICAL', '*2', '1'],
+            ['LOSE_RADICAL', '*3', '1'],
+        ])
+        family = KineticsFamily(label='R_Addition_MultipleBond',
+                                forwardTemplate=Reaction(reactants=['Cd_R', 'Y_1centerrad'], products=['R_R']),
+                                forwardRecipe=recipe)
+        ethylene = Molecule().fromAdjacencyList("""
+1 *1 C 0 0 {2,D} {3,S} {4,S}
+2 *2 C 0 0 {1,D} {5,S} {6,S}
+3    H 0 0 {1,S}
+4    H 0 0 {1,S}
+5    H 0 0 {2,S}
+6    H 0 0 {2,S}
+""")
+        hydrogen = Molecule().fromAdjacencyList("1 *3 H 1 0")
+        ethyl = Molecule().fromAdjacencyList("""
+1 C 1 0 {2,S} {3,S} {4,S}
+2 C 0 0 {1,S} {5,S} {6,S} {7,S}
+3 H 0 0 {1,S}
+4 H 0 0 {1,S}
+5 H 0 0 {2,S}
+6 H 0 0 {2,S}
+7 H 0 0 {2,S}
+""")
+        ethylene.sortVertices()
+        hydrogen.sortVertices()
+        adjlists = [ethylene.toAdjacencyList(), hydrogen.toAdjacencyList()]
+        atomTypes = [atom.atomType for atom in ethylene.atoms + hydrogen.atoms]
+        sorting = [(atom.connectivity1, atom.connectivity2, atom.connectivity3, atom.sortingLabel) for atom in ethylene.atoms + hydrogen.atoms]
+        self.assertEqual(sorted(sorting[:2]), [(3, 5, 11, 0), (3, 5, 11, 1)])
+
+        products = family.applyRecipe([ethylene, hydrogen])
+        self.assertEqual(len(products), 1)
+        self.assertTrue(products[0].isIsomorphic(ethyl))
+        for atom in products[0].atoms:
+            self.assertFalse(atom in ethylene.atoms or atom in hydrogen.atoms)
+        self.assertEqual([ethylene.toAdjacencyList(), hydrogen.toAdjacencyList()], adjlists)
+        self.assertEqual([atom.atomType for atom in ethylene.atoms + hydrogen.atoms], atomTypes)
+        self.assertEqual([(atom.connectivity1, atom.connectivity2, atom.connectivity3, atom.sortingLabel) for atom in ethylene.atoms + hydrogen.atoms], sorting)
+
+        # Applying the recipe with the wrong number of products fails without
+        # modifying the reactants
+        family.forwardTemplate.products.append('R')
+        self.assertIsNone(family.applyRecipe([ethylene, hydrogen]))
+        self.assertEqual([ethylene.toAdjacencyList(), hydrogen.toAdjacencyList()], adjlists)
+        self.assertEqual([(atom.connectivity1, atom.connectivity2, atom.connectivity3, atom.sortingLabel) for atom in ethylene.atoms + hydrogen.atoms], sorting)
+
+class TestKineticsLibrary(unittest.TestCase):
+
+    def setUp(self):
+        """
+        A method called before each unit test in this class.
+        """
+        from rmgpy.data.base import Entry
+        from rmgpy.molecule import Molecule
+        from rmgpy.species import Species
+        from rmgpy.reaction import Reaction
+        self.molecules = {}
+        for label, adjlist in [('H', '1 H 1 0'), ('H2', '1 H 0 0 {2,S}\n2 H 0 0 {1,S}'),
+                               ('CH3', '1 C 1 0'), ('CH4', '1 C 0 0'),
+                               ('C2H5', '1 C 1 0 {2,S}\n2 C 0 0 {1,S}'), ('C2H6', '1 C 0 0 {2,S}\n2 C 0 0 {1,S}')]:
+            self.molecules[label] = Molecule().fromAdjacencyList(adjlist, saturateH=True)
+        self.library = KineticsLibrary(label='test')
+        for index, (reactants, products) in enumerate([
+                (['CH4', 'H'], ['CH3', 'H2']),
+                (['CH3', 'CH3'], ['C2H6']),
+                (['C2H6', 'H'], ['C2H5', 'H2']),
+                (['C2H5', 'H'], ['C2H6']),
+                (['H2', 'CH3'], ['CH4', 'H']),
+                (['H', 'H'], ['H2']),
+            ]):
+            reaction = Reaction(
+                reactants = [Species(label=label, molecule=[self.molecules[label].copy(deep=True)]) for label in reactants],
+                products = [Species(label=label, molecule=[self.molecules[label].copy(deep=True)]) for label in products],
+            )
+            label = ' <=> '.join([' + '.join(reactants), ' + '.join(products)])
+            self.library.entries[label] = Entry(index=index+1, label=label, item=reaction)
+
+    def testGenerateReactionsFromLibrary(self):
+        """
+        Test that the indexed library search finds the same reactions, in
+        the same order, as checking every library entry.
+        """
+        database = KineticsDatabase()
+        queries = [[label] for label in self.molecules] + [[label1, label2] for label1 in self.molecules for label2 in self.molecules]
+        for labels in queries:
+            reactants = [self.molecules[label] for label in labels]
+            expected = [entry for entry in self.library.entries.values() if entry.item.matchesMolecules(reactants)]
+            reactions = database.generateReactionsFromLibrary(reactants, None, self.library)
+            self.assertEqual([reaction.entry for reaction in reactions], expected)
+        reactions = database.generateReactionsFromLibrary([self.molecules['H'], self.molecules['CH4']], None, self.library)
+        self.assertEqual([reaction.entry.index for reaction in reactions], [1, 5])
+
+    def testGetCandidateReactionEntries(self):
+        """
+        Test that getCandidateReactionEntries() finds every entry matching a
+        reaction in either direction, and is updated when entries are added.
+        """
+        from rmgpy.data.base import Entry
+        from rmgpy.reaction import Reaction
+        from rmgpy.data.kinetics.common import getCandidateReactionEntries
+        reaction = Reaction(reactants=[self.molecules['H'], self.molecules['CH4']], products=[self.molecules['H2'], self.molecules['CH3']])
+        candidates = getCandidateReactionEntries(self.library, reaction.reactants, reaction.products)
+        self.assertEqual([entry.index for entry in candidates], [1, 5])
+        self.assertTrue(all([entry.item.isIsomorphic(reaction) for entry in candidates]))
+
+        item = Reaction(reactants=[self.molecules['CH3'].copy(deep=True), self.molecules['H2'].copy(deep=True)],
+                        products=[self.molecules['CH4'].copy(deep=True), self.molecules['H'].copy(deep=True)])
+        self.library.entries['new'] = Entry(index=7, label='new', item=item)
+        self.library.entries['other'] = Entry(index=8, label='other', item='not a reaction')
+        candidates = getCandidateReactionEntries(self.library, reaction.reactants, reaction.products)
+        self.assertEqual([entry.index for entry in candidates], [1, 5, 7, 8])
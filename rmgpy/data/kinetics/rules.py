@@ -58,10 +58,17 @@ from .common import KineticsError, UndeterminableKineticsError, saveEntry, \
 class KineticsRules(Database):
     """
     A class for working with a set of "rate rules" for a RMG kinetics family. 
+    
+    The estimates made by :meth:`estimateKinetics` are memoized per template,
+    since many reactions share the same template. The memo is cleared when
+    rules are loaded or averaged up; code that adds rules to :attr:`entries`
+    directly must call :meth:`clearEstimates`.
     """
     
     def __init__(self, label='', name='', shortDesc='', longDesc=''):
         Database.__init__(self, label=label, name=name, shortDesc=shortDesc, longDesc=longDesc)
+        # The kinetics estimated for each template, from estimateKinetics()
+        self._estimates = {}
 
     def __repr__(self):
         return '<KineticsRules "{0}">'.format(self.label)
@@ -107,6 +114,7 @@ class KineticsRules(Database):
                 reactants.append(Group().fromAdjacencyList(group4))
         
         reaction = Reaction(reactants=reactants, products=[])
+        self._estimates.clear()
             
         entry = Entry(
             index = index,
@@ -195,6 +203,7 @@ class KineticsRules(Database):
         entries = self.parseOldLibrary(os.path.join(path, 'rateLibrary.txt'), numParameters=10, numLabels=numLabels)
         
         self.entries = {}
+        self._estimates.clear()
         for entry in entries:
             index, label, data, shortDesc = entry
             if isinstance(data, (str,unicode)):
@@ -481,6 +490,7 @@ class KineticsRules(Database):
                 rank = 10, # Indicates this is an averaged estimate
             )
             self.entries[entry.label] = [entry]
+            self._estimates.clear()
             alreadyDone[rootLabel] = entry.data
             return entry.data
             
@@ -524,10 +534,32 @@ class KineticsRules(Database):
         )
         return averagedKinetics
 
+    def clearEstimates(self):
+        """
+        Discard the kinetics memoized by :meth:`estimateKinetics`. This must
+        be called whenever the rate rules are changed.
+        """
+        self._estimates.clear()
+
     def estimateKinetics(self, template, degeneracy=1):
         """
         Determine the appropriate kinetics for a reaction with the given
-        `template` using rate rules.
+        `template` using rate rules. The kinetics for each template are only
+        estimated once; each call returns a new copy, scaled by `degeneracy`.
+        """
+        key = tuple([group.label for group in template])
+        try:
+            kinetics = self._estimates[key]
+        except KeyError:
+            kinetics = self._estimates[key] = self.__estimateKinetics(template)
+        kinetics = deepcopy(kinetics)
+        kinetics.A.value_si *= degeneracy
+        return kinetics
+
+    def __estimateKinetics(self, template):
+        """
+        Estimate the kinetics for a reaction with the given `template` using
+        rate rules, without accounting for reaction path degeneracy.
         """
         def getTemplateLabel(template):
             # Get string format of the template in the form "(leaf1,leaf2)"
@@ -564,7 +596,6 @@ class KineticsRules(Database):
                     )
                 
                 kinetics.comment +=  ' for rate rule ' + originalLeaves
-                kinetics.A.value_si *= degeneracy
 
                 return kinetics
             
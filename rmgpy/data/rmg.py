@@ -33,8 +33,13 @@ This module contains the :class:`RMGDatabase` class, which is the primary class
 for working with the RMG database.
 """
 
+import os
 import os.path
+import logging
+import hashlib
+import cPickle
 
+import rmgpy
 from base import ForbiddenStructures
 from thermo import ThermoDatabase
 from transport import TransportDatabase
@@ -45,6 +50,54 @@ from solvation import SolvationDatabase
 # Module-level variable to store the (only) instance of RMGDatabase in use.
 database = None
 
+# The version of the database cache format; increment this to invalidate all
+# existing caches whenever the way the database is loaded or pickled changes
+CACHE_VERSION = 1
+
+################################################################################
+
+def getDatabaseCacheKeys(path, options):
+    """
+    Return a pair of keys identifying the RMG database loaded from the given
+    `path` on disk with the given `options`, a dict of the arguments passed
+    to :meth:`RMGDatabase.load`. The first key is a hash of the path and
+    options only. The second is a hash of the contents of every file in the
+    database, together with the sizes and modification times of the RMG
+    source files, so it changes whenever any of them is modified.
+    """
+    optionsHash = hashlib.md5()
+    optionsHash.update(repr((CACHE_VERSION, os.path.abspath(path), sorted(options.items()))))
+
+    contentHash = hashlib.md5()
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted([d for d in dirs if not d.startswith('.')])
+        for name in sorted(files):
+            if name.startswith('.') or name.endswith('.pyc'):
+                continue
+            filePath = os.path.join(root, name)
+            with open(filePath, 'rb') as f:
+                contents = f.read()
+            contentHash.update('{0}\0{1}\0'.format(os.path.relpath(filePath, path), hashlib.md5(contents).hexdigest()))
+    for root, dirs, files in os.walk(os.path.dirname(os.path.abspath(rmgpy.__file__))):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in ['.py', '.pyx', '.pxd', '.so', '.pyd']:
+                stat = os.stat(os.path.join(root, name))
+                contentHash.update('{0}\0{1:d}\0{2!r}\0'.format(name, stat.st_size, stat.st_mtime))
+
+    return optionsHash.hexdigest(), contentHash.hexdigest()
+
+def _loadComponent(args):
+    """
+    Create an object of the given database class, load it from the given
+    path on disk with the given additional arguments, and return it. Used
+    to load the components of the RMG database in worker processes.
+    """
+    databaseClass, path, loadArgs = args
+    component = databaseClass()
+    component.load(path, *loadArgs)
+    return component
+
 ################################################################################
 
 class RMGDatabase:
@@ -81,6 +134,8 @@ class RMGDatabase:
              statmechLibraries=None,
              depository=True,
              solvation=True,
+             cacheDirectory=None,
+             processes=1,
              ):
         """
         Load the RMG database from the given `path` on disk, where `path`
@@ -88,20 +143,143 @@ class RMGDatabase:
         optional arguments are provided, then the entire database will be
         loaded. You can use the optional arguments to specify that only certain
         components of the database be loaded.
-        """
-        self.loadThermo(os.path.join(path, 'thermo'), thermoLibraries, depository)
-        self.loadTransport(os.path.join(path, 'transport'), transportLibraries)
-        self.loadForbiddenStructures(os.path.join(path, 'forbiddenStructures.py'))
-        self.loadKinetics(os.path.join(path, 'kinetics'),
-                          reactionLibraries,
-                          seedMechanisms,
-                          kineticsFamilies,
-                          kineticsDepositories
-                          )
-        self.loadStatmech(os.path.join(path, 'statmech'), statmechLibraries, depository)
         
-        if solvation:
-            self.loadSolvation(os.path.join(path, 'solvation'))
+        If a `cacheDirectory` is given, the loaded database is pickled to a file
+        in that directory, and later loads of the same files with the same
+        options read it from there instead of from the database files. The
+        cache is identified by :func:`getDatabaseCacheKeys`, so it is not used
+        if any of the database files has changed since it was saved. Lazily
+        loaded kinetics families are loaded in full when the cache is saved.
+        
+        If `processes` is greater than one, the thermo, transport, statmech
+        and solvation databases, the forbidden structures, and each of the
+        kinetics families and libraries are loaded in that many worker
+        processes. Kinetics families are then loaded in full rather than
+        lazily.
+        """
+        if cacheDirectory is not None:
+            options = {
+                'thermoLibraries': thermoLibraries,
+                'transportLibraries': transportLibraries,
+                'reactionLibraries': reactionLibraries,
+                'seedMechanisms': seedMechanisms,
+                'kineticsFamilies': kineticsFamilies,
+                'kineticsDepositories': kineticsDepositories,
+                'statmechLibraries': statmechLibraries,
+                'depository': depository,
+                'solvation': solvation,
+            }
+            optionsKey, contentKey = getDatabaseCacheKeys(path, options)
+            cachePath = os.path.join(cacheDirectory, '{0}-{1}.pkl'.format(optionsKey, contentKey))
+            if self.loadCache(cachePath):
+                return
+
+        if processes > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(processes)
+            try:
+                # Queue the other components first, so that they are loaded
+                # while we wait for the kinetics
+                tasks = [
+                    ('thermo', ThermoDatabase, os.path.join(path, 'thermo'), (thermoLibraries, depository)),
+                    ('transport', TransportDatabase, os.path.join(path, 'transport'), (transportLibraries,)),
+                    ('forbiddenStructures', ForbiddenStructures, os.path.join(path, 'forbiddenStructures.py'), ()),
+                    ('statmech', StatmechDatabase, os.path.join(path, 'statmech'), (statmechLibraries, depository)),
+                ]
+                if solvation:
+                    tasks.append(('solvation', SolvationDatabase, os.path.join(path, 'solvation'), ()))
+                results = [(task[0], pool.apply_async(_loadComponent, [task[1:]])) for task in tasks]
+                self.loadKinetics(os.path.join(path, 'kinetics'),
+                                  reactionLibraries,
+                                  seedMechanisms,
+                                  kineticsFamilies,
+                                  kineticsDepositories,
+                                  pool=pool,
+                                  )
+                for name, result in results:
+                    setattr(self, name, result.get())
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            self.loadThermo(os.path.join(path, 'thermo'), thermoLibraries, depository)
+            self.loadTransport(os.path.join(path, 'transport'), transportLibraries)
+            self.loadForbiddenStructures(os.path.join(path, 'forbiddenStructures.py'))
+            self.loadKinetics(os.path.join(path, 'kinetics'),
+                              reactionLibraries,
+                              seedMechanisms,
+                              kineticsFamilies,
+                              kineticsDepositories
+                              )
+            self.loadStatmech(os.path.join(path, 'statmech'), statmechLibraries, depository)
+            
+            if solvation:
+                self.loadSolvation(os.path.join(path, 'solvation'))
+
+        if cacheDirectory is not None:
+            self.saveCache(cachePath)
+
+    def loadCache(self, path):
+        """
+        Load the components of the RMG database from the cache file at `path`
+        on disk, as saved by :meth:`saveCache`. Returns ``True`` if the cache
+        was loaded, or ``False`` if it does not exist or cannot be read.
+        """
+        if not os.path.exists(path):
+            return False
+        logging.info('Loading RMG database from cache {0}...'.format(path))
+        try:
+            with open(path, 'rb') as f:
+                components = cPickle.load(f)
+        except Exception, e:
+            logging.warning('Unable to read RMG database cache {0}: {1}'.format(path, e))
+            return False
+        self.thermo = components['thermo']
+        self.transport = components['transport']
+        self.forbiddenStructures = components['forbiddenStructures']
+        self.kinetics = components['kinetics']
+        self.statmech = components['statmech']
+        self.solvation = components['solvation']
+        return True
+
+    def saveCache(self, path):
+        """
+        Save the components of the RMG database to the cache file at `path` on
+        disk. Any other cache files in the same directory for the same
+        database options, as identified by the part of their file name before
+        the last hyphen, are out of date and are removed. Failures to write
+        the cache are logged but otherwise ignored.
+        """
+        components = {
+            'thermo': self.thermo,
+            'transport': self.transport,
+            'forbiddenStructures': self.forbiddenStructures,
+            'kinetics': self.kinetics,
+            'statmech': self.statmech,
+            'solvation': self.solvation,
+        }
+        directory, name = os.path.split(path)
+        # Write to a temporary file first so that other processes never
+        # read a partially written cache
+        tempPath = os.path.join(directory, '{0}.{1:d}.tmp'.format(name, os.getpid()))
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(tempPath, 'wb') as f:
+                cPickle.dump(components, f, cPickle.HIGHEST_PROTOCOL)
+            os.rename(tempPath, path)
+        except Exception, e:
+            logging.warning('Unable to save RMG database cache {0}: {1}'.format(path, e))
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            return
+        prefix = name.rsplit('-', 1)[0] + '-'
+        for other in os.listdir(directory):
+            if other.startswith(prefix) and other.endswith('.pkl') and other != name:
+                try:
+                    os.remove(os.path.join(directory, other))
+                except OSError:
+                    pass
 
     def loadThermo(self, path, thermoLibraries=None, depository=True):
         """
@@ -132,11 +310,14 @@ class RMGDatabase:
                      reactionLibraries=None,
                      seedMechanisms=None,
                      kineticsFamilies=None,
-                     kineticsDepositories=None
+                     kineticsDepositories=None,
+                     pool=None,
                      ):
         """
         Load the RMG kinetics database from the given `path` on disk, where
         `path` points to the top-level folder of the RMG kinetics database.
+        If a :class:`multiprocessing.Pool` `pool` is given, the families and
+        libraries are loaded by its worker processes.
         """
         kineticsLibraries = []
         libraryOrder = []
@@ -156,7 +337,8 @@ class RMGDatabase:
         self.kinetics.load(path,
                            families=kineticsFamilies,
                            libraries=kineticsLibraries,
-                           depositories=kineticsDepositories
+                           depositories=kineticsDepositories,
+                           pool=pool,
                            )
 
     def loadSolvation(self, path):
@@ -0,0 +1,179 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from rmgpy.data.base import Entry, ForbiddenStructures
+from rmgpy.data.rmg import RMGDatabase, getDatabaseCacheKeys
+from rmgpy.data.thermo import ThermoDatabase, ThermoLibrary
+from rmgpy.data.transport import TransportDatabase
+from rmgpy.data.kinetics import KineticsDatabase
+from rmgpy.data.statmech import StatmechDatabase
+from rmgpy.data.solvation import SolvationDatabase
+from rmgpy.molecule import Group, Molecule
+from rmgpy.thermo import ThermoData
+
+################################################################################
+
+class TestRMGDatabaseCache(unittest.TestCase):
+    """
+    Contains unit tests of the on-disk cache of the RMG database.
+    """
+
+    def setUp(self):
+        """
+        A method called before each unit test in this class.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'input')
+        os.makedirs(os.path.join(self.path, 'thermo'))
+        with open(os.path.join(self.path, 'thermo', 'library.py'), 'w') as f:
+            f.write('name = "test"\n')
+        self.cacheDirectory = os.path.join(self.directory, 'cache')
+
+        self.database = RMGDatabase()
+        self.database.thermo = ThermoDatabase()
+        library = ThermoLibrary(label='test')
+        library.entries['CH3'] = Entry(
+            index = 1,
+            label = 'CH3',
+            item = Molecule().fromAdjacencyList('1 C 1 0', saturateH=True),
+            data = ThermoData(Tdata=([300,400,500,600,800,1000,1500],'K'), Cpdata=([9.2,10.0,10.8,11.5,12.7,13.7,15.4],'cal/(mol*K)'), H298=(34.8,'kcal/mol'), S298=(46.4,'cal/(mol*K)')),
+        )
+        self.database.thermo.libraries['test'] = library
+        self.database.thermo.libraryOrder = ['test']
+        self.database.transport = TransportDatabase()
+        self.database.forbiddenStructures = ForbiddenStructures()
+        self.database.forbiddenStructures.entries['O4'] = Entry(
+            label = 'O4',
+            item = Group().fromAdjacencyList('1 O 0 {2,S}\n2 O 0 {1,S} {3,S}\n3 O 0 {2,S} {4,S}\n4 O 0 {3,S}'),
+        )
+        self.database.kinetics = KineticsDatabase()
+        self.database.kinetics.recommendedFamilies = {'H_Abstraction': True}
+        self.database.statmech = StatmechDatabase()
+        self.database.solvation = SolvationDatabase()
+
+    def tearDown(self):
+        """
+        A method called after each unit test in this class.
+        """
+        shutil.rmtree(self.directory)
+
+    def testGetDatabaseCacheKeys(self):
+        """
+        Test that the cache keys change when the database files or the load
+        options change.
+        """
+        optionsKey, contentKey = getDatabaseCacheKeys(self.path, {'depository': True})
+        self.assertEqual(getDatabaseCacheKeys(self.path, {'depository': True}), (optionsKey, contentKey))
+        self.assertNotEqual(getDatabaseCacheKeys(self.path, {'depository': False})[0], optionsKey)
+
+        with open(os.path.join(self.path, 'thermo', 'library.py'), 'a') as f:
+            f.write('shortDesc = "changed"\n')
+        self.assertEqual(getDatabaseCacheKeys(self.path, {'depository': True}), (optionsKey, getDatabaseCacheKeys(self.path, {'depository': True})[1]))
+        self.assertNotEqual(getDatabaseCacheKeys(self.path, {'depository': True})[1], contentKey)
+
+    def testLoadCache(self):
+        """
+        Test that a database saved to the cache is loaded with the same
+        contents, and that saving a new cache removes the stale one.
+        """
+        path = os.path.join(self.cacheDirectory, 'options-content1.pkl')
+        self.assertFalse(RMGDatabase().loadCache(path))
+        self.database.saveCache(path)
+        self.assertTrue(os.path.exists(path))
+
+        database = RMGDatabase()
+        self.assertTrue(database.loadCache(path))
+        self.assertEqual(database.thermo.libraryOrder, ['test'])
+        entry0 = self.database.thermo.libraries['test'].entries['CH3']
+        entry = database.thermo.libraries['test'].entries['CH3']
+        self.assertTrue(entry.item.isIsomorphic(entry0.item))
+        self.assertEqual(repr(entry.data), repr(entry0.data))
+        self.assertTrue(database.forbiddenStructures.entries['O4'].item.isIsomorphic(self.database.forbiddenStructures.entries['O4'].item))
+        self.assertEqual(database.kinetics.recommendedFamilies, {'H_Abstraction': True})
+
+        newPath = os.path.join(self.cacheDirectory, 'options-content2.pkl')
+        database.saveCache(newPath)
+        self.assertEqual(os.listdir(self.cacheDirectory), ['options-content2.pkl'])
+
+    def testLoadFromCache(self):
+        """
+        Test that RMGDatabase.load() uses the cache saved for the same files
+        and options instead of reading the database.
+        """
+        optionsKey, contentKey = getDatabaseCacheKeys(self.path, {
+            'thermoLibraries': ['test'],
+            'transportLibraries': None,
+            'reactionLibraries': None,
+            'seedMechanisms': None,
+            'kineticsFamilies': None,
+            'kineticsDepositories': None,
+            'statmechLibraries': None,
+            'depository': True,
+            'solvation': True,
+        })
+        self.database.saveCache(os.path.join(self.cacheDirectory, '{0}-{1}.pkl'.format(optionsKey, contentKey)))
+
+        database = RMGDatabase()
+        database.load(self.path, thermoLibraries=['test'], cacheDirectory=self.cacheDirectory)
+        self.assertEqual(database.thermo.libraries.keys(), ['test'])
+
+    def testCacheFamily(self):
+        """
+        Test that a kinetics family loaded from the cache has the same groups,
+        template and recipe, and generates the same reactions, as the family
+        that was saved.
+        """
+        import rmgpy.data.rmg
+        from rmgpy.data.kinetics import KineticsFamily
+        from rmgpy.data.kinetics.kineticsTest import writeTestFamily
+        familyPath = os.path.join(self.directory, 'R_Addition_MultipleBond')
+        os.makedirs(familyPath)
+        writeTestFamily(familyPath)
+        family0 = KineticsFamily(label='R_Addition_MultipleBond')
+        family0.load(familyPath, self.database.kinetics.local_context, self.database.kinetics.global_context, lazy=True)
+        self.database.kinetics.families['R_Addition_MultipleBond'] = family0
+
+        path = os.path.join(self.cacheDirectory, 'options-content.pkl')
+        self.database.saveCache(path)
+        database = RMGDatabase()
+        self.assertTrue(database.loadCache(path))
+        family = database.kinetics.families['R_Addition_MultipleBond']
+
+        self.assertEqual(sorted(family.groups.entries.keys()), sorted(family0.groups.entries.keys()))
+        for label, entry0 in family0.groups.entries.iteritems():
+            self.assertEqual(family.groups.entries[label].item.toAdjacencyList(), entry0.item.toAdjacencyList())
+        self.assertEqual([entry.label for entry in family.groups.top], [entry.label for entry in family0.groups.top])
+        self.assertEqual([entry.label for entry in family.forwardTemplate.reactants], ['Cd_R', 'Y_1centerrad'])
+        self.assertEqual([entry.label for entry in family.forwardTemplate.products], [entry.label for entry in family0.forwardTemplate.products])
+        self.assertEqual(family.forwardRecipe.actions, family0.forwardRecipe.actions)
+        self.assertEqual(family.reverseRecipe.actions, family0.reverseRecipe.actions)
+        self.assertEqual(family.rules.entries.keys(), family0.rules.entries.keys())
+
+        ethylene = Molecule().fromAdjacencyList('1 C 0 0 {2,D}\n2 C 0 0 {1,D}', saturateH=True)
+        hydrogen = Molecule().fromAdjacencyList('1 H 1 0')
+        ethyl = Molecule().fromAdjacencyList('1 C 1 0 {2,S}\n2 C 0 0 {1,S}', saturateH=True)
+        database0 = rmgpy.data.rmg.database
+        try:
+            for reactants in [[ethylene, hydrogen], [ethyl]]:
+                rmgpy.data.rmg.database = self.database
+                reactions0 = family0.generateReactions([molecule.copy(deep=True) for molecule in reactants])
+                rmgpy.data.rmg.database = database
+                reactions = family.generateReactions([molecule.copy(deep=True) for molecule in reactants])
+                self.assertEqual(len(reactions), 1)
+                self.assertEqual(len(reactions), len(reactions0))
+                for reaction, reaction0 in zip(reactions, reactions0):
+                    self.assertTrue(reaction.isIsomorphic(reaction0))
+                    self.assertEqual(reaction.degeneracy, reaction0.degeneracy)
+                    self.assertEqual([entry.label for entry in reaction.template], [entry.label for entry in reaction0.template])
+        finally:
+            rmgpy.data.rmg.database = database0
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
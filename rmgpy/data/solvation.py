@@ -438,6 +438,7 @@ class SolvationDatabase(object):
         self.libraries = {}
         self.libraries['solvent'] = SolventLibrary()
         self.libraries['solute'] = SoluteLibrary()
+        self.libraryOrder = []
         self.groups = {}
         self.local_context = {
             'SoluteData': SoluteData,
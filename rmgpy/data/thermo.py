@@ -35,10 +35,14 @@
 import os.path
 import math
 import logging
+import errno
+import hashlib
+import tempfile
+import cPickle
 import numpy
 from copy import copy, deepcopy
 
-from base import Database, Entry, makeLogicNode, DatabaseError
+from base import Database, Entry, makeLogicNode, DatabaseError, getStructureKey
 
 import rmgpy.constants as constants
 from rmgpy.thermo import NASAPolynomial, NASA, ThermoData, Wilhoit
@@ -228,10 +232,10 @@ class ThermoLibrary(Database):
         molecule = Molecule().fromAdjacencyList(molecule)
         
         # Internal checks for adding entry to the thermo library
-        if label in self.entries.keys():
+        if label in self.entries:
             raise DatabaseError('Found a duplicate molecule with label {0} in the thermo library.  Please correct your library.'.format(label))
         
-        for entry in self.entries.values():
+        for entry in self.getCandidateEntries([molecule]):
             if molecule.isIsomorphic(entry.item):
                 raise DatabaseError('Adjacency list of {0} matches that of existing molecule {1} in thermo library.  Please correct your library.'.format(label, entry.label))
         
@@ -324,9 +328,86 @@ class ThermoGroups(Database):
 
 ################################################################################
 
+def getThermoCacheKey(molecule):
+    """
+    Return the key used to store the thermo estimate of `molecule` in an
+    on-disk thermo cache. The key is derived from the structure key of the
+    molecule, so it is the same across runs; different structures can still
+    share a key, so cached estimates must also be checked against the
+    structure saved with them.
+    """
+    return hashlib.md5(repr(getStructureKey(molecule))).hexdigest()
+
+def findCachedThermoData(molecule, cacheDirectory, key=None):
+    """
+    Return the thermo estimate of `molecule` stored in the on-disk thermo
+    cache `cacheDirectory` as a tuple (thermoData, symmetryNumber), or
+    ``None`` if the structure has not been estimated. The `key` is the value
+    of :func:`getThermoCacheKey` for the molecule, if already known.
+    """
+    if key is None:
+        key = getThermoCacheKey(molecule)
+    index = 0
+    while True:
+        path = os.path.join(cacheDirectory, '{0}-{1:d}.pkl'.format(key, index))
+        try:
+            with open(path, 'rb') as f:
+                adjlist, thermoData, symmetryNumber = cPickle.load(f)
+        except IOError:
+            return None
+        if molecule.isIsomorphic(Molecule().fromAdjacencyList(adjlist)):
+            return thermoData, symmetryNumber
+        index += 1
+
+def saveCachedThermoData(molecule, thermoData, cacheDirectory, key=None):
+    """
+    Add the thermo estimate `thermoData` of `molecule` to the on-disk thermo
+    cache `cacheDirectory`, along with the adjacency list and symmetry number
+    of the molecule. The `key` is the value of :func:`getThermoCacheKey` for
+    the molecule, if already known. Returns the path of the cached estimate.
+    
+    Several processes can share the cache: each estimate is written to a
+    temporary file and then hard-linked to the first unused index, so
+    readers never see a partial file and writers never overwrite each other.
+    """
+    if key is None:
+        key = getThermoCacheKey(molecule)
+    try:
+        os.makedirs(cacheDirectory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    fd, temp = tempfile.mkstemp(suffix='.tmp', dir=cacheDirectory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            cPickle.dump((molecule.toAdjacencyList(), thermoData, molecule.symmetryNumber), f, cPickle.HIGHEST_PROTOCOL)
+        index = 0
+        while True:
+            path = os.path.join(cacheDirectory, '{0}-{1:d}.pkl'.format(key, index))
+            try:
+                os.link(temp, path)
+                return path
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            index += 1
+    finally:
+        os.remove(temp)
+
+################################################################################
+
 class ThermoDatabase(object):
     """
     A class for working with the RMG thermodynamics database.
+    
+    If `cacheDirectory` is set, group additivity estimates are also stored
+    in and reused from an on-disk cache in that directory, which can be
+    shared by several RMG processes. Estimates are kept in a subdirectory
+    named by the fingerprint of the loaded groups (see
+    :meth:`getGroupsFingerprint`), so loading different groups invalidates
+    them. The fingerprint is only computed once, so code that edits the
+    loaded groups in place must call :meth:`clearGroupsFingerprint`
+    afterwards, or the estimates made with the old groups will be reused.
     """
 
     def __init__(self):
@@ -334,6 +415,8 @@ class ThermoDatabase(object):
         self.libraries = {}
         self.groups = {}
         self.libraryOrder = []
+        self.cacheDirectory = None
+        self._groupsFingerprint = None
         self.local_context = {
             'ThermoData': ThermoData,
             'Wilhoit': Wilhoit,
@@ -410,6 +493,7 @@ class ThermoDatabase(object):
         """
         logging.info('Loading thermodynamics group database from {0}...'.format(path))
         self.groups = {}
+        self._groupsFingerprint = None
         self.groups['group']   =   ThermoGroups(label='group').load(os.path.join(path, 'group.py'  ), self.local_context, self.global_context)
         self.groups['gauche']  =  ThermoGroups(label='gauche').load(os.path.join(path, 'gauche.py' ), self.local_context, self.global_context)
         self.groups['int15']   =   ThermoGroups(label='int15').load(os.path.join(path, 'int15.py'  ), self.local_context, self.global_context)
@@ -486,6 +570,7 @@ class ThermoDatabase(object):
                 self.libraries[library.label] = library
 
         self.groups = {}
+        self._groupsFingerprint = None
         self.groups['group'] = ThermoGroups(label='group', name='Functional Group Additivity Values').loadOld(
             dictstr = os.path.join(path, 'thermo_groups', 'Group_Dictionary.txt'),
             treestr = os.path.join(path, 'thermo_groups', 'Group_Tree.txt'),
@@ -543,6 +628,43 @@ class ThermoDatabase(object):
             pattern = True,
         )
         
+    def clearGroupsFingerprint(self):
+        """
+        Discard the fingerprint of the thermo groups, so that it is computed
+        again by :meth:`getGroupsFingerprint`. This must be called after the
+        loaded groups are edited in place.
+        """
+        self._groupsFingerprint = None
+
+    def getGroupsFingerprint(self):
+        """
+        Return a fingerprint of the loaded thermo groups, made from the
+        structure, tree position and data of every group. The fingerprint is
+        computed once per loaded set of groups, or again after
+        :meth:`clearGroupsFingerprint` is called.
+        """
+        if self._groupsFingerprint is None:
+            fingerprint = hashlib.md5()
+            for label, groups in sorted(self.groups.items()):
+                fingerprint.update('{0} {1!r}\n'.format(label, [entry.label for entry in groups.top]))
+                for entry in groups.entries.values():
+                    item = entry.item.toAdjacencyList() if isinstance(entry.item, Group) else str(entry.item)
+                    # The comments of group values are overwritten during
+                    # estimation, so they are left out
+                    if isinstance(entry.data, ThermoData):
+                        data = '{0!r} {1!r} {2!r} {3!r}'.format(entry.data.Tdata, entry.data.Cpdata, entry.data.H298, entry.data.S298)
+                    else:
+                        data = repr(entry.data)
+                    fingerprint.update('{0} {1} {2!r}\n{3}\n{4}\n'.format(
+                        entry.label,
+                        entry.parent.label if entry.parent is not None else None,
+                        [child.label for child in entry.children],
+                        item,
+                        data,
+                    ))
+            self._groupsFingerprint = fingerprint.hexdigest()
+        return self._groupsFingerprint
+
     def pruneHeteroatoms(self, allowed=['C','H','O','S']):
         """
         Remove all species from thermo libraries that contain atoms other than those allowed.
@@ -718,12 +840,12 @@ class ThermoDatabase(object):
         Returns: a list of tuples (thermoData, depository, entry) without any Cp0 or CpInf data.
         """
         items = []
-        for label, entry in self.depository['stable'].entries.iteritems():
+        for entry in self.depository['stable'].getCandidateEntries(species.molecule):
             for molecule in species.molecule:
                 if molecule.isIsomorphic(entry.item):
                     items.append((deepcopy(entry.data), self.depository['stable'], entry))
                     break
-        for label, entry in self.depository['radical'].entries.iteritems():
+        for entry in self.depository['radical'].getCandidateEntries(species.molecule):
             for molecule in species.molecule:
                 if molecule.isIsomorphic(entry.item):
                     items.append((deepcopy(entry.data), self.depository['radical'], entry))
@@ -741,7 +863,7 @@ class ThermoDatabase(object):
         
         Returns a tuple: (ThermoData, library, entry)  or None.
         """
-        for label, entry in library.entries.iteritems():
+        for entry in library.getCandidateEntries(species.molecule):
             for molecule in species.molecule:
                 if molecule.isIsomorphic(entry.item) and entry.data is not None:
                     thermoData = deepcopy(entry.data)
@@ -765,7 +887,10 @@ class ThermoDatabase(object):
         for molecule in species.molecule:
             molecule.clearLabeledAtoms()
             molecule.updateAtomTypes()
-            tdata = self.estimateThermoViaGroupAdditivity(molecule)
+            if self.cacheDirectory:
+                tdata = self.estimateThermoViaCache(molecule)
+            else:
+                tdata = self.estimateThermoViaGroupAdditivity(molecule)
             thermo.append(tdata)
 
         H298 = numpy.array([t.getEnthalpy(298.) for t in thermo])
@@ -777,6 +902,35 @@ class ThermoDatabase(object):
         self.findCp0andCpInf(species, thermoData)
         return thermoData
         
+    def estimateThermoViaCache(self, molecule):
+        """
+        Return the group additivity estimate of the thermodynamic parameters
+        of a given :class:`Molecule` object `molecule`, reading it from the
+        on-disk cache in `cacheDirectory` if the structure has already been
+        estimated with the loaded groups, and adding it to the cache
+        otherwise.
+        """
+        cacheDirectory = os.path.join(self.cacheDirectory, self.getGroupsFingerprint())
+        key = getThermoCacheKey(molecule)
+        try:
+            cached = findCachedThermoData(molecule, cacheDirectory, key)
+        except Exception:
+            logging.warning('Unable to read thermo estimate of {0} from cache {1}.'.format(molecule, cacheDirectory))
+            cached = None
+        if cached is not None:
+            thermoData, molecule.symmetryNumber = cached
+            # Estimation sorts the atoms as a side effect
+            molecule.sortVertices()
+            return thermoData
+
+        thermoData = self.estimateThermoViaGroupAdditivity(molecule)
+        if thermoData is not None:
+            try:
+                saveCachedThermoData(molecule, thermoData, cacheDirectory, key)
+            except (IOError, OSError):
+                logging.warning('Unable to save thermo estimate of {0} to cache {1}.'.format(molecule, cacheDirectory))
+        return thermoData
+
     def estimateRadicalThermoViaHBI(self, molecule, stableThermoEstimator ):
         """
         Estimate the thermodynamics of a radical by saturating it,
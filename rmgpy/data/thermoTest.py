@@ -2,13 +2,18 @@
 # -*- coding: utf-8 -*-
 
 import os
+import shutil
+import tempfile
 import unittest
 from external.wip import work_in_progress
 
 from rmgpy import settings
 from rmgpy.species import Species
-from rmgpy.data.thermo import ThermoDatabase
+from rmgpy.data.base import Entry
+from rmgpy.data.thermo import ThermoDatabase, ThermoGroups, findCachedThermoData, saveCachedThermoData
 from rmgpy.molecule.molecule import Molecule
+from rmgpy.molecule.group import Group
+from rmgpy.thermo import ThermoData
 
 ################################################################################
 
@@ -149,6 +154,95 @@ class TestThermoDatabaseAromatics(TestThermoDatabase):
         super(TestThermoDatabaseAromatics, self).__init__(*args, **kwargs)
         self._testMethodDoc = self._testMethodDoc.strip().split('\n')[0] + " for Aromatics.\n"
 
+class TestThermoCache(unittest.TestCase):
+    """
+    Contains unit tests of the on-disk cache of thermo estimates.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        self.cacheDirectory = tempfile.mkdtemp()
+        self.database = ThermoDatabase()
+        groups = ThermoGroups(label='group')
+        groups.entries['C'] = Entry(
+            index = 1,
+            label = 'C',
+            item = Group().fromAdjacencyList('1 * C 0 0'),
+            data = ThermoData(Tdata=([300,400,500,600,800,1000,1500],'K'), Cpdata=([8.5,9.8,11.1,12.4,14.6,16.4,19.2],'cal/(mol*K)'), H298=(-17.9,'kcal/mol'), S298=(49.4,'cal/(mol*K)')),
+        )
+        groups.top = [groups.entries['C']]
+        self.database.groups['group'] = groups
+        self.molecule = Molecule().fromAdjacencyList('1 C 0 0', saturateH=True)
+
+    def tearDown(self):
+        """
+        A function run after each unit test in this class.
+        """
+        shutil.rmtree(self.cacheDirectory)
+
+    def testGetGroupsFingerprint(self):
+        """
+        Test that the groups fingerprint depends on the group values but not
+        on their comments.
+        """
+        fingerprint = self.database.getGroupsFingerprint()
+        data = self.database.groups['group'].entries['C'].data
+        data.comment = 'group(C)'
+        self.database.clearGroupsFingerprint()
+        self.assertEqual(self.database.getGroupsFingerprint(), fingerprint)
+        data.H298.value_si += 1000.
+        self.database.clearGroupsFingerprint()
+        self.assertNotEqual(self.database.getGroupsFingerprint(), fingerprint)
+
+    def testSaveCachedThermoData(self):
+        """
+        Test that cached thermo estimates are found again only for the same
+        structure, and that repeated saves do not overwrite each other.
+        """
+        self.molecule.calculateSymmetryNumber()
+        thermoData = ThermoData(Tdata=([300,400,500,600,800,1000,1500],'K'), Cpdata=([8.5,9.8,11.1,12.4,14.6,16.4,19.2],'cal/(mol*K)'), H298=(-17.9,'kcal/mol'), S298=(44.5,'cal/(mol*K)'), comment='test')
+        self.assertTrue(findCachedThermoData(self.molecule, self.cacheDirectory) is None)
+        path1 = saveCachedThermoData(self.molecule, thermoData, self.cacheDirectory)
+        path2 = saveCachedThermoData(self.molecule, thermoData, self.cacheDirectory)
+        self.assertNotEqual(path1, path2)
+        self.assertEqual(sorted(os.listdir(self.cacheDirectory)), sorted([os.path.basename(path1), os.path.basename(path2)]))
+
+        cachedData, symmetryNumber = findCachedThermoData(self.molecule, self.cacheDirectory)
+        self.assertEqual(repr(cachedData), repr(thermoData))
+        self.assertEqual(symmetryNumber, 12)
+        self.assertTrue(findCachedThermoData(Molecule().fromAdjacencyList('1 C 1 0', saturateH=True), self.cacheDirectory) is None)
+
+    def testGetThermoDataFromGroups(self):
+        """
+        Test that group additivity estimates are reused from the cache until
+        the groups are edited and their fingerprint is cleared.
+        """
+        self.database.cacheDirectory = self.cacheDirectory
+        thermoData = self.database.getThermoDataFromGroups(Species(molecule=[self.molecule]))
+        fingerprint = self.database.getGroupsFingerprint()
+        self.assertEqual(len(os.listdir(os.path.join(self.cacheDirectory, fingerprint))), 1)
+
+        # The stored estimate is used for the same structure
+        molecule = Molecule().fromAdjacencyList('1 C 0 0', saturateH=True)
+        cachedData = self.database.getThermoDataFromGroups(Species(molecule=[molecule]))
+        self.assertAlmostEqual(cachedData.H298.value_si, thermoData.H298.value_si)
+        self.assertAlmostEqual(cachedData.S298.value_si, thermoData.S298.value_si)
+        self.assertEqual(cachedData.comment, thermoData.comment)
+        self.assertEqual(molecule.symmetryNumber, 12)
+        self.assertEqual(len(os.listdir(os.path.join(self.cacheDirectory, fingerprint))), 1)
+
+        # Once the groups are edited and the fingerprint is cleared, the
+        # stored estimate is no longer used
+        self.database.groups['group'].entries['C'].data.H298.value_si += 4184.
+        self.database.clearGroupsFingerprint()
+        self.assertNotEqual(self.database.getGroupsFingerprint(), fingerprint)
+        molecule = Molecule().fromAdjacencyList('1 C 0 0', saturateH=True)
+        newData = self.database.getThermoDataFromGroups(Species(molecule=[molecule]))
+        self.assertAlmostEqual(newData.H298.value_si, thermoData.H298.value_si + 4184.)
+        self.assertEqual(len(os.listdir(os.path.join(self.cacheDirectory, self.database.getGroupsFingerprint()))), 1)
+
 ################################################################################
 
 if __name__ == '__main__':
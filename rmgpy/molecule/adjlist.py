@@ -32,7 +32,10 @@ This module contains functionality for reading from and writing to the
 adjacency list format used by Reaction Mechanism Generator (RMG).
 """
 
+import cython
 import re
+from collections import OrderedDict
+
 from .molecule import Atom, Bond
 from .group import GroupAtom, GroupBond
 #import chempy.molecule.atomtype as atomtypes
@@ -48,11 +51,123 @@ class InvalidAdjacencyListError(Exception):
 
 ################################################################################
 
-def fromAdjacencyList(adjlist, group=False, saturateH=False):
+# Pattern used to detect spaces inside braces, e.g. '{Cd, Ct}'
+_bracesWithSpaces = re.compile(r'\{[^}]*\s+[^}]*\}')
+# Pattern matching a well-formed atom line, i.e. the atom index, optional
+# label, atom type(s), electron state(s), optional lone pairs, and the list of
+# bonds, all separated by whitespace; other lines are parsed field by field
+_atomLinePattern = re.compile(r"""
+    \s*(\d+)                                 # atom index
+    (?:\s+(\*[^\s{}]*))?                      # label
+    \s+(\{[^\s{}]+\}|[^\s{}*][^\s{}]*)        # atom type(s)
+    \s+(\{[^\s{}]+\}|[^\s{}*][^\s{}]*)        # electron state(s)
+    (?:\s+([^\s{}]+))?                        # lone pairs
+    ((?:\s+\{\d+,(?:\{[^\s{}]+\}|[^\s{},]+)\})*) # bonds
+    \s*$""", re.VERBOSE)
+# Pattern matching each bond in the bond list of a well-formed atom line
+_bondPattern = re.compile(r'\{(\d+),(\{[^\s{}]+\}|[^\s{},]+)\}')
+
+# The radical electrons and spin multiplicities for each electron state
+_electronStates = {
+    '0': ((0,), (1,)),
+    '1': ((1,), (2,)),
+    '2': ((2, 2), (1, 3)),
+    '2S': ((2,), (1,)),
+    '2T': ((2,), (3,)),
+    '3': ((3,), (4,)),
+    '3D': ((3,), (2,)),
+    '3Q': ((3,), (4,)),
+    '4': ((4,), (5,)),
+    '4S': ((4,), (1,)),
+    '4T': ((4,), (3,)),
+    '4V': ((4,), (5,)),
+    'X': ((0, 1, 2, 2), (1, 2, 1, 3)),
+}
+
+# The number of lone pairs for each lone pair state
+_lonePairStates = {'0': 0, '1': 1, '2': 2, '3': 3, '4': 4}
+
+# The valences and bond order contributions used to add hydrogen atoms and
+# determine the number of lone pairs
+_valences = {'H': 1, 'C': 4, 'O': 2, 'N': 3, 'S': 2, 'Si': 4, 'Cl': 1, 'He': 0, 'Ne': 0, 'Ar': 0}
+_bondOrders = {'S': 1, 'D': 2, 'T': 3, 'B': 1.5}
+
+#: The parsed adjacency lists of recently seen strings, keyed by the string
+#: and the `group` and `saturateH` options of :func:`fromAdjacencyList`.
+#: Each value is an ``(atoms, bonds)`` template from which new atom and bond
+#: objects can be created without parsing the string again.
+_adjlist_cache = OrderedDict()
+#: The maximum number of templates to keep in :data:`_adjlist_cache`.
+_adjlist_cache_size = 10000
+
+def fromAdjacencyList(adjlist, group=False, saturateH=False, useCache=True):
+    """
+    Convert a string adjacency list `adjlist` into a set of :class:`Atom` and
+    :class:`Bond` objects. If `useCache` is ``True``, the parsed structure is
+    cached, so repeated conversions of the same string only need to create
+    new atom and bond objects.
+    """
+    if useCache:
+        key = (adjlist, group, saturateH)
+        template = _adjlist_cache.pop(key, None)
+        if template is None:
+            atoms = parseAdjacencyList(adjlist, group, saturateH)
+            template = getAdjacencyListTemplate(atoms, group)
+        else:
+            atoms = createFromTemplate(template, group)
+        # Reinsert the template so it becomes the most recently used one
+        _adjlist_cache[key] = template
+        while len(_adjlist_cache) > _adjlist_cache_size:
+            _adjlist_cache.popitem(last=False)
+        return atoms
+    return parseAdjacencyList(adjlist, group, saturateH)
+
+def getAdjacencyListTemplate(atoms, group):
+    """
+    Return a template of the `atoms` parsed from an adjacency list, from
+    which copies of the atoms can be made by :func:`createFromTemplate`.
+    """
+    indices = dict([(atom, index) for index, atom in enumerate(atoms)])
+    if group:
+        atomData = [(atom.atomType[:], atom.radicalElectrons[:], atom.spinMultiplicity[:], atom.charge[:], atom.label, atom.lonePairs[:]) for atom in atoms]
+    else:
+        atomData = [(atom.element, atom.radicalElectrons, atom.spinMultiplicity, atom.charge, atom.label, atom.lonePairs) for atom in atoms]
+    bondData = []
+    for index1, atom1 in enumerate(atoms):
+        for atom2, bond in atom1.edges.iteritems():
+            index2 = indices[atom2]
+            if index1 < index2:
+                bondData.append((index1, index2, bond.order[:] if group else bond.order))
+    return atomData, bondData
+
+def createFromTemplate(template, group):
+    """
+    Return a list of new atoms, bonded to one another, from a `template`
+    made by :func:`getAdjacencyListTemplate`.
+    """
+    atomData, bondData = template
+    if group:
+        atoms = [GroupAtom(atomType[:], radicalElectrons[:], spinMultiplicity[:], charge[:], label, lonePairs[:])
+                 for atomType, radicalElectrons, spinMultiplicity, charge, label, lonePairs in atomData]
+    else:
+        atoms = [Atom(element, radicalElectrons, spinMultiplicity, charge, label, lonePairs)
+                 for element, radicalElectrons, spinMultiplicity, charge, label, lonePairs in atomData]
+    for index1, index2, order in bondData:
+        atom1 = atoms[index1]; atom2 = atoms[index2]
+        bond = GroupBond(atom1, atom2, order[:]) if group else Bond(atom1, atom2, order)
+        atom1.edges[atom2] = bond
+        atom2.edges[atom1] = bond
+    return atoms
+
+def parseAdjacencyList(adjlist, group=False, saturateH=False):
     """
     Convert a string adjacency list `adjlist` into a set of :class:`Atom` and
-    :class:`Bond` objects.
+    :class:`Bond` objects, without consulting the adjacency list cache.
     """
+    cython.declare(atoms=list, atomdict=dict, bonds=dict, atomBonds=dict, lines=list, data=list, newAtoms=list)
+    cython.declare(aid=cython.int, aid1=cython.int, aid2=cython.int, index=cython.int, lonePairElectrons=cython.int)
+    cython.declare(radicalElectrons=list, spinMultiplicity=list)
+
     atoms = []
     atomdict = {}
     bonds = {}
@@ -70,109 +185,85 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
             if len(lines) == 0:
                 raise InvalidAdjacencyListError('No atoms specified in adjacency list.')
         
-        mistake1 = re.compile('\{[^}]*\s+[^}]*\}')
+        lonePairElectrons = -1
         # Iterate over the remaining lines, generating Atom or GroupAtom objects
         for line in lines:
 
-            # Sometimes people put spaces after commas, which messes up the
-            # parse-by-whitespace. Examples include '{Cd, Ct}'.
-            if mistake1.search(line):
-                raise InvalidAdjacencyListError(
-                    "Shouldn't have spaces inside braces: {0}".format(mistake1.search(line).group())
-                    )
+            match = _atomLinePattern.match(line)
+            if match is not None:
+                # The line is well-formed, so the regular expression has
+                # already split it into its fields
+                number, label, atomType, elecState, lonePairs, bondList = match.groups()
+                aid = int(number)
+                if label is None:
+                    label = ''
+                lonePairElectrons = -1 if lonePairs is None else _lonePairStates.get(lonePairs, -1)
+                bondData = _bondPattern.findall(bondList)
+            else:
+                # Sometimes people put spaces after commas, which messes up the
+                # parse-by-whitespace. Examples include '{Cd, Ct}'.
+                match = _bracesWithSpaces.search(line)
+                if match:
+                    raise InvalidAdjacencyListError(
+                        "Shouldn't have spaces inside braces: {0}".format(match.group())
+                        )
 
-            # Sometimes commas are used to delimit bonds in the bond list,
-            # so replace them just in case
-            line = line.replace('},{', '} {')
-            
-            data = line.split()
+                # Sometimes commas are used to delimit bonds in the bond list,
+                # so replace them just in case
+                data = line.replace('},{', '} {').split()
+
+                # Skip if blank line
+                if len(data) == 0: continue
+
+                # First item is index for atom
+                # Sometimes these have a trailing period (as if in a numbered list),
+                # so remove it just in case
+                aid = int(data[0].strip('.'))
 
-            # Skip if blank line
-            if len(data) == 0: continue
+                # If second item starts with '*', then atom is labeled
+                label = ''; index = 1
+                if data[1][0] == '*':
+                    label = data[1]
+                    index = 2
 
-            # First item is index for atom
-            # Sometimes these have a trailing period (as if in a numbered list),
-            # so remove it just in case
-            aid = int(data[0].strip('.'))
+                # Next is the element or functional group element, followed
+                # by the electron state
+                atomType = data[index]
+                elecState = data[index + 1]
+                index += 2
+
+                # Next number defines the number of lone electron pairs (if provided)
+                lonePairElectrons = -1
+                if len(data) > index and data[index][0] != '{':
+                    lonePairElectrons = _lonePairStates.get(data[index], -1)
+                    index += 1
 
-            # If second item starts with '*', then atom is labeled
-            label = ''; index = 1
-            if data[1][0] == '*':
-                label = data[1]
-                index += 1
+                # Sometimes commas are used to delimit bonds in the bond list,
+                # so strip them just in case
+                bondData = [datum.strip(',')[1:-1].partition(',')[::2] for datum in data[index:]]
 
-            # Next is the element or functional group element
-            # A list can be specified with the {,} syntax
-            atomType = data[index]
+            # A list of element or functional group elements can be specified
+            # with the {,} syntax
             if atomType[0] == '{':
                 atomType = atomType[1:-1].split(',')
             else:
                 atomType = [atomType]
-            index += 1
             
-            # Next is the electron state
+            # Determine the radical electrons and spin multiplicity for the
+            # electron state(s)
             radicalElectrons = []; spinMultiplicity = []
-            elecState = data[index].upper()
+            elecState = elecState.upper()
             if elecState[0] == '{':
-                elecState = elecState[1:-1].split(',')
+                for e in elecState[1:-1].split(','):
+                    radicals, spins = _electronStates.get(e, ((), ()))
+                    radicalElectrons.extend(radicals); spinMultiplicity.extend(spins)
             else:
-                elecState = [elecState]
-            for e in elecState:
-                if e == '0':
-                    radicalElectrons.append(0); spinMultiplicity.append(1)
-                elif e == '1':
-                    radicalElectrons.append(1); spinMultiplicity.append(2)
-                elif e == '2':
-                    radicalElectrons.append(2); spinMultiplicity.append(1)
-                    radicalElectrons.append(2); spinMultiplicity.append(3)
-                elif e == '2S':
-                    radicalElectrons.append(2); spinMultiplicity.append(1)
-                elif e == '2T':
-                    radicalElectrons.append(2); spinMultiplicity.append(3)
-                elif e == '3':
-                    radicalElectrons.append(3); spinMultiplicity.append(4)
-                elif e == '3D':
-                    radicalElectrons.append(3); spinMultiplicity.append(2)
-                elif e == '3Q':
-                    radicalElectrons.append(3); spinMultiplicity.append(4)
-                elif e == '4':
-                    radicalElectrons.append(4); spinMultiplicity.append(5)
-                elif e == '4S':
-                    radicalElectrons.append(4); spinMultiplicity.append(1)
-                elif e == '4T':
-                    radicalElectrons.append(4); spinMultiplicity.append(3)
-                elif e == '4V':
-                    radicalElectrons.append(4); spinMultiplicity.append(5)
-                elif e == 'X':
-                    radicalElectrons.extend([0,1,2,2])
-                    spinMultiplicity.extend([1,2,1,3])
-            index += 1
-            
-            # Next number defines the number of lone electron pairs (if provided)
-            lonePairElectrons = -1
-         #   if not group and len(data) > index:
-            if len(data) > index:
-                lpState = data[index]
-                if lpState[0] != '{':
-                    if lpState == '0':
-                        lonePairElectrons = 0
-                    if lpState == '1':
-                        lonePairElectrons = 1
-                    if lpState == '2':
-                        lonePairElectrons = 2
-                    if lpState == '3':
-                        lonePairElectrons = 3
-                    if lpState == '4':
-                        lonePairElectrons = 4
-                    index += 1
-                else:
-                    lonePairElectrons = -1
-            else:
-                lonePairElectrons = -1
+                radicals, spins = _electronStates.get(elecState, ((), ()))
+                radicalElectrons.extend(radicals); spinMultiplicity.extend(spins)
             
             # Create a new atom based on the above information
             if group:
-                atom = GroupAtom(atomType, radicalElectrons, spinMultiplicity, [0 for e in radicalElectrons], label, [lonePairElectrons])
+                atom = GroupAtom(atomType, radicalElectrons, spinMultiplicity, [0] * len(radicalElectrons), label, [lonePairElectrons])
             else:
                 atom = Atom(atomType[0], radicalElectrons[0], spinMultiplicity[0], 0, label, lonePairElectrons)
 
@@ -181,24 +272,16 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
             atomdict[aid] = atom
             
             # Process list of bonds
-            bonds[aid] = {}
-            for datum in data[index:]:
-
-                # Sometimes commas are used to delimit bonds in the bond list,
-                # so strip them just in case
-                datum = datum.strip(',')
-                
-                aid2, comma, order = datum[1:-1].partition(',')
-                aid2 = int(aid2)
+            bonds[aid] = atomBonds = {}
+            for number, order in bondData:
+                aid2 = int(number)
                 if aid == aid2:
                     raise InvalidAdjacencyListError('Attempted to create a bond between atom {0:d} and itself.'.format(aid))
                 
                 if order[0] == '{':
-                    order = order[1:-1].split(',')
+                    atomBonds[aid2] = order[1:-1].split(',')
                 else:
-                    order = [order]
-
-                bonds[aid][aid2] = order
+                    atomBonds[aid2] = [order]
 
         # Check consistency using bonddict
         for atom1 in bonds:
@@ -211,16 +294,11 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
                     raise InvalidAdjacencyListError('Found bonds between {0:d} and {1:d}, but of different orders "{2}" and "{3}".'.format(atom1, atom2, bonds[atom1][atom2], bonds[atom2][atom1]))
 
         # Convert bonddict to use Atom[group] and Bond[group] objects
-        atomkeys = atomdict.keys()
-        atomkeys.sort()
-        for aid1 in atomkeys:
-            atomkeys2 = bonds[aid1].keys()
-            atomkeys2.sort()
-            for aid2 in atomkeys2:
+        for aid1, atomBonds in bonds.iteritems():
+            atom1 = atomdict[aid1]
+            for aid2, order in atomBonds.iteritems():
                 if aid1 < aid2:
-                    atom1 = atomdict[aid1]
                     atom2 = atomdict[aid2]
-                    order = bonds[aid1][aid2]
                     if group:
                         bond = GroupBond(atom1, atom2, order)
                     elif len(order) == 1:
@@ -233,55 +311,38 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
         if saturateH:
             # Add explicit hydrogen atoms to complete structure if desired
             if not group:
-                valences = {'H': 1, 'C': 4, 'O': 2, 'N': 3, 'S': 2, 'Si': 4, 'Cl': 1, 'He': 0, 'Ne': 0, 'Ar': 0}
-                orders = {'S': 1, 'D': 2, 'T': 3, 'B': 1.5}
                 newAtoms = []
                 for atom in atoms:
                     try:
-                        valence = valences[atom.symbol]
+                        valence = _valences[atom.symbol]
                     except KeyError:
                         raise InvalidAdjacencyListError('Cannot add hydrogens to adjacency list: Unknown valence for atom "{0}".'.format(atom.symbol))
-                    radical = atom.radicalElectrons
                     order = 0
-                    for atom2, bond in atom.bonds.items():
-                        order += orders[bond.order]
-                    count = valence - radical - int(order)
+                    for bond in atom.edges.itervalues():
+                        order += _bondOrders[bond.order]
+                    count = valence - atom.radicalElectrons - int(order)
                     for i in range(count):
                         a = Atom('H', 0, 1, 0, '')
                         b = Bond(atom, a, 'S')
                         newAtoms.append(a)
-                        atom.bonds[a] = b
-                        a.bonds[atom] = b
+                        atom.edges[a] = b
+                        a.edges[atom] = b
                 atoms.extend(newAtoms)
         
         # Calculate the number of lone pair electrons requiring molecule with all hydrogen atoms present
         if not group and lonePairElectrons == -1:
-            valences = {'H': 1, 'C': 4, 'O': 2, 'N': 3, 'S': 2, 'Si': 4, 'He': 0, 'Ne': 0, 'Ar': 0, 'Cl': 1}
-            orders = {'S': 1, 'D': 2, 'T': 3, 'B': 1.5}
             for atom in atoms:
-                if not atom.isHydrogen():
-                    try:
-                        valence = valences[atom.symbol]
-                    except KeyError:
-                        raise InvalidAdjacencyListError('Cannot add hydrogens to adjacency list: Unknown valence for atom "{0}".'.format(atom.symbol))
-                    radical = atom.radicalElectrons
-                    order = 0
-                    for atom2, bond in atom.bonds.items():
-                        order += orders[bond.order]
-                    lonePairs = 4 - order - radical
-                    charge = 8 - valence - order - radical - 2*lonePairs
-                    atom.setLonePairs(lonePairs)
-                    atom.updateCharge()
+                try:
+                    valence = _valences[atom.symbol]
+                except KeyError:
+                    raise InvalidAdjacencyListError('Cannot add hydrogens to adjacency list: Unknown valence for atom "{0}".'.format(atom.symbol))
+                order = 0
+                for bond in atom.edges.itervalues():
+                    order += _bondOrders[bond.order]
+                if atom.isHydrogen():
+                    atom.setLonePairs(1 - order - atom.radicalElectrons)
                 else:
-                    valence = valences[atom.symbol]
-                    radical = atom.radicalElectrons
-                    order = 0
-                    for atom2, bond in atom.bonds.items():
-                        order += orders[bond.order]
-                    lonePairs = 1 - order - radical
-                    charge = 2 - valence - order - radical - 2*lonePairs
-                    atom.setLonePairs(lonePairs)
-                    atom.updateCharge()
+                    atom.setLonePairs(4 - order - atom.radicalElectrons)
         elif not group:
             for atom in atoms:
                 atom.updateCharge()
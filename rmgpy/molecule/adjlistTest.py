@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from rmgpy.molecule.adjlist import fromAdjacencyList, parseAdjacencyList, toAdjacencyList, InvalidAdjacencyListError
+from rmgpy.molecule.molecule import Molecule
+
+################################################################################
+
+class TestFromAdjacencyList(unittest.TestCase):
+    """
+    Contains unit tests of the fromAdjacencyList() function.
+    """
+
+    def setUp(self):
+        """
+        A method called before each unit test in this class.
+        """
+        self.adjlist = """
+ethyl
+1 *1 C 1 0 {2,S} {3,S} {4,S}
+2    C 0 0 {1,S} {5,S} {6,S} {7,S}
+3    H 0 0 {1,S}
+4    H 0 0 {1,S}
+5    H 0 0 {2,S}
+6    H 0 0 {2,S}
+7    H 0 0 {2,S}
+"""
+        self.groupAdjlist = """
+1 *1 {Cd,Ct} {1,2T} {2,{S,D}}
+2 *2 R!H     0      {1,{S,D}}
+"""
+
+    def testCachedParse(self):
+        """
+        Test that parsing an adjacency list from the cache creates new atoms
+        that are the same as those of the first parse.
+        """
+        atoms1 = fromAdjacencyList(self.adjlist)
+        atoms2 = fromAdjacencyList(self.adjlist)
+        atoms3 = parseAdjacencyList(self.adjlist)
+        self.assertEqual(len(atoms2), 7)
+        self.assertEqual(toAdjacencyList(atoms1), toAdjacencyList(atoms2))
+        self.assertEqual(toAdjacencyList(atoms2), toAdjacencyList(atoms3))
+        self.assertEqual(atoms2[0].label, '*1')
+        self.assertEqual(atoms2[0].radicalElectrons, 1)
+        # The cached atoms must not share anything with those returned earlier
+        for atom1, atom2 in zip(atoms1, atoms2):
+            self.assertFalse(atom1 is atom2)
+            self.assertFalse(any([a in atoms1 for a in atom2.edges]))
+
+    def testCachedGroupParse(self):
+        """
+        Test that parsing a group adjacency list from the cache creates new
+        group atoms with their own lists of atom types, electron states, and
+        bond orders.
+        """
+        atoms1 = fromAdjacencyList(self.groupAdjlist, group=True)
+        atoms2 = fromAdjacencyList(self.groupAdjlist, group=True)
+        self.assertEqual(toAdjacencyList(atoms1, group=True), toAdjacencyList(atoms2, group=True))
+        self.assertEqual([a.label for a in atoms2[0].atomType], ['Cd', 'Ct'])
+        self.assertEqual(atoms2[0].radicalElectrons, [1, 2])
+        self.assertEqual(atoms2[0].spinMultiplicity, [2, 3])
+        self.assertEqual(atoms2[0].edges[atoms2[1]].order, ['S', 'D'])
+        atoms2[0].radicalElectrons.append(0)
+        atoms2[0].edges[atoms2[1]].order.append('T')
+        atoms3 = fromAdjacencyList(self.groupAdjlist, group=True)
+        self.assertEqual(atoms3[0].radicalElectrons, [1, 2])
+        self.assertEqual(atoms3[0].edges[atoms3[1]].order, ['S', 'D'])
+
+    def testIrregularFormatting(self):
+        """
+        Test that adjacency lists written with trailing periods, commas
+        between bonds, and extra whitespace give the same result as the
+        regular format.
+        """
+        adjlist = """
+1. C 0 {2,S},{3,S}
+2  C 0 {1,S}
+3.  O   0  {1,S},
+"""
+        regular = """
+1 C 0 {2,S} {3,S}
+2 C 0 {1,S}
+3 O 0 {1,S}
+"""
+        molecule1 = Molecule().fromAdjacencyList(adjlist, saturateH=True)
+        molecule2 = Molecule().fromAdjacencyList(regular, saturateH=True)
+        self.assertTrue(molecule1.isIsomorphic(molecule2))
+        self.assertEqual(molecule1.toAdjacencyList(), molecule2.toAdjacencyList())
+
+    def testInvalidAdjacencyList(self):
+        """
+        Test that invalid adjacency lists raise InvalidAdjacencyListError
+        every time they are parsed, i.e. that they are never cached.
+        """
+        adjlists = [
+            """
+1 C 0 {2,S}
+2 C 0
+""",
+            """
+1 C 0 {1,S}
+""",
+            """
+1 {Cd, Ct} 0
+""",
+        ]
+        for adjlist in adjlists:
+            for i in range(2):
+                self.assertRaises(InvalidAdjacencyListError, fromAdjacencyList, adjlist, True)
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
@@ -0,0 +1,88 @@
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2009-2011 by the RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+cimport numpy
+
+from .molecule cimport Atom, Bond, Molecule
+
+cdef struct MatchState:
+    int size
+    numpy.int32_t *bondStart1
+    numpy.int32_t *bondAtoms1
+    numpy.int32_t *bondOrders1
+    numpy.int32_t *ranks1
+    numpy.int32_t *bondStart2
+    numpy.int32_t *bondAtoms2
+    numpy.int32_t *bondOrders2
+    numpy.int32_t *ranks2
+    int *order
+    int *parent
+    int *map1
+    int *map2
+
+cdef class CompactMolecule:
+
+    cdef readonly int size
+    cdef readonly numpy.ndarray elements
+    cdef readonly numpy.ndarray atomTypes
+    cdef readonly numpy.ndarray radicalElectrons
+    cdef readonly numpy.ndarray spinMultiplicities
+    cdef readonly numpy.ndarray charges
+    cdef readonly numpy.ndarray lonePairs
+    cdef readonly tuple labels
+    cdef readonly numpy.ndarray bondStart
+    cdef readonly numpy.ndarray bondAtoms
+    cdef readonly numpy.ndarray bondOrders
+
+    cdef str _fingerprint
+    cdef numpy.ndarray _ranks
+    cdef tuple _certificate
+
+    cpdef int getNumBonds(self)
+
+    cpdef Molecule toMolecule(self)
+
+    cpdef str getFormula(self)
+
+    cpdef str getFingerprint(self)
+
+    cpdef int getRingCount(self)
+
+    cpdef list getCyclicAtoms(self)
+
+    cpdef list getCanonicalRanks(self)
+
+    cpdef tuple getCertificate(self)
+
+    cpdef bint isIsomorphic(self, CompactMolecule other) except -2
+
+    cpdef list findIsomorphism(self, CompactMolecule other)
+
+    cdef refine(self)
+
+cdef numpy.ndarray toArray(list values)
+
+cdef bint matchAtoms(MatchState *state, int depth) nogil
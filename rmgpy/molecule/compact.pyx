@@ -0,0 +1,513 @@
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2009-2011 by the RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This module contains a compact, array-based representation of a molecule.
+A :class:`CompactMolecule` stores the atoms of a :class:`Molecule` as arrays
+of integers (element, atom type, radical electrons, spin multiplicity,
+charge, and lone pairs) and the bonds in compressed sparse row (CSR) form,
+so that it can be created, copied, compared, and pickled without creating
+any :class:`Atom` or :class:`Bond` objects. Isomorphism, canonical ranking,
+fingerprinting, and ring perception run directly on the arrays.
+"""
+
+import numpy
+cimport numpy
+
+cimport cython
+from libc.stdlib cimport malloc, free
+
+from .atomtype import atomTypes as _atomTypes
+from .element import getElement
+
+################################################################################
+
+# The atom type labels, in the order used for the atom type indices
+cdef list _atomTypeLabels = sorted(_atomTypes.keys())
+cdef dict _atomTypeIndices = dict([(label, index) for index, label in enumerate(_atomTypeLabels)])
+
+# The integer code used for each bond order
+cdef dict _bondOrderCodes = {'S': 1, 'D': 2, 'T': 3, 'B': 4}
+cdef list _bondOrders = ['', 'S', 'D', 'T', 'B']
+
+cdef numpy.ndarray toArray(list values):
+    """
+    Return the list of integers `values` as a read-only array.
+    """
+    cdef numpy.ndarray array = numpy.array(values, numpy.int32)
+    array.flags.writeable = False
+    return array
+
+################################################################################
+
+cdef class CompactMolecule:
+    """
+    A compact, immutable representation of the molecule `molecule`. The
+    attributes are:
+
+    ======================= =========== ========================================
+    Attribute               Type        Description
+    ======================= =========== ========================================
+    `size`                  ``int``     The number of atoms
+    `elements`              ``ndarray`` The atomic number of each atom
+    `atomTypes`             ``ndarray`` The index of the atom type of each atom in the sorted atom type labels, or -1
+    `radicalElectrons`      ``ndarray`` The number of radical electrons on each atom
+    `spinMultiplicities`    ``ndarray`` The spin multiplicity of each atom
+    `charges`               ``ndarray`` The formal charge of each atom
+    `lonePairs`             ``ndarray`` The number of lone electron pairs on each atom
+    `labels`                ``tuple``   The label of each atom
+    `bondStart`             ``ndarray`` The index in `bondAtoms` of the first bond of each atom, plus the total number of entries
+    `bondAtoms`             ``ndarray`` The index of the atom at the other end of each bond
+    `bondOrders`            ``ndarray`` The order of each bond: 1 (single), 2 (double), 3 (triple) or 4 (benzene)
+    ======================= =========== ========================================
+
+    The bonds of atom ``i`` are the entries ``bondStart[i]`` to
+    ``bondStart[i+1] - 1`` of `bondAtoms` and `bondOrders`; each bond
+    appears once for each of its atoms. Atom ``i`` corresponds to the atom
+    ``molecule.atoms[i]``. Use :meth:`toMolecule` to convert back to a
+    :class:`Molecule`.
+    """
+
+    def __init__(self, Molecule molecule):
+        cdef Atom atom, atom2
+        cdef Bond bond
+        cdef dict indices
+        cdef int i
+        cdef list elements, atomTypes, radicalElectrons, spinMultiplicities, charges, lonePairs, labels
+        cdef list bondStart, bondAtoms, bondOrders
+
+        self.size = len(molecule.vertices)
+        indices = {}
+        for i, atom in enumerate(molecule.vertices):
+            indices[atom] = i
+
+        elements = []; atomTypes = []; radicalElectrons = []; spinMultiplicities = []
+        charges = []; lonePairs = []; labels = []
+        bondStart = []; bondAtoms = []; bondOrders = []
+        for atom in molecule.vertices:
+            elements.append(atom.element.number)
+            atomTypes.append(_atomTypeIndices[atom.atomType.label] if atom.atomType is not None else -1)
+            radicalElectrons.append(atom.radicalElectrons)
+            spinMultiplicities.append(atom.spinMultiplicity)
+            charges.append(atom.charge)
+            lonePairs.append(atom.lonePairs)
+            labels.append(atom.label)
+            bondStart.append(len(bondAtoms))
+            for atom2, bond in atom.edges.iteritems():
+                bondAtoms.append(indices[atom2])
+                bondOrders.append(_bondOrderCodes[bond.order])
+        bondStart.append(len(bondAtoms))
+
+        self.elements = toArray(elements)
+        self.atomTypes = toArray(atomTypes)
+        self.radicalElectrons = toArray(radicalElectrons)
+        self.spinMultiplicities = toArray(spinMultiplicities)
+        self.charges = toArray(charges)
+        self.lonePairs = toArray(lonePairs)
+        self.labels = tuple(labels)
+        self.bondStart = toArray(bondStart)
+        self.bondAtoms = toArray(bondAtoms)
+        self.bondOrders = toArray(bondOrders)
+
+        self._fingerprint = None
+        self._ranks = None
+        self._certificate = None
+
+    def __reduce__(self):
+        """
+        A helper function used when pickling an object.
+        """
+        return (CompactMolecule, (self.toMolecule(),))
+
+    cpdef int getNumBonds(self):
+        """
+        Return the number of bonds in the molecule.
+        """
+        return len(self.bondAtoms) // 2
+
+    cpdef Molecule toMolecule(self):
+        """
+        Return a new :class:`Molecule` object equivalent to this one. The
+        atoms of the molecule are in the same order as in this object.
+        """
+        cdef Molecule molecule
+        cdef Atom atom
+        cdef list atoms, elements, atomTypes, radicalElectrons, spinMultiplicities, charges, lonePairs
+        cdef list bondStart, bondAtoms, bondOrders
+        cdef int i, j, k
+
+        elements = self.elements.tolist(); atomTypes = self.atomTypes.tolist()
+        radicalElectrons = self.radicalElectrons.tolist(); spinMultiplicities = self.spinMultiplicities.tolist()
+        charges = self.charges.tolist(); lonePairs = self.lonePairs.tolist()
+        bondStart = self.bondStart.tolist(); bondAtoms = self.bondAtoms.tolist(); bondOrders = self.bondOrders.tolist()
+
+        molecule = Molecule()
+        atoms = []
+        for i in range(self.size):
+            atom = Atom(getElement(elements[i]), radicalElectrons[i], spinMultiplicities[i], charges[i], self.labels[i], lonePairs[i])
+            if atomTypes[i] >= 0:
+                atom.atomType = _atomTypes[_atomTypeLabels[atomTypes[i]]]
+            molecule.addAtom(atom)
+            atoms.append(atom)
+        for i in range(self.size):
+            for k in range(bondStart[i], bondStart[i+1]):
+                j = bondAtoms[k]
+                if i < j:
+                    molecule.addBond(Bond(atoms[i], atoms[j], _bondOrders[bondOrders[k]]))
+        molecule.updateConnectivityValues()
+        return molecule
+
+    cpdef str getFormula(self):
+        """
+        Return the molecular formula for the molecule, in the same form as
+        :meth:`Molecule.getFormula`.
+        """
+        cdef dict elements
+        cdef str formula, symbol
+        cdef int i
+
+        elements = {}
+        for number in self.elements.tolist():
+            symbol = getElement(number).symbol
+            elements[symbol] = elements.get(symbol, 0) + 1
+        formula = ''
+        for symbol in sorted(elements):
+            count = elements[symbol]
+            formula += '{0}{1:d}'.format(symbol, count) if count > 1 else symbol
+        return formula
+
+    cpdef str getFingerprint(self):
+        """
+        Return a string containing the "fingerprint" used to accelerate graph
+        isomorphism comparisons with other molecules. This is the same as
+        the fingerprint returned by :meth:`Molecule.getFingerprint`.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self.getFormula()
+        return self._fingerprint
+
+    cpdef int getRingCount(self):
+        """
+        Return the number of rings in the molecule, i.e. the number of bonds
+        minus the number of atoms plus the number of connected components.
+        """
+        cdef numpy.int32_t *bondStart = <numpy.int32_t *> self.bondStart.data
+        cdef numpy.int32_t *bondAtoms = <numpy.int32_t *> self.bondAtoms.data
+        cdef int *component
+        cdef int *stack
+        cdef int i, j, k, top, count
+
+        if self.size == 0:
+            return 0
+        component = <int *> malloc(self.size * sizeof(int))
+        stack = <int *> malloc(self.size * sizeof(int))
+        if component == NULL or stack == NULL:
+            free(component); free(stack)
+            raise MemoryError()
+        with nogil:
+            for i in range(self.size):
+                component[i] = -1
+            count = 0
+            for i in range(self.size):
+                if component[i] >= 0: continue
+                component[i] = count
+                stack[0] = i; top = 1
+                while top > 0:
+                    top -= 1
+                    j = stack[top]
+                    for k in range(bondStart[j], bondStart[j+1]):
+                        if component[bondAtoms[k]] < 0:
+                            component[bondAtoms[k]] = count
+                            stack[top] = bondAtoms[k]; top += 1
+                count += 1
+        free(component); free(stack)
+        return self.getNumBonds() - self.size + count
+
+    cpdef list getCyclicAtoms(self):
+        """
+        Return a list of the indices of the atoms that are in at least one
+        ring. The atoms are found in linear time as those with at least one
+        bond that is not a bridge, using Tarjan's bridge-finding algorithm.
+        """
+        cdef numpy.int32_t *bondStart = <numpy.int32_t *> self.bondStart.data
+        cdef numpy.int32_t *bondAtoms = <numpy.int32_t *> self.bondAtoms.data
+        cdef int *discovery
+        cdef int *low
+        cdef int *parent
+        cdef int *position
+        cdef int *stack
+        cdef char *cyclic
+        cdef int i, v, w, p, top, time
+        cdef list result
+
+        if self.size == 0:
+            return []
+        discovery = <int *> malloc(self.size * sizeof(int))
+        low = <int *> malloc(self.size * sizeof(int))
+        parent = <int *> malloc(self.size * sizeof(int))
+        position = <int *> malloc(self.size * sizeof(int))
+        stack = <int *> malloc(self.size * sizeof(int))
+        cyclic = <char *> malloc(self.size * sizeof(char))
+        if discovery == NULL or low == NULL or parent == NULL or position == NULL or stack == NULL or cyclic == NULL:
+            free(discovery); free(low); free(parent); free(position); free(stack); free(cyclic)
+            raise MemoryError()
+
+        with nogil:
+            for i in range(self.size):
+                discovery[i] = -1
+                cyclic[i] = 0
+            time = 0
+            for i in range(self.size):
+                if discovery[i] >= 0: continue
+                # Iterative depth-first search from atom i
+                discovery[i] = time; low[i] = time; time += 1
+                parent[i] = -1; position[i] = bondStart[i]
+                stack[0] = i; top = 1
+                while top > 0:
+                    v = stack[top-1]
+                    if position[v] < bondStart[v+1]:
+                        w = bondAtoms[position[v]]
+                        position[v] += 1
+                        if discovery[w] < 0:
+                            discovery[w] = time; low[w] = time; time += 1
+                            parent[w] = v; position[w] = bondStart[w]
+                            stack[top] = w; top += 1
+                        elif w != parent[v] and discovery[w] < low[v]:
+                            low[v] = discovery[w]
+                    else:
+                        top -= 1
+                        p = parent[v]
+                        if p >= 0:
+                            if low[v] < low[p]:
+                                low[p] = low[v]
+                            if low[v] <= discovery[p]:
+                                # The bond between p and v is not a bridge,
+                                # so it (and both atoms) are in a ring
+                                cyclic[p] = 1; cyclic[v] = 1
+
+        result = [i for i in range(self.size) if cyclic[i]]
+        free(discovery); free(low); free(parent); free(position); free(stack); free(cyclic)
+        return result
+
+    cdef refine(self):
+        """
+        Compute the canonical ranks and certificate of the molecule by
+        iterative refinement of the atom invariants, starting from the
+        element, radical electrons, spin multiplicity, charge, and number of
+        bonds of each atom, and repeatedly adding the ranks of the bonded
+        atoms and the bond orders until no more atoms can be distinguished.
+        """
+        cdef list signatures, distinct, rounds, ranks, bondStart, bondAtoms, bondOrders
+        cdef dict rankings
+        cdef int i, k, count
+
+        bondStart = self.bondStart.tolist(); bondAtoms = self.bondAtoms.tolist(); bondOrders = self.bondOrders.tolist()
+        signatures = zip(self.elements.tolist(), self.radicalElectrons.tolist(), self.spinMultiplicities.tolist(),
+                         self.charges.tolist(), [bondStart[i+1] - bondStart[i] for i in range(self.size)])
+        rounds = []
+        count = -1
+        while True:
+            distinct = sorted(set(signatures))
+            rankings = dict([(signature, rank) for rank, signature in enumerate(distinct)])
+            rounds.append(tuple(sorted(signatures)))
+            ranks = [rankings[signature] for signature in signatures]
+            if len(distinct) == count:
+                break
+            count = len(distinct)
+            signatures = [(ranks[i], tuple(sorted([(ranks[bondAtoms[k]], bondOrders[k]) for k in range(bondStart[i], bondStart[i+1])])))
+                          for i in range(self.size)]
+
+        self._ranks = numpy.array(ranks, numpy.int32)
+        self._certificate = tuple(rounds)
+
+    cpdef list getCanonicalRanks(self):
+        """
+        Return a list of the canonical rank of each atom. Atoms that are
+        equivalent by symmetry have the same rank; atoms that cannot be
+        distinguished by their invariants (or those of their neighbors, their
+        neighbors' neighbors, etc.) also have the same rank. The ranks do not
+        depend on the order of the atoms, so corresponding atoms of isomorphic
+        molecules have the same rank.
+        """
+        if self._ranks is None:
+            self.refine()
+        return self._ranks.tolist()
+
+    cpdef tuple getCertificate(self):
+        """
+        Return a tuple summarizing the invariants computed for the canonical
+        ranks. Isomorphic molecules always have the same certificate, so two
+        certificates matching is a necessary (but not sufficient) condition
+        for the molecules to be isomorphic. When they do match, the canonical
+        ranks of the two molecules can be compared directly.
+        """
+        if self._certificate is None:
+            self.refine()
+        return self._certificate
+
+    cpdef bint isIsomorphic(self, CompactMolecule other) except -2:
+        """
+        Return ``True`` if `other` is isomorphic to this molecule, or
+        ``False`` otherwise. Atoms are compared in the same way as
+        :meth:`Molecule.isIsomorphic`, i.e. by element, radical electrons,
+        spin multiplicity, and charge, and bonds by bond order.
+        """
+        return self.findIsomorphism(other) is not None
+
+    cpdef list findIsomorphism(self, CompactMolecule other):
+        """
+        Return a list giving, for each atom of this molecule, the index of the
+        corresponding atom of the isomorphic molecule `other`, or ``None`` if
+        the molecules are not isomorphic.
+        """
+        cdef MatchState state
+        cdef numpy.ndarray ranks1, ranks2
+        cdef int i, j, k, root, best
+        cdef list order, parent, classSizes, ranks, bondStart, bondAtoms, result
+        cdef set visited
+        cdef bint found
+
+        if self.size != other.size or len(self.bondAtoms) != len(other.bondAtoms):
+            return None
+        if self.getFingerprint() != other.getFingerprint():
+            return None
+        if self.getCertificate() != other.getCertificate():
+            return None
+        ranks1 = self._ranks; ranks2 = other._ranks
+
+        # Match the atoms in breadth-first order, starting each connected
+        # component from an atom in the smallest class of equivalent atoms
+        ranks = ranks1.tolist()
+        bondStart = self.bondStart.tolist(); bondAtoms = self.bondAtoms.tolist()
+        classSizes = [0] * self.size
+        for i in range(self.size):
+            classSizes[ranks[i]] += 1
+        order = []; parent = []
+        visited = set()
+        while len(order) < self.size:
+            best = -1
+            for i in range(self.size):
+                if i not in visited and (best < 0 or classSizes[ranks[i]] < classSizes[ranks[best]]):
+                    best = i
+            visited.add(best)
+            order.append(best); parent.append(-1)
+            root = len(order) - 1
+            while root < len(order):
+                i = order[root]
+                for k in range(bondStart[i], bondStart[i+1]):
+                    j = bondAtoms[k]
+                    if j not in visited:
+                        visited.add(j)
+                        order.append(j); parent.append(i)
+                root += 1
+
+        state.size = self.size
+        state.bondStart1 = <numpy.int32_t *> self.bondStart.data
+        state.bondAtoms1 = <numpy.int32_t *> self.bondAtoms.data
+        state.bondOrders1 = <numpy.int32_t *> self.bondOrders.data
+        state.ranks1 = <numpy.int32_t *> ranks1.data
+        state.bondStart2 = <numpy.int32_t *> other.bondStart.data
+        state.bondAtoms2 = <numpy.int32_t *> other.bondAtoms.data
+        state.bondOrders2 = <numpy.int32_t *> other.bondOrders.data
+        state.ranks2 = <numpy.int32_t *> ranks2.data
+        state.order = <int *> malloc(max(self.size, 1) * sizeof(int))
+        state.parent = <int *> malloc(max(self.size, 1) * sizeof(int))
+        state.map1 = <int *> malloc(max(self.size, 1) * sizeof(int))
+        state.map2 = <int *> malloc(max(self.size, 1) * sizeof(int))
+        if state.order == NULL or state.parent == NULL or state.map1 == NULL or state.map2 == NULL:
+            free(state.order); free(state.parent); free(state.map1); free(state.map2)
+            raise MemoryError()
+        for i in range(self.size):
+            state.order[i] = order[i]
+            state.parent[i] = parent[i]
+            state.map1[i] = -1
+            state.map2[i] = -1
+
+        with nogil:
+            found = matchAtoms(&state, 0)
+
+        result = [state.map1[i] for i in range(self.size)] if found else None
+        free(state.order); free(state.parent); free(state.map1); free(state.map2)
+        return result
+
+################################################################################
+
+cdef bint matchAtoms(MatchState *state, int depth) nogil:
+    """
+    Recursively match the atom at position `depth` of the matching order,
+    and all subsequent atoms, given the atoms already matched. Candidates
+    must have the same canonical rank, and must be bonded to the image of the
+    atom's parent in the matching order (if any) and to the images of all
+    other matched atoms bonded to it, with the same bond orders.
+    """
+    cdef int i, p, c, j, k, l, l2, start, end, count1, count2
+    cdef bint ok
+
+    if depth == state.size:
+        return True
+
+    i = state.order[depth]
+    p = state.parent[depth]
+    if p >= 0:
+        start = state.bondStart2[state.map1[p]]; end = state.bondStart2[state.map1[p]+1]
+    else:
+        start = 0; end = state.size
+
+    for l in range(start, end):
+        c = state.bondAtoms2[l] if p >= 0 else l
+        if state.map2[c] >= 0 or state.ranks2[c] != state.ranks1[i]:
+            continue
+        # Every matched atom bonded to i must map to an atom bonded to c with
+        # the same bond order, and c must have no other matched neighbors
+        ok = True
+        count1 = 0
+        for k in range(state.bondStart1[i], state.bondStart1[i+1]):
+            j = state.map1[state.bondAtoms1[k]]
+            if j < 0: continue
+            count1 += 1
+            for l2 in range(state.bondStart2[c], state.bondStart2[c+1]):
+                if state.bondAtoms2[l2] == j:
+                    if state.bondOrders2[l2] != state.bondOrders1[k]:
+                        ok = False
+                    break
+            else:
+                ok = False
+            if not ok: break
+        if not ok: continue
+        count2 = 0
+        for k in range(state.bondStart2[c], state.bondStart2[c+1]):
+            if state.map2[state.bondAtoms2[k]] >= 0:
+                count2 += 1
+        if count1 != count2: continue
+
+        state.map1[i] = c
+        state.map2[c] = i
+        if matchAtoms(state, depth + 1):
+            return True
+        state.map1[i] = -1
+        state.map2[c] = -1
+
+    return False
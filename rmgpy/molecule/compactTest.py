@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+import cPickle
+
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.molecule.compact import CompactMolecule
+
+################################################################################
+
+class TestCompactMolecule(unittest.TestCase):
+    """
+    Contains unit tests of the CompactMolecule class.
+    """
+
+    def setUp(self):
+        """
+        A method called before each unit test in this class.
+        """
+        # Methylcyclopropane
+        self.molecule = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S} {3,S} {4,S}
+2 C 0 0 {1,S} {3,S}
+3 C 0 0 {1,S} {2,S}
+4 C 0 0 {1,S}
+""", saturateH=True)
+        # 1-butene
+        self.butene = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,D}
+2 C 0 0 {1,D} {3,S}
+3 C 0 0 {2,S} {4,S}
+4 C 0 0 {3,S}
+""", saturateH=True)
+        self.compact = CompactMolecule(self.molecule)
+
+    def testArrays(self):
+        """
+        Test that the atoms and bonds are stored correctly in the arrays.
+        """
+        self.assertEqual(self.compact.size, len(self.molecule.atoms))
+        self.assertEqual(self.compact.getNumBonds(), 12)
+        for i, atom in enumerate(self.molecule.atoms):
+            self.assertEqual(self.compact.elements[i], atom.element.number)
+            self.assertEqual(self.compact.radicalElectrons[i], atom.radicalElectrons)
+            start, end = self.compact.bondStart[i], self.compact.bondStart[i+1]
+            self.assertEqual(end - start, len(atom.edges))
+            for j in self.compact.bondAtoms[start:end]:
+                self.assertTrue(self.molecule.atoms[j] in atom.edges)
+        self.assertRaises(ValueError, self.compact.elements.__setitem__, 0, 1)
+
+    def testToMolecule(self):
+        """
+        Test that CompactMolecule.toMolecule() recovers the original molecule.
+        """
+        molecule = self.compact.toMolecule()
+        self.assertEqual(molecule.toAdjacencyList(), self.molecule.toAdjacencyList())
+        self.assertTrue(molecule.isIsomorphic(self.molecule))
+        compact = cPickle.loads(cPickle.dumps(self.compact))
+        self.assertEqual(compact.toMolecule().toAdjacencyList(), self.molecule.toAdjacencyList())
+
+    def testIsIsomorphic(self):
+        """
+        Test that CompactMolecule.isIsomorphic() agrees with
+        Molecule.isIsomorphic().
+        """
+        molecule = self.molecule.copy(deep=True)
+        molecule.vertices.reverse()
+        compact = CompactMolecule(molecule)
+        self.assertTrue(self.compact.isIsomorphic(compact))
+        mapping = self.compact.findIsomorphism(compact)
+        self.assertTrue(self.molecule.isMappingValid(molecule, dict([(atom, molecule.atoms[mapping[i]]) for i, atom in enumerate(self.molecule.atoms)])))
+        butene = CompactMolecule(self.butene)
+        self.assertEqual(self.compact.getFingerprint(), butene.getFingerprint())
+        self.assertFalse(self.compact.isIsomorphic(butene))
+        self.assertFalse(self.molecule.isIsomorphic(self.butene))
+
+    def testGetCanonicalRanks(self):
+        """
+        Test that symmetric atoms have the same canonical ranks, and that the
+        ranks do not depend on the order of the atoms.
+        """
+        ranks = self.compact.getCanonicalRanks()
+        self.assertEqual(ranks[1], ranks[2])
+        self.assertNotEqual(ranks[0], ranks[1])
+        self.assertNotEqual(ranks[0], ranks[3])
+        molecule = self.molecule.copy(deep=True)
+        molecule.vertices.reverse()
+        compact = CompactMolecule(molecule)
+        self.assertEqual(compact.getCertificate(), self.compact.getCertificate())
+        self.assertEqual(sorted(compact.getCanonicalRanks()), sorted(ranks))
+        self.assertEqual(compact.getCanonicalRanks()[-1], ranks[0])
+
+    def testRings(self):
+        """
+        Test the ring perception methods.
+        """
+        self.assertEqual(self.compact.getRingCount(), 1)
+        self.assertEqual(self.compact.getCyclicAtoms(), [0, 1, 2])
+        butene = CompactMolecule(self.butene)
+        self.assertEqual(butene.getRingCount(), 0)
+        self.assertEqual(butene.getCyclicAtoms(), [])
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
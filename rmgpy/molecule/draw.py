@@ -50,6 +50,8 @@ import numpy
 import os.path
 import re
 import logging
+import hashlib
+import shutil
 
 from rmgpy.qm.molecule import Geometry
 from rdkit.Chem import AllChem
@@ -1486,3 +1488,161 @@ class ReactionDrawer:
             surface.write_to_png(path)
         else:
             surface.finish()
+
+################################################################################
+
+def _drawMolecule(args):
+    """
+    Draw a molecule to a file on disk, where `args` is the tuple
+    ``(molecule, format, path, options)``. Returns ``True`` if the file was
+    created. Used by :func:`drawMolecules` as the task run by each worker
+    process.
+    """
+    molecule, format, path, options = args
+    MoleculeDrawer(options).draw(molecule, format, path)
+    return os.path.exists(path)
+
+def getDrawingKey(molecule, format, options=None):
+    """
+    Return the key used to store drawings of `molecule` in the given image
+    `format` and with the given drawing `options` in an on-disk drawing cache.
+    The key is derived from the augmented InChIKey of the molecule (or its
+    formula if an InChIKey cannot be generated), so it is the same across
+    runs; different structures can still share a key, so cached drawings
+    must also be checked against the structure saved with them.
+    """
+    try:
+        identifier = molecule.toAugmentedInChIKey()
+    except Exception:
+        identifier = molecule.getFormula()
+    options = sorted(MoleculeDrawer(options).options.items())
+    return hashlib.md5('{0} {1} {2!r}'.format(identifier, format.lower(), options)).hexdigest()
+
+def findCachedDrawing(molecule, format, cacheDirectory, key=None):
+    """
+    Return the path of the drawing of `molecule` in the given image `format`
+    stored in the on-disk drawing cache `cacheDirectory`, or ``None`` if the
+    structure has not been drawn. The `key` is the value of
+    :func:`getDrawingKey` for the molecule, if already known.
+    """
+    from rmgpy.molecule.molecule import Molecule
+    if key is None:
+        key = getDrawingKey(molecule, format)
+    index = 0
+    while True:
+        path = os.path.join(cacheDirectory, '{0}-{1:d}.{2}'.format(key, index, format.lower()))
+        adjlistPath = os.path.splitext(path)[0] + '.adj'
+        if not os.path.exists(adjlistPath):
+            return None
+        with open(adjlistPath, 'r') as f:
+            other = Molecule().fromAdjacencyList(f.read())
+        if os.path.exists(path) and molecule.isIsomorphic(other):
+            return path
+        index += 1
+
+def saveCachedDrawing(molecule, format, cacheDirectory, source, key=None):
+    """
+    Add the drawing of `molecule` in the given image `format` at the path
+    `source` to the on-disk drawing cache `cacheDirectory`, along with the
+    adjacency list of the molecule. The `key` is the value of
+    :func:`getDrawingKey` for the molecule, if already known. Returns the
+    path of the cached drawing.
+    """
+    if key is None:
+        key = getDrawingKey(molecule, format)
+    index = 0
+    while True:
+        path = os.path.join(cacheDirectory, '{0}-{1:d}.{2}'.format(key, index, format.lower()))
+        adjlistPath = os.path.splitext(path)[0] + '.adj'
+        if not os.path.exists(adjlistPath):
+            break
+        index += 1
+    shutil.copyfile(source, path)
+    # The adjacency list is written last, since its presence marks the
+    # drawing as complete
+    with open(adjlistPath, 'w') as f:
+        f.write(molecule.toAdjacencyList())
+    return path
+
+def drawMolecules(molecules, paths, format='png', options=None, processes=1, cacheDirectory=None):
+    """
+    Draw each of the given `molecules` to the corresponding file in `paths`
+    using the given image `format` and drawing `options`. Returns a list
+    containing ``True`` for each drawing that was saved and ``False`` for
+    each one that could not be drawn.
+    
+    Each unique structure is only drawn once, and the drawing is copied to
+    the paths of any isomorphic molecules. If `cacheDirectory` is given,
+    drawings found there are reused instead of being drawn again, and new
+    drawings are added to it, so the cache can be shared across jobs; a
+    cache that cannot be read or written only logs a warning. If
+    `processes` is greater than one, the remaining drawings are distributed
+    over a pool of that many worker processes.
+    """
+    from rmgpy.molecule.molecule import getCachedIdentifiers
+
+    if len(molecules) != len(paths):
+        raise ValueError('Expected one path for each of the {0:d} molecules to draw, got {1:d}.'.format(len(molecules), len(paths)))
+
+    if cacheDirectory is not None and not os.path.isdir(cacheDirectory):
+        try:
+            os.makedirs(cacheDirectory)
+        except OSError:
+            logging.warning('Unable to create drawing cache directory "{0}"; drawings will not be cached.'.format(cacheDirectory))
+            cacheDirectory = None
+
+    # Group the molecules by structure, using the identifier cache to
+    # recognize isomorphic molecules
+    # (the identifier dicts are kept in `identities` so their ids stay unique)
+    groups = []; identities = {}
+    for molecule, path in zip(molecules, paths):
+        identifiers = getCachedIdentifiers(molecule)
+        try:
+            groups[identities[id(identifiers)][1]][1].append(path)
+        except KeyError:
+            identities[id(identifiers)] = (identifiers, len(groups))
+            groups.append((molecule, [path]))
+
+    # Find the structures that have not been drawn before
+    sources = []; keys = []; tasks = []; pending = []
+    for index, (molecule, groupPaths) in enumerate(groups):
+        key = None; source = None
+        if cacheDirectory is not None:
+            key = getDrawingKey(molecule, format, options)
+            try:
+                source = findCachedDrawing(molecule, format, cacheDirectory, key)
+            except Exception:
+                logging.warning('Unable to read drawing of {0} from cache {1}.'.format(molecule, cacheDirectory))
+        keys.append(key)
+        sources.append(source)
+        if source is None:
+            tasks.append((molecule, format, groupPaths[0], options))
+            pending.append(index)
+
+    if processes > 1 and len(tasks) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_drawMolecule, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(_drawMolecule, tasks)
+    for index, task, result in zip(pending, tasks, results):
+        if result:
+            sources[index] = task[2]
+            if cacheDirectory is not None:
+                try:
+                    saveCachedDrawing(groups[index][0], format, cacheDirectory, task[2], keys[index])
+                except (IOError, OSError):
+                    logging.warning('Unable to save drawing of {0} to cache {1}.'.format(groups[index][0], cacheDirectory))
+
+    # Copy each drawing to the paths that do not already contain it
+    drawn = {}
+    for (molecule, groupPaths), source in zip(groups, sources):
+        for path in groupPaths:
+            if source is not None and os.path.abspath(path) != os.path.abspath(source):
+                shutil.copyfile(source, path)
+            drawn[path] = source is not None
+    return [drawn[path] for path in paths]
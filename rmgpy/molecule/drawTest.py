@@ -76,6 +76,41 @@ class TestMoleculeDrawer(unittest.TestCase):
         self.assertIsInstance(surface, PDFSurface)
         self.assertGreater(width, height)
 
+    def testDrawMolecules(self):
+        """
+        Test we can draw a batch of molecules, drawing each structure once
+        and reusing the drawings in the cache directory.
+        """
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            cacheDirectory = os.path.join(directory, 'cache')
+            molecules = [self.molecule, Molecule(SMILES='CCC(C)=O'), Molecule(SMILES='CCO')]
+            paths = [os.path.join(directory, '{0:d}.png'.format(i)) for i in range(3)]
+            self.assertEqual(drawMolecules(molecules, paths, 'png', cacheDirectory=cacheDirectory), [True, True, True])
+            for path in paths:
+                self.assertTrue(os.path.exists(path), "File doesn't exist")
+            # Two unique structures, each with an image and an adjacency list
+            self.assertEqual(len(os.listdir(cacheDirectory)), 4)
+            self.assertIsNotNone(findCachedDrawing(Molecule(SMILES='OCC'), 'png', cacheDirectory))
+            self.assertIsNone(findCachedDrawing(Molecule(SMILES='COC'), 'png', cacheDirectory))
+
+            path = os.path.join(directory, 'ethanol.png')
+            self.assertEqual(drawMolecules([Molecule(SMILES='OCC')], [path], 'png', cacheDirectory=cacheDirectory), [True])
+            self.assertTrue(os.path.exists(path), "File doesn't exist")
+            self.assertEqual(len(os.listdir(cacheDirectory)), 4)
+
+            # A cache that cannot be used does not prevent drawing
+            cacheDirectory = os.path.join(directory, 'file')
+            with open(cacheDirectory, 'w') as f:
+                f.write('')
+            path = os.path.join(directory, 'ethane.png')
+            self.assertEqual(drawMolecules([Molecule(SMILES='CC')], [path], 'png', cacheDirectory=cacheDirectory), [True])
+            self.assertTrue(os.path.exists(path), "File doesn't exist")
+        finally:
+            shutil.rmtree(directory)
+
 ################################################################################
 
 if __name__ == '__main__':
@@ -28,7 +28,9 @@ cdef class Vertex(object):
 
     cdef public dict edges
 
-    # These attributes are used in the VF2 graph isomorphism algorithm
+    # These attributes are used to sort the vertices of the graph; the VF2
+    # graph isomorphism algorithm keeps its own copies of the connectivity
+    # values and does not use `terminal` or `mapping`
     cdef public short connectivity1
     cdef public short connectivity2
     cdef public short connectivity3
@@ -42,6 +44,8 @@ cdef class Vertex(object):
 
     cpdef bint isSpecificCaseOf(self, Vertex other) except -2
 
+    cpdef int getMatchLabel(self) except -1
+
     cpdef resetConnectivityValues(self)
 
 cpdef short getVertexConnectivityValue(Vertex vertex) except 1 # all values should be negative
@@ -110,7 +114,9 @@ cdef class Graph:
 
     cpdef bint isEdgeInCycle(self, Edge edge) except -2
 
-    cpdef bint __isChainInCycle(self, list chain) except -2
+    cpdef set getBridges(self)
+
+    cpdef set _getBridges(self)
 
     cpdef list getAllCyclicVertices(self)
     
@@ -120,6 +126,8 @@ cdef class Graph:
 
     cpdef list __exploreCyclesRecursively(self, list chain, list cycles)
 
+    cpdef list getSmallestCycle(self, Vertex startingVertex)
+
     cpdef list getSmallestSetOfSmallestRings(self)
     
     cpdef bint isMappingValid(self, Graph other, dict mapping) except -2
@@ -107,6 +107,18 @@ cdef class Vertex(object):
         """
         return True
 
+    cpdef int getMatchLabel(self) except -1:
+        """
+        Return a nonnegative integer label used to partition the vertices in
+        isomorphism searches. Two vertices with different nonzero labels must
+        never be equivalent, and a vertex with a nonzero label must never be
+        a specific case of a vertex with a different nonzero label. The
+        default implementation returns zero, which matches any label; you
+        should reimplement this function in a derived class if your vertices
+        have semantic information.
+        """
+        return 0
+
     cpdef resetConnectivityValues(self):
         """
         Reset the cached structure information for this vertex.
@@ -467,65 +479,101 @@ cdef class Graph:
         ``False`` otherwise.
         """
         cdef Vertex vertex
+        cdef int count
+        count = 0
         for vertex in self.vertices:
-            if self.isVertexInCycle(vertex):
-                return True
-        return False
+            count += len(vertex.edges)
+        # The graph is acyclic if and only if every edge is a bridge
+        return len(self._getBridges()) < count // 2
 
     cpdef bint isVertexInCycle(self, Vertex vertex) except -2:
         """
         Return ``True`` if the given `vertex` is contained in one or more
         cycles in the graph, or ``False`` if not.
         """
-        return self.__isChainInCycle([vertex])
+        cdef set bridges
+        cdef Edge edge
+        bridges = self._getBridges()
+        for edge in vertex.edges.itervalues():
+            if edge not in bridges:
+                return True
+        return False
 
     cpdef bint isEdgeInCycle(self, Edge edge) except -2:
         """
         Return :data:`True` if the edge between vertices `vertex1` and `vertex2`
         is in one or more cycles in the graph, or :data:`False` if not.
         """
-        cdef list cycles
-        cycles = self.getAllCycles(edge.vertex1)
-        for cycle in cycles:
-            if edge.vertex2 in cycle:
-                return True
-        return False
+        return edge.vertex2 in edge.vertex1.edges and edge not in self._getBridges()
 
-    cpdef bint __isChainInCycle(self, list chain) except -2:
+    cpdef set getBridges(self):
         """
-        Return ``True`` if the given `chain` of vertices is contained in one
-        or more cycles or ``False`` otherwise. This function recursively calls
-        itself.
+        Return the set of edges that are not contained in any cycle in the
+        graph, i.e. the edges whose removal would disconnect the graph. The
+        bridges are found in linear time using an iterative version of
+        Tarjan's depth-first search algorithm: an edge from a vertex to its
+        child in the search tree is a bridge if no vertex in the subtree of
+        the child has an edge back to the vertex or any of its ancestors.
         """
-        cdef Vertex vertex1, vertex2
+        cdef dict discovery, low
+        cdef set bridges
+        cdef list stack
+        cdef Vertex root, vertex, vertex2, parent
         cdef Edge edge
-
-        vertex1 = chain[-1]
-        for vertex2 in vertex1.edges:
-            if vertex2 is chain[0] and len(chain) > 2:
-                return True
-            elif vertex2 not in chain:
-                # Make the chain a little longer and explore again
-                chain.append(vertex2)
-                if self.__isChainInCycle(chain):
-                    # We found a cycle, so the return value must be True
-                    return True
+        cdef int time
+
+        discovery = {}; low = {}
+        bridges = set()
+        time = 0
+        for root in self.vertices:
+            if root in discovery: continue
+            discovery[root] = time; low[root] = time; time += 1
+            stack = [(root, None, root.edges.iteritems())]
+            while len(stack) > 0:
+                vertex, parentEdge, neighbors = stack[-1]
+                for vertex2, edge in neighbors:
+                    if edge is parentEdge:
+                        continue
+                    elif vertex2 in discovery:
+                        if discovery[vertex2] < low[vertex]: low[vertex] = discovery[vertex2]
+                    else:
+                        # Descend to vertex2; the remaining neighbors of vertex
+                        # are processed when we return to it
+                        discovery[vertex2] = time; low[vertex2] = time; time += 1
+                        stack.append((vertex2, edge, vertex2.edges.iteritems()))
+                        break
                 else:
-                    # We did not find a cycle down this path, so remove the vertex from the chain
-                    chain.remove(vertex2)
-        # If we reach this point then we did not find any cycles involving this chain
-        return False
-    
+                    stack.pop()
+                    if len(stack) > 0:
+                        parent = stack[-1][0]
+                        if low[vertex] < low[parent]: low[parent] = low[vertex]
+                        if low[vertex] > discovery[parent]: bridges.add(parentEdge)
+        return bridges
+
+    cpdef set _getBridges(self):
+        """
+        Return the set of bridges used by the cycle queries, which do not
+        modify it. Subclasses that cache the bridges override this to return
+        the cached set itself rather than a copy.
+        """
+        return self.getBridges()
+
     cpdef list getAllCyclicVertices(self):
         """ 
         Returns all vertices belonging to one or more cycles.        
         """
         cdef list cyclicVertices
-        # Loop through all vertices and check whether they are cyclic
+        cdef set bridges
+        cdef Vertex vertex
+        cdef Edge edge
+        # A vertex is cyclic if any of its edges is not a bridge
+        bridges = self._getBridges()
         cyclicVertices = []
         for vertex in self.vertices:
-            if self.isVertexInCycle(vertex):
-                cyclicVertices.append(vertex)                
+            for edge in vertex.edges.itervalues():
+                if edge not in bridges:
+                    cyclicVertices.append(vertex)
+                    break
         return cyclicVertices
     
     cpdef list getAllPolycyclicVertices(self):
@@ -577,6 +625,57 @@ cdef class Graph:
         # At this point we should have discovered all of the cycles involving the current chain
         return cycles
 
+    cpdef list getSmallestCycle(self, Vertex startingVertex):
+        """
+        Given a starting vertex, return the smallest cycle containing that
+        vertex as a list of vertices in ring order, starting with
+        `startingVertex`, or an empty list if the vertex is not in a cycle.
+        The cycle is found in linear time by a breadth-first search from the
+        starting vertex: the smallest cycle is closed by the edge, joining
+        vertices reached via different neighbors of the starting vertex, with
+        the smallest total distance from the starting vertex.
+        """
+        cdef dict parent, depth, branch
+        cdef list queue, cycle
+        cdef Vertex vertex, vertex2, best1, best2
+        cdef int index, length, bestLength
+
+        parent = {startingVertex: None}
+        depth = {startingVertex: 0}
+        branch = {startingVertex: None}
+        queue = [startingVertex]
+        best1 = None; best2 = None; bestLength = -1
+        index = 0
+        while index < len(queue):
+            vertex = queue[index]
+            index += 1
+            for vertex2 in vertex.edges:
+                if vertex2 not in depth:
+                    parent[vertex2] = vertex
+                    depth[vertex2] = depth[vertex] + 1
+                    branch[vertex2] = vertex2 if vertex is startingVertex else branch[vertex]
+                    queue.append(vertex2)
+                elif vertex is not startingVertex and vertex2 is not startingVertex and branch[vertex2] is not branch[vertex]:
+                    length = depth[vertex] + depth[vertex2] + 1
+                    if bestLength < 0 or length < bestLength:
+                        best1 = vertex; best2 = vertex2; bestLength = length
+
+        if bestLength < 0:
+            return []
+        # The cycle runs from the starting vertex down to best1, then across
+        # to best2 and back up to the starting vertex
+        cycle = []
+        vertex = best1
+        while vertex is not None:
+            cycle.append(vertex)
+            vertex = parent[vertex]
+        cycle.reverse()
+        vertex = best2
+        while vertex is not startingVertex:
+            cycle.append(vertex)
+            vertex = parent[vertex]
+        return cycle
+
     cpdef list getSmallestSetOfSmallestRings(self):
         """
         Return a list of the smallest set of smallest rings in the graph. The
@@ -589,35 +688,20 @@ cdef class Graph:
         p. 657-662 (1993).
         """
         cdef Graph graph
-        cdef bint done, found
-        cdef list cycleList, cycles, cycle, graphs, neighbors, verticesToRemove, vertices
+        cdef list cycleList, cycle, graphs, verticesToRemove, vertices
+        cdef set cyclicVertices
         cdef Vertex vertex, rootVertex
 
         # Make a copy of the graph so we don't modify the original
         graph = self.copy(deep=True)
         vertices = graph.vertices[:]
         
-        # Step 1: Remove all terminal vertices
-        done = False
-        while not done:
-            verticesToRemove = []
-            for vertex in graph.vertices:
-                if len(vertex.edges) == 1: verticesToRemove.append(vertex)
-            done = len(verticesToRemove) == 0
-            # Remove identified vertices from graph
-            for vertex in verticesToRemove:
+        # Steps 1 and 2: Remove all vertices that are not part of cycles
+        cyclicVertices = set(graph.getAllCyclicVertices())
+        for vertex in vertices:
+            if vertex not in cyclicVertices:
                 graph.removeVertex(vertex)
 
-        # Step 2: Remove all other vertices that are not part of cycles
-        verticesToRemove = []
-        for vertex in graph.vertices:
-            found = graph.isVertexInCycle(vertex)
-            if not found:
-                verticesToRemove.append(vertex)
-        # Remove identified vertices from graph
-        for vertex in verticesToRemove:
-            graph.removeVertex(vertex)
-
         # Step 3: Split graph into remaining subgraphs
         graphs = graph.split()
 
@@ -635,18 +719,12 @@ cdef class Graph:
                     elif len(vertex.edges) < len(rootVertex.edges):
                         rootVertex = vertex
 
-                # Get all cycles involving the root vertex
-                cycles = graph.getAllCycles(rootVertex)
-                if len(cycles) == 0:
+                # Get the smallest cycle involving the root vertex
+                cycle = graph.getSmallestCycle(rootVertex)
+                if len(cycle) == 0:
                     # This vertex is no longer in a ring, so remove it
                     graph.removeVertex(rootVertex)
                     continue
-
-                # Keep the smallest of the cycles found above
-                cycle = cycles[0]
-                for c in cycles[1:]:
-                    if len(c) < len(cycle):
-                        cycle = c
                 cycleList.append(cycle)
                 
                 # Remove the root vertex to create single edges, note this will not
@@ -392,6 +392,93 @@ class TestGraph(unittest.TestCase):
             self.assertTrue( graph1.isMappingValid(graph2,mapping) )
             self.assertTrue( graph1.isMappingValid(graph2,mapping) )
     
+    def test_isomorphismDisconnected(self):
+        """
+        Check the isomorphism functions on graphs with more than one
+        connected component, with and without an initial mapping.
+        """
+        # A 4-cycle and a path of three vertices
+        graph1 = Graph()
+        vertices1 = [graph1.addVertex(Vertex()) for i in range(7)]
+        for i in range(4): graph1.addEdge(Edge(vertices1[i], vertices1[(i+1) % 4]))
+        for i in range(4, 6): graph1.addEdge(Edge(vertices1[i], vertices1[i+1]))
+        # The same graph, with its vertices in a different order
+        graph2 = Graph()
+        vertices2 = [graph2.addVertex(Vertex()) for i in range(7)]
+        for i in range(2): graph2.addEdge(Edge(vertices2[i], vertices2[i+1]))
+        for i in range(3, 7): graph2.addEdge(Edge(vertices2[i], vertices2[3 + (i-2) % 4]))
+
+        self.assertTrue(graph1.isIsomorphic(graph2))
+        # There are eight automorphisms of the 4-cycle and two of the path
+        mapList = graph1.findIsomorphism(graph2)
+        self.assertEqual(len(mapList), 16)
+        for mapping in mapList:
+            self.assertTrue(graph1.isMappingValid(graph2, mapping))
+
+        # Fix the middle of the path, then one vertex of the cycle
+        mapList = graph1.findIsomorphism(graph2, {vertices1[5]: vertices2[1]})
+        self.assertEqual(len(mapList), 16)
+        mapList = graph1.findIsomorphism(graph2, {vertices1[0]: vertices2[3]})
+        self.assertEqual(len(mapList), 4)
+        self.assertFalse(graph1.isIsomorphic(graph2, {vertices1[4]: vertices2[1]}))
+
+        # A path of two vertices matches three times in each direction
+        graph3 = Graph()
+        vertices3 = [graph3.addVertex(Vertex()) for i in range(2)]
+        graph3.addEdge(Edge(vertices3[0], vertices3[1]))
+        self.assertEqual(len(graph1.findSubgraphIsomorphisms(graph3)), 12)
+        # A 3-cycle cannot be matched at all
+        graph4 = Graph()
+        vertices4 = [graph4.addVertex(Vertex()) for i in range(3)]
+        for i in range(3): graph4.addEdge(Edge(vertices4[i], vertices4[(i+1) % 3]))
+        self.assertFalse(graph1.isSubgraphIsomorphic(graph4))
+
+    def test_isomorphismReentrant(self):
+        """
+        Check that the isomorphism functions do not modify the graphs, and
+        that they can be nested and run from multiple threads.
+        """
+        import threading
+
+        graph1 = Graph()
+        vertices1 = [graph1.addVertex(Vertex()) for i in range(6)]
+        for i in range(5): graph1.addEdge(Edge(vertices1[i], vertices1[i+1]))
+        graph2 = Graph()
+        vertices2 = [graph2.addVertex(Vertex()) for i in range(6)]
+        for i in range(5): graph2.addEdge(Edge(vertices2[5-i], vertices2[4-i]))
+        graph3 = Graph()
+        vertices3 = [graph3.addVertex(Vertex()) for i in range(6)]
+        for i in range(5): graph3.addEdge(Edge(vertices3[0], vertices3[i+1]))
+
+        self.assertTrue(graph1.isIsomorphic(graph2))
+        self.assertFalse(graph1.isIsomorphic(graph3))
+        self.assertEqual(len(graph1.findIsomorphism(graph2)), 2)
+        self.assertEqual(graph1.vertices, vertices1)
+        self.assertEqual(graph2.vertices, vertices2)
+        for vertex in vertices1 + vertices2:
+            self.assertEqual(vertex.sortingLabel, -1)
+            self.assertTrue(vertex.mapping is None)
+
+        # Nest an isomorphism check on the same graphs within another one
+        class NestingVertex(Vertex):
+            def equivalent(self, other):
+                return graph1.isIsomorphic(graph2) and not graph1.isIsomorphic(graph3)
+        graph4 = Graph()
+        vertices4 = [graph4.addVertex(NestingVertex()) for i in range(6)]
+        for i in range(5): graph4.addEdge(Edge(vertices4[i], vertices4[i+1]))
+        self.assertTrue(graph4.isIsomorphic(graph1))
+        self.assertEqual(len(graph4.findIsomorphism(graph2)), 2)
+
+        results = []
+        def worker():
+            for i in range(100):
+                results.append(graph1.isIsomorphic(graph2) and not graph1.isIsomorphic(graph3))
+        threads = [threading.Thread(target=worker) for i in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(results), 400)
+        self.assertTrue(all(results))
+
     def test_pickle(self):
         """
         Test that a Graph object can be successfully pickled and unpickled
@@ -500,6 +587,35 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(len(cycleList[0]), 4)
         self.assertEqual(len(cycleList[1]), 4)
         
+    def test_getBridges(self):
+        """
+        Test the Graph.getBridges() method.
+        """
+        self.assertEqual(len(self.graph.getBridges()), 5)
+        edge = Edge(self.graph.vertices[0], self.graph.vertices[3])
+        self.graph.addEdge(edge) # To create a cycle
+        bridges = self.graph.getBridges()
+        self.assertEqual(len(bridges), 2)
+        self.assertTrue(self.graph.vertices[3].edges[self.graph.vertices[4]] in bridges)
+        self.assertTrue(self.graph.vertices[4].edges[self.graph.vertices[5]] in bridges)
+
+    def test_getSmallestCycle(self):
+        """
+        Test the Graph.getSmallestCycle() method.
+        """
+        vertices = self.graph.vertices
+        self.assertEqual(self.graph.getSmallestCycle(vertices[0]), [])
+        self.graph.addEdge(Edge(vertices[0], vertices[3])) # To create a 4-ring
+        self.graph.addEdge(Edge(vertices[3], vertices[5])) # To create a spiro 3-ring
+        cycle = self.graph.getSmallestCycle(vertices[0])
+        self.assertEqual(len(cycle), 4)
+        self.assertTrue(cycle[0] is vertices[0])
+        self.assertEqual(set(cycle), set(vertices[0:4]))
+        for i in range(len(cycle)):
+            self.assertTrue(cycle[i-1] in cycle[i].edges)
+        self.assertEqual(len(self.graph.getSmallestCycle(vertices[5])), 3)
+        self.assertEqual(set(self.graph.getSmallestCycle(vertices[5])), set(vertices[3:6]))
+
     def test_getSmallestSetOfSmallestRings(self):
         """
         Test the Graph.getSmallestSetOfSmallestRings() method.
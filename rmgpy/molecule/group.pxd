@@ -88,6 +88,9 @@ cdef class Group(Graph):
     cdef public short sulfurCount
     cdef public short radicalCount
 
+    # The compiled match plan, created on first use by groupmatch.getMatchPlan
+    cdef object _matchPlan
+
     cpdef addAtom(self, GroupAtom atom)
 
     cpdef addBond(self, GroupBond bond)
@@ -686,7 +686,8 @@ class Group(Graph):
     def updateFingerprint(self):
         """
         Update the molecular fingerprint used to accelerate the subgraph
-        isomorphism checks.
+        isomorphism checks. This also discards the compiled match plan, if
+        any, so that it is recompiled on next use.
         """
         cython.declare(atom=GroupAtom, atomType=AtomType)
         cython.declare(carbon=AtomType, nitrogen=AtomType, oxygen=AtomType, sulfur=AtomType)
@@ -702,6 +703,7 @@ class Group(Graph):
         self.oxygenCount   = 0
         self.sulfurCount   = 0
         self.radicalCount  = 0
+        self._matchPlan = None
         for atom in self.vertices:
             if len(atom.atomType) == 1:
                 atomType   = atom.atomType[0]
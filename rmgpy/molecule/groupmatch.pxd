@@ -0,0 +1,67 @@
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2009-2011 by the RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+from .group cimport GroupAtom, GroupBond, Group
+from .molecule cimport Atom, Bond, Molecule
+
+cdef class MatchStep:
+
+    cdef public int index
+    cdef public int parent
+    cdef public frozenset atomTypes
+    cdef public unsigned long long radicalMask
+    cdef public list neighbors
+    cdef public list bondMasks
+
+cdef class CenterFilter:
+
+    cdef public str label
+    cdef public frozenset atomTypes
+    cdef public unsigned long long radicalMask
+    cdef public list neighborTypes
+    cdef public list neighborMasks
+    cdef public list bondMasks
+    cdef public list counts
+
+cdef class GroupMatchPlan:
+
+    cdef public Group group
+    cdef public list atoms
+    cdef public list steps
+    cdef public dict orders
+    cdef public list centers
+
+    cpdef list getSteps(self, list initialAtoms)
+
+    cpdef CenterFilter getCenterFilter(self, str label, GroupAtom atom)
+
+    cpdef bint matchCenters(self, dict atoms) except -2
+
+    cpdef bint isSubgraphIsomorphic(self, Molecule molecule, dict initialMap, list excludedAtoms=?) except -2
+
+    cdef bint match(self, list steps, int depth, list images, set available, list vertices) except -2
+
+cpdef GroupMatchPlan getMatchPlan(Group group)
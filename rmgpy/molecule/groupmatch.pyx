@@ -0,0 +1,466 @@
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2009-2011 by the RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This module contains compiled matching plans for functional groups. A plan
+precomputes everything about a :class:`Group` that does not depend on the
+molecule it is matched against: the order in which the group atoms are
+matched, the set of atom types each group atom accepts (with generic atom
+types already expanded to their specific cases), and bit masks of the
+allowed radical states and bond orders. Matching a molecule against the plan
+then reduces to a short backtracking search over the neighbors of the atoms
+already matched.
+
+A plan also records the local features of each labeled atom in the group: its
+atom types and radical states and those of its neighbors. These are checked
+by :meth:`GroupMatchPlan.matchCenters` against the correspondingly labeled
+atoms of a molecule, which quickly rejects most groups that cannot match
+without any search at all.
+
+The result of :meth:`GroupMatchPlan.isSubgraphIsomorphic` is the same as
+that of :meth:`Molecule.isSubgraphIsomorphic`.
+"""
+
+cimport cython
+
+################################################################################
+
+# The bit used for each bond order in the bond order masks
+cdef dict _bondOrderBits = {'S': 1, 'D': 2, 'T': 4, 'B': 8}
+
+cdef class MatchStep:
+    """
+    A single step of a :class:`GroupMatchPlan`, in which one group atom is
+    matched to an atom in the molecule. The attributes are:
+
+    =================== =================== ====================================
+    Attribute           Type                Description
+    =================== =================== ====================================
+    `index`             ``int``             The index of the group atom in the group
+    `parent`            ``int``             The step of a group atom adjacent to this one, or -1 if none
+    `atomTypes`         ``frozenset``       The atom types that match the group atom
+    `radicalMask`       ``int``             A bit mask of the allowed radical electrons and spin multiplicities
+    `neighbors`         ``list``            The earlier steps of the group atoms bonded to this one
+    `bondMasks`         ``list``            Bit masks of the allowed orders of the bonds to `neighbors`
+    =================== =================== ====================================
+
+    Candidate atoms for this step are taken from the neighbors of the atom
+    matched in the `parent` step, or from the whole molecule if there is no
+    parent.
+    """
+
+    def __init__(self, index=-1, parent=-1, atomTypes=None, radicalMask=0, neighbors=None, bondMasks=None):
+        self.index = index
+        self.parent = parent
+        self.atomTypes = atomTypes or frozenset()
+        self.radicalMask = radicalMask
+        self.neighbors = neighbors or []
+        self.bondMasks = bondMasks or []
+
+################################################################################
+
+cdef class CenterFilter:
+    """
+    The local features of a labeled atom in a functional group, which the
+    atom with the same label in a molecule must have for the group to match.
+    The attributes are:
+
+    =================== =================== ====================================
+    Attribute           Type                Description
+    =================== =================== ====================================
+    `label`             ``str``             The label of the group atom
+    `atomTypes`         ``frozenset``       The atom types that match the group atom
+    `radicalMask`       ``int``             A bit mask of the allowed radical electrons and spin multiplicities
+    `neighborTypes`     ``list``            The atom types that match each kind of neighbor of the group atom
+    `neighborMasks`     ``list``            The radical masks of each kind of neighbor
+    `bondMasks`         ``list``            The bond order masks of the bonds to each kind of neighbor
+    `counts`            ``list``            The number of neighbors of each kind
+    =================== =================== ====================================
+
+    Each kind of neighbor must be matched by at least as many distinct
+    neighbors of the molecule atom as the group atom has.
+    """
+
+    def __init__(self, label='', atomTypes=None, radicalMask=0, neighborTypes=None, neighborMasks=None, bondMasks=None, counts=None):
+        self.label = label
+        self.atomTypes = atomTypes or frozenset()
+        self.radicalMask = radicalMask
+        self.neighborTypes = neighborTypes or []
+        self.neighborMasks = neighborMasks or []
+        self.bondMasks = bondMasks or []
+        self.counts = counts or []
+
+cdef frozenset getAtomTypes(GroupAtom atom):
+    """
+    Return the set of atom types that match the group atom `atom`, with
+    generic atom types expanded to their specific cases.
+    """
+    return frozenset([a for atomType in atom.atomType for a in [atomType] + atomType.specific])
+
+cdef unsigned long long getRadicalMask(GroupAtom atom):
+    """
+    Return a bit mask of the radical electrons and spin multiplicities
+    allowed for the group atom `atom`.
+    """
+    cdef unsigned long long radicalMask = 0
+    cdef int radical, spin
+    for radical, spin in zip(atom.radicalElectrons, atom.spinMultiplicity):
+        radicalMask |= 1ULL << (radical * 8 + spin)
+    return radicalMask
+
+cdef unsigned long long getBondMask(GroupBond bond):
+    """
+    Return a bit mask of the bond orders allowed for the group bond `bond`.
+    """
+    return sum([_bondOrderBits.get(bondOrder, 0) for bondOrder in bond.order])
+
+cdef inline bint isRadicalAllowed(Atom atom, unsigned long long radicalMask):
+    """
+    Return ``True`` if the radical state of the molecule atom `atom` is in
+    the radical mask `radicalMask`, or ``False`` if not.
+    """
+    cdef int radical = atom.radicalElectrons, spin = atom.spinMultiplicity
+    if not (0 <= radical < 8 and 0 <= spin < 8):
+        return False
+    return (radicalMask >> (radical * 8 + spin)) & 1
+
+################################################################################
+
+cdef class GroupMatchPlan:
+    """
+    A compiled plan for matching the functional group `group` against
+    molecules. The attributes are:
+
+    =================== =================== ====================================
+    Attribute           Type                Description
+    =================== =================== ====================================
+    `group`             :class:`Group`      The functional group being matched
+    `atoms`             ``list``            The group atoms, in the order used for their indices
+    `steps`             ``list``            The matching steps, one per group atom, with no initial mapping
+    `orders`            ``dict``            The matching steps for each set of initially mapped group atoms
+    `centers`           ``list``            The :class:`CenterFilter` of each uniquely labeled group atom
+    =================== =================== ====================================
+
+    Plans are created by :func:`getMatchPlan`, which stores them on the group
+    so each group is only compiled once.
+    """
+
+    def __init__(self, Group group):
+        cdef GroupAtom atom
+        self.group = group
+        self.atoms = group.vertices[:]
+        # Fail now, rather than during matching, for radical states that
+        # cannot be represented in the radical masks
+        for atom in self.atoms:
+            for radical, spin in zip(atom.radicalElectrons, atom.spinMultiplicity):
+                if not (0 <= radical < 8 and 0 <= spin < 8):
+                    raise ValueError('Unable to compile match plan for group with radical electrons {0} and spin multiplicity {1}.'.format(radical, spin))
+        self.orders = {}
+        self.steps = self.getSteps([])
+        self.centers = []
+        labeledAtoms = group.getLabeledAtoms()
+        for label in sorted(labeledAtoms):
+            # Atoms that share a label cannot be paired with a molecule atom
+            if isinstance(labeledAtoms[label], GroupAtom):
+                self.centers.append(self.getCenterFilter(label, labeledAtoms[label]))
+
+    cpdef CenterFilter getCenterFilter(self, str label, GroupAtom atom):
+        """
+        Return the :class:`CenterFilter` for the group atom `atom` with label
+        `label`. Neighbors with the same atom types, radical states, and bond
+        orders are counted together. Labeled neighbors are left out, since they
+        may be paired with a molecule atom by the initial mapping, which is not
+        checked.
+        """
+        cdef GroupAtom atom2
+        cdef GroupBond bond
+        cdef list neighborTypes, neighborMasks, bondMasks, counts
+        cdef frozenset atomTypes
+        cdef unsigned long long radicalMask, bondMask
+        cdef int i
+
+        neighborTypes = []; neighborMasks = []; bondMasks = []; counts = []
+        for atom2, bond in atom.edges.iteritems():
+            if atom2.label:
+                continue
+            atomTypes = getAtomTypes(atom2)
+            radicalMask = getRadicalMask(atom2)
+            bondMask = getBondMask(bond)
+            for i in range(len(counts)):
+                if neighborTypes[i] == atomTypes and neighborMasks[i] == radicalMask and bondMasks[i] == bondMask:
+                    counts[i] += 1
+                    break
+            else:
+                neighborTypes.append(atomTypes)
+                neighborMasks.append(radicalMask)
+                bondMasks.append(bondMask)
+                counts.append(1)
+
+        return CenterFilter(label, getAtomTypes(atom), getRadicalMask(atom), neighborTypes, neighborMasks, bondMasks, counts)
+
+    cpdef list getSteps(self, list initialAtoms):
+        """
+        Return the list of :class:`MatchStep` objects to use when the group
+        atoms `initialAtoms` have already been mapped. The initially mapped
+        atoms come first; each remaining atom is chosen to have as many bonds
+        as possible to the atoms before it, so that candidates can be taken
+        from the neighbors of atoms already matched.
+        """
+        cdef list steps, order, remaining, neighbors, bondMasks
+        cdef dict positions
+        cdef GroupAtom atom, atom2
+        cdef GroupBond bond
+        cdef MatchStep step
+        cdef int index, best, count, bestCount, parent
+        cdef unsigned long long radicalMask
+        cdef frozenset atomTypes
+
+        key = tuple(sorted([self.atoms.index(atom) for atom in initialAtoms]))
+        try:
+            return self.orders[key]
+        except KeyError:
+            pass
+
+        # Determine the order in which to match the group atoms
+        order = list(key)
+        remaining = [index for index in range(len(self.atoms)) if index not in key]
+        while len(remaining) > 0:
+            best = remaining[0]; bestCount = -1
+            for index in remaining:
+                atom = self.atoms[index]
+                count = 0
+                for atom2 in atom.edges:
+                    if self.atoms.index(atom2) in order:
+                        count += 1
+                # Prefer the atom with the most bonds to atoms already placed,
+                # then the one with the most bonds overall
+                count = count * 100 + len(atom.edges)
+                if count > bestCount:
+                    best = index; bestCount = count
+            order.append(best)
+            remaining.remove(best)
+
+        # Compile a step for each group atom
+        positions = {}
+        steps = []
+        for index in order:
+            atom = self.atoms[index]
+
+            atomTypes = getAtomTypes(atom)
+            radicalMask = getRadicalMask(atom)
+
+            parent = -1; neighbors = []; bondMasks = []
+            for atom2, bond in atom.edges.iteritems():
+                if atom2 in positions:
+                    if parent == -1:
+                        parent = positions[atom2]
+                    neighbors.append(positions[atom2])
+                    bondMasks.append(getBondMask(bond))
+
+            step = MatchStep(index, parent, atomTypes, radicalMask, neighbors, bondMasks)
+            positions[atom] = len(steps)
+            steps.append(step)
+
+        self.orders[key] = steps
+        return steps
+
+    cpdef bint matchCenters(self, dict atoms) except -2:
+        """
+        Return ``False`` if the group certainly does not match a molecule with
+        the labeled atoms `atoms`, a dict of the molecule atoms keyed by their
+        labels, or ``True`` if it might. Each labeled atom of the molecule must
+        have the local features of the group atom with the same label in the
+        plan's `centers`. Labels that are not in `atoms`, or that are not
+        paired with a single molecule atom, are not checked.
+        """
+        cdef CenterFilter center
+        cdef Atom atom, atom2
+        cdef Bond bond
+        cdef unsigned long long bondMask
+        cdef int i, count
+
+        for center in self.centers:
+            item = atoms.get(center.label)
+            if not isinstance(item, Atom):
+                continue
+            atom = item
+            if atom.atomType not in center.atomTypes:
+                return False
+            if not isRadicalAllowed(atom, center.radicalMask):
+                return False
+            for i in range(len(center.counts)):
+                count = 0
+                bondMask = center.bondMasks[i]
+                for atom2, bond in atom.edges.iteritems():
+                    if (atom2.atomType in center.neighborTypes[i] and
+                        bondMask & _bondOrderBits.get(bond.order, 0) and
+                        isRadicalAllowed(atom2, center.neighborMasks[i])):
+                        count += 1
+                if count < center.counts[i]:
+                    return False
+
+        return True
+
+    cpdef bint isSubgraphIsomorphic(self, Molecule molecule, dict initialMap, list excludedAtoms=None) except -2:
+        """
+        Return ``True`` if the group is subgraph isomorphic to `molecule`,
+        or ``False`` otherwise. The `initialMap` attribute can be used to
+        specify a required mapping from `molecule` to the group (i.e. the
+        atoms of `molecule` are the keys, while the atoms of the group are the
+        values). As with :meth:`Molecule.isSubgraphIsomorphic`, the initial
+        mapping itself is not checked. The atoms of `molecule` in the list of
+        `excludedAtoms`, if given, are not matched to any group atom, as if
+        they had been removed from the molecule.
+        """
+        cdef Group group
+        cdef Atom atom
+        cdef list steps, images
+        cdef set available
+        cdef dict inverse, elements
+        cdef MatchStep step
+        cdef int depth, carbonCount, nitrogenCount, oxygenCount, sulfurCount, radicalCount, atomCount
+        cdef str symbol
+
+        group = self.group
+        if initialMap is None:
+            initialMap = {}
+        if excludedAtoms is None:
+            excludedAtoms = []
+
+        # Count the number of carbons, oxygens, and radicals in the molecule
+        elements = molecule.getElementCounts()
+        carbonCount = elements.get('C', 0)
+        nitrogenCount = elements.get('N', 0)
+        oxygenCount = elements.get('O', 0)
+        sulfurCount = elements.get('S', 0)
+        radicalCount = 0
+        for atom in molecule.vertices:
+            radicalCount += atom.radicalElectrons
+        for atom in excludedAtoms:
+            symbol = atom.element.symbol
+            if symbol == 'C': carbonCount -= 1
+            elif symbol == 'N': nitrogenCount -= 1
+            elif symbol == 'O': oxygenCount -= 1
+            elif symbol == 'S': sulfurCount -= 1
+            radicalCount -= atom.radicalElectrons
+        atomCount = len(molecule.vertices) - len(excludedAtoms)
+        # If the molecule has fewer of any of these things than the functional
+        # group does, then we know the subgraph isomorphism fails without
+        # needing to perform the full isomorphism check
+        if (radicalCount < group.radicalCount or
+            carbonCount < group.carbonCount or
+            nitrogenCount < group.nitrogenCount or
+            oxygenCount < group.oxygenCount or
+            sulfurCount < group.sulfurCount):
+            return False
+
+        if atomCount < len(self.atoms):
+            return False
+
+        steps = self.steps if len(initialMap) == 0 else self.getSteps(initialMap.values())
+
+        # Apply the initial mapping
+        inverse = {}
+        for atom, groupAtom in initialMap.iteritems():
+            inverse[groupAtom] = atom
+        available = set(molecule.vertices)
+        available.difference_update(excludedAtoms)
+        images = [None] * len(steps)
+        for depth in range(len(inverse)):
+            step = steps[depth]
+            atom = inverse[self.atoms[step.index]]
+            images[depth] = atom
+            available.discard(atom)
+
+        return self.match(steps, len(inverse), images, available, molecule.vertices)
+
+    cdef bint match(self, list steps, int depth, list images, set available, list vertices) except -2:
+        """
+        Recursively match the group atom at step `depth` and all subsequent
+        steps, given the molecule atoms `images` matched in the previous
+        steps and the molecule atoms still `available` for matching.
+        """
+        cdef MatchStep step
+        cdef Atom atom, other
+        cdef Bond bond
+        cdef int i
+        cdef unsigned long long bondMask
+
+        if depth == len(steps):
+            return True
+
+        step = steps[depth]
+        if step.parent >= 0:
+            candidates = (<Atom>images[step.parent]).edges
+        else:
+            candidates = vertices
+
+        for atom in candidates:
+            if atom not in available:
+                continue
+            # Semantic check #1: the atom must be a specific case of the group atom
+            if atom.atomType not in step.atomTypes:
+                continue
+            if not isRadicalAllowed(atom, step.radicalMask):
+                continue
+            # Semantic check #2: bonds to group atoms matched earlier must
+            # be present in the molecule with an allowed bond order
+            for i in range(len(step.neighbors)):
+                other = images[<int>step.neighbors[i]]
+                bond = atom.edges.get(other)
+                if bond is None:
+                    break
+                bondMask = step.bondMasks[i]
+                if not bondMask & _bondOrderBits.get(bond.order, 0):
+                    break
+            else:
+                images[depth] = atom
+                available.remove(atom)
+                if self.match(steps, depth + 1, images, available, vertices):
+                    return True
+                available.add(atom)
+                images[depth] = None
+
+        return False
+
+################################################################################
+
+cpdef GroupMatchPlan getMatchPlan(Group group):
+    """
+    Return the compiled :class:`GroupMatchPlan` for `group`, compiling it on
+    first use. The plan is stored on the group and discarded whenever the
+    group's fingerprint is updated. Returns ``None`` if the group cannot be
+    compiled, in which case :meth:`Molecule.isSubgraphIsomorphic` should be
+    used instead.
+    """
+    if group._matchPlan is None:
+        try:
+            group._matchPlan = GroupMatchPlan(group)
+        except ValueError:
+            group._matchPlan = False
+    if group._matchPlan is False:
+        return None
+    return group._matchPlan
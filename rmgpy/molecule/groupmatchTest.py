@@ -0,0 +1,114 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.molecule.group import Group
+from rmgpy.molecule.groupmatch import getMatchPlan
+
+################################################################################
+
+class TestGroupMatchPlan(unittest.TestCase):
+    """
+    Contains unit tests of the GroupMatchPlan class.
+    """
+
+    def setUp(self):
+        """
+        A method called before each unit test in this class.
+        """
+        # 1-methylallyl radical
+        self.molecule = Molecule().fromAdjacencyList("""
+1 C 1 0 {2,S} {4,S}
+2 C 0 0 {1,S} {3,D}
+3 C 0 0 {2,D}
+4 C 0 0 {1,S}
+""", saturateH=True)
+        self.group = Group().fromAdjacencyList("""
+1 *1 C 1 0 {2,S}
+2 *2 Cd 0 0 {1,S} {3,D}
+3    Cd 0 0 {2,D}
+""")
+
+    def testIsSubgraphIsomorphic(self):
+        """
+        Test that GroupMatchPlan.isSubgraphIsomorphic() agrees with
+        Molecule.isSubgraphIsomorphic().
+        """
+        plan = getMatchPlan(self.group)
+        self.assertTrue(plan.isSubgraphIsomorphic(self.molecule, {}))
+        self.assertTrue(self.molecule.isSubgraphIsomorphic(self.group))
+
+        group = Group().fromAdjacencyList("""
+1 *1 C 0 0 {2,D}
+2 *2 Cd 0 0 {1,D} {3,S}
+3    Cd 0 0 {2,S}
+""")
+        plan = getMatchPlan(group)
+        self.assertFalse(plan.isSubgraphIsomorphic(self.molecule, {}))
+        self.assertFalse(self.molecule.isSubgraphIsomorphic(group))
+
+    def testIsSubgraphIsomorphicInitialMap(self):
+        """
+        Test that GroupMatchPlan.isSubgraphIsomorphic() honors the initial map.
+        """
+        plan = getMatchPlan(self.group)
+        center = self.group.getLabeledAtom('*1')
+        for atom in self.molecule.atoms:
+            if not atom.isCarbon(): continue
+            initialMap = {atom: center}
+            self.assertEqual(plan.isSubgraphIsomorphic(self.molecule, initialMap),
+                             self.molecule.isSubgraphIsomorphic(self.group, initialMap))
+            self.assertEqual(plan.isSubgraphIsomorphic(self.molecule, initialMap), atom.radicalElectrons == 1)
+
+    def testIsSubgraphIsomorphicExcludedAtoms(self):
+        """
+        Test that GroupMatchPlan.isSubgraphIsomorphic() does not match the
+        excluded atoms.
+        """
+        plan = getMatchPlan(self.group)
+        radical = [atom for atom in self.molecule.atoms if atom.radicalElectrons == 1]
+        terminal = [atom for atom in self.molecule.atoms if atom.isCarbon() and len(atom.bonds) == 4 and atom.radicalElectrons == 0]
+        atoms = self.molecule.atoms[:]
+        self.assertFalse(plan.isSubgraphIsomorphic(self.molecule, {}, radical))
+        self.assertTrue(plan.isSubgraphIsomorphic(self.molecule, {}, terminal))
+        self.assertEqual(self.molecule.atoms, atoms)
+
+    def testMatchCenters(self):
+        """
+        Test that GroupMatchPlan.matchCenters() only rejects labeled atoms
+        whose local features cannot match the group.
+        """
+        plan = getMatchPlan(self.group)
+        self.assertEqual([center.label for center in plan.centers], ['*1', '*2'])
+        for atom1 in self.molecule.atoms:
+            for atom2 in self.molecule.atoms:
+                atoms = {'*1': atom1, '*2': atom2}
+                if plan.matchCenters(atoms):
+                    continue
+                self.assertFalse(self.molecule.isSubgraphIsomorphic(self.group, {atom1: self.group.getLabeledAtom('*1'), atom2: self.group.getLabeledAtom('*2')})
+                    and atom1.isSpecificCaseOf(self.group.getLabeledAtom('*1')) and atom2.isSpecificCaseOf(self.group.getLabeledAtom('*2')))
+        # The radical center must have a Cd neighbor
+        radical = [atom for atom in self.molecule.atoms if atom.radicalElectrons == 1][0]
+        self.assertTrue(plan.matchCenters({'*1': radical}))
+        self.assertTrue(plan.matchCenters({}))
+        for atom in self.molecule.atoms:
+            if atom is not radical:
+                self.assertFalse(plan.matchCenters({'*1': atom}))
+
+    def testGetMatchPlan(self):
+        """
+        Test that the match plan is compiled once and discarded when the
+        group fingerprint is updated.
+        """
+        plan = getMatchPlan(self.group)
+        self.assertTrue(plan is getMatchPlan(self.group))
+        self.assertEqual(len(plan.steps), len(self.group.atoms))
+        self.group.updateFingerprint()
+        self.assertFalse(plan is getMatchPlan(self.group))
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
@@ -49,6 +49,8 @@ cdef class Atom(Vertex):
 
     cpdef bint isSpecificCaseOf(self, Vertex other) except -2
 
+    cpdef int getMatchLabel(self) except -1
+
     cpdef Vertex copy(self)
 
     cpdef bint isHydrogen(self)
@@ -106,8 +108,23 @@ cdef class Molecule(Graph):
     cdef public object rdMol
     cdef public int rdMolConfId
     cdef str _fingerprint
+    cdef tuple _invariants
+    cdef set _bridges
+    cdef list _sssr
+    cdef str _formula
+    cdef dict _elementCounts
+    cdef double _molecularWeight
+    cdef list _atomTypeState
         
+    cpdef resetCache(self)
+
     cpdef str getFingerprint(self)
+
+    cpdef tuple getInvariants(self)
+
+    cpdef tuple getConnectivityInvariants(self)
+
+    cpdef tuple getStateInvariants(self)
     
     cpdef addAtom(self, Atom atom)
 
@@ -129,6 +146,8 @@ cdef class Molecule(Graph):
 
     cpdef str getFormula(self)
 
+    cpdef dict getElementCounts(self)
+
     cpdef short getRadicalCount(self)
 
     cpdef double getMolecularWeight(self)
@@ -157,6 +176,12 @@ cdef class Molecule(Graph):
 
     cpdef list findSubgraphIsomorphisms(self, Graph other, dict initialMap=?)
 
+    cpdef set getBridges(self)
+
+    cpdef set _getBridges(self)
+
+    cpdef list getSmallestSetOfSmallestRings(self)
+
     cpdef bint isAtomInCycle(self, Atom atom) except -2
 
     cpdef bint isBondInCycle(self, Bond bond) except -2
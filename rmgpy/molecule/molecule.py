@@ -39,6 +39,7 @@ import cython
 import logging
 import os
 import re
+from collections import OrderedDict
 import element as elements
 try:
     import openbabel
@@ -52,6 +53,27 @@ import rmgpy.constants as constants
 
 import numpy
 
+#: The resonance isomers of recently seen molecules, keyed by fingerprint and
+#: atom labels. Each value is a list of isomer lists whose first item is the
+#: structure the isomers were generated from.
+_resonance_cache = OrderedDict()
+#: The number of isomer lists currently stored in :data:`_resonance_cache`.
+_resonance_cache_count = 0
+#: The maximum number of isomer lists to keep in :data:`_resonance_cache`.
+_resonance_cache_size = 5000
+
+#: The identifier strings (SMILES, InChI, and InChI key) of recently seen
+#: molecules, keyed by fingerprint. Each value is a list of
+#: ``(molecule, identifiers)`` pairs, where `identifiers` is a dictionary of
+#: the strings computed so far for the structure.
+_identifier_cache = OrderedDict()
+#: The number of structures currently stored in :data:`_identifier_cache`.
+_identifier_cache_count = 0
+#: The maximum number of structures to keep in :data:`_identifier_cache`.
+_identifier_cache_size = 10000
+#: The identifier types that can be generated by :func:`getIdentifiers`.
+_identifier_types = ('SMILES', 'InChI', 'AugmentedInChI', 'InChIKey', 'AugmentedInChIKey')
+
 #: This dictionary is used to shortcut lookups of a molecule's SMILES string from its chemical formula.
 _known_smiles_molecules = {
                  'N2': 'N#N',
@@ -151,7 +173,7 @@ class Atom(Vertex):
             'sortingLabel': self.sortingLabel,
             'atomType': self.atomType.label if self.atomType else None,
         }
-        return (Atom, (self.element.symbol, self.radicalElectrons, self.spinMultiplicity, self.charge, self.label), d)
+        return (Atom, (self.element.symbol, self.radicalElectrons, self.spinMultiplicity, self.charge, self.label, self.lonePairs, self.coords), d)
 
     def __setstate__(self, d):
         """
@@ -240,6 +262,18 @@ class Atom(Vertex):
 #                return False
             return True
 
+    def getMatchLabel(self):
+        """
+        Return a positive integer label used to partition the atoms in
+        isomorphism searches, made from the atomic number, radical electrons,
+        spin multiplicity, and charge of the atom. Atoms with different labels
+        cannot be equivalent. Returns zero, which matches any label, if the
+        atom has no element.
+        """
+        if self.element is None:
+            return 0
+        return (((self.element.number * 8 + (self.radicalElectrons & 7)) * 8 + (self.spinMultiplicity & 7)) * 16 + ((self.charge + 8) & 15)) + 1
+
     def copy(self):
         """
         Generate a deep copy of the current atom. Modifying the
@@ -572,7 +606,89 @@ class Bond(Edge):
         else:
             raise ActionError('Unable to update GroupBond: Invalid action {0}.'.format(action))
 
-#################################################################################
+################################################################################
+
+def getCachedIdentifiers(molecule):
+    """
+    Return the dictionary of identifier strings cached for `molecule`,
+    keyed by identifier type (e.g. ``'SMILES'``). The dictionary is shared by
+    all molecules isomorphic to `molecule`, so strings added to it are
+    returned for those molecules as well. A new empty dictionary is added to
+    the cache if the structure has not been seen before.
+    """
+    global _identifier_cache_count
+    cython.declare(bucket=list, other=Molecule, identifiers=dict)
+
+    key = molecule.getFingerprint()
+    # Reinsert the bucket so it becomes the most recently used one
+    bucket = _identifier_cache.pop(key, [])
+    _identifier_cache[key] = bucket
+    for other, identifiers in bucket:
+        if molecule.isIsomorphic(other):
+            return identifiers
+
+    identifiers = {}
+    bucket.append((molecule.copy(deep=True), identifiers))
+    _identifier_cache_count += 1
+    while _identifier_cache_count > _identifier_cache_size:
+        key, bucket = _identifier_cache.popitem(last=False)
+        _identifier_cache_count -= len(bucket)
+    return identifiers
+
+def _generateIdentifier(args):
+    """
+    Return the `identifier` string of `molecule`, where `args` is the tuple
+    ``(molecule, identifier)``. Used by :func:`getIdentifiers` as the task
+    run by each worker process.
+    """
+    molecule, identifier = args
+    return getattr(molecule, 'to' + identifier)()
+
+def getIdentifiers(molecules, identifier='SMILES', processes=1):
+    """
+    Return a list of the `identifier` strings of each of the given
+    `molecules`, where `identifier` is one of ``'SMILES'``, ``'InChI'``,
+    ``'AugmentedInChI'``, ``'InChIKey'``, or ``'AugmentedInChIKey'``.
+    
+    Each unique structure is only converted once, and structures whose
+    identifier is already cached are not converted at all. If `processes`
+    is greater than one, the remaining conversions are distributed over a
+    pool of that many worker processes, and the results are added to the
+    identifier cache of this process.
+    """
+    if identifier not in _identifier_types:
+        raise ValueError('Unknown identifier type "{0}".'.format(identifier))
+    # The augmented identifiers are derived from the plain ones
+    kind = identifier[9:] if identifier.startswith('Augmented') else identifier
+
+    # Find the unique structures whose identifier has not been cached
+    entries = []; pending = []; tasks = []
+    for molecule in molecules:
+        identifiers = getCachedIdentifiers(molecule)
+        entries.append(identifiers)
+        if kind not in identifiers and all([identifiers is not other for other in pending]):
+            pending.append(identifiers)
+            tasks.append((molecule, kind))
+
+    if processes > 1 and len(tasks) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_generateIdentifier, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(_generateIdentifier, tasks)
+    for identifiers, result in zip(pending, results):
+        identifiers[kind] = result
+
+    if identifier == kind:
+        return [identifiers[kind] for identifiers in entries]
+    return [getattr(molecule, 'to' + identifier)() for molecule in molecules]
+
+################################################################################
+
 try:
     SMILEwriter = openbabel.OBConversion()
     SMILEwriter.SetOutFormat('smi')
@@ -599,7 +715,7 @@ class Molecule(Graph):
     def __init__(self, atoms=None, symmetry=1, SMILES='', InChI='', SMARTS = ''):
         Graph.__init__(self, atoms)
         self.symmetryNumber = symmetry
-        self._fingerprint = None
+        self.resetCache()
         if SMILES != '': self.fromSMILES(SMILES)
         elif InChI != '': self.fromInChI(InChI)
         elif SMARTS != '': self.fromSMARTS(SMARTS)
@@ -623,14 +739,33 @@ class Molecule(Graph):
         return (Molecule, (self.vertices, self.symmetryNumber))
 
     def __getAtoms(self): return self.vertices
-    def __setAtoms(self, atoms): self.vertices = atoms
+    def __setAtoms(self, atoms):
+        self.vertices = atoms
+        self.resetCache()
     atoms = property(__getAtoms, __setAtoms)
 
+    def resetCache(self):
+        """
+        Discard the information cached for the structure, i.e. the formula,
+        element counts, molecular weight, fingerprint, graph invariants, rings,
+        and atom type state. This is done automatically by the methods that
+        add or remove atoms and bonds, but must be done explicitly after adding
+        or removing atoms or bonds in other ways.
+        """
+        self._fingerprint = None
+        self._invariants = None
+        self._bridges = None
+        self._sssr = None
+        self._formula = None
+        self._elementCounts = None
+        self._molecularWeight = -1
+        self._atomTypeState = None
+
     def addAtom(self, atom):
         """
         Add an `atom` to the graph. The atom is initialized with no bonds.
         """
-        self._fingerprint = None
+        self.resetCache()
         return self.addVertex(atom)
     
     def addBond(self, bond):
@@ -638,7 +773,7 @@ class Molecule(Graph):
         Add a `bond` to the graph as an edge connecting the two atoms `atom1`
         and `atom2`.
         """
-        self._fingerprint = None
+        self.resetCache()
         return self.addEdge(bond)
 
     def getBonds(self, atom):
@@ -673,7 +808,7 @@ class Molecule(Graph):
         not remove atoms that no longer have any bonds as a result of this
         removal.
         """
-        self._fingerprint = None
+        self.resetCache()
         return self.removeVertex(atom)
 
     def removeBond(self, bond):
@@ -682,7 +817,7 @@ class Molecule(Graph):
         Does not remove atoms that no longer have any bonds as a result of
         this removal.
         """
-        self._fingerprint = None
+        self.resetCache()
         return self.removeEdge(bond)
 
     def sortAtoms(self):
@@ -694,17 +829,18 @@ class Molecule(Graph):
 
     def getFormula(self):
         """
-        Return the molecular formula for the molecule.
+        Return the molecular formula for the molecule. The formula is cached
+        until atoms are added to or removed from the molecule.
         """
-        cython.declare(atom=Atom, symbol=str, elements=dict, keys=list, formula=str)
+        cython.declare(symbol=str, elements=dict, keys=list, formula=str)
         cython.declare(hasCarbon=cython.bint, hasHydrogen=cython.bint)
         
+        if self._formula is not None:
+            return self._formula
+
         # Count the number of each element in the molecule
         hasCarbon = False; hasHydrogen = False
-        elements = {}
-        for atom in self.vertices:
-            symbol = atom.element.symbol
-            elements[symbol] = elements.get(symbol, 0) + 1
+        elements = self.getElementCounts()
         
         # Use the Hill system to generate the formula
         formula = ''
@@ -727,16 +863,36 @@ class Molecule(Graph):
             count = elements[key]
             formula += '{0}{1:d}'.format(key, count) if count > 1 else key
         
+        self._formula = formula
         return formula
 
+    def getElementCounts(self):
+        """
+        Return a dictionary mapping the symbol of each element in the molecule
+        to the number of atoms of that element. The counts are cached until
+        atoms are added to or removed from the molecule.
+        """
+        cython.declare(atom=Atom, symbol=str, elements=dict)
+        if self._elementCounts is None:
+            elements = {}
+            for atom in self.vertices:
+                symbol = atom.element.symbol
+                elements[symbol] = elements.get(symbol, 0) + 1
+            self._elementCounts = elements
+        return self._elementCounts.copy()
+
     def getMolecularWeight(self):
         """
-        Return the molecular weight of the molecule in kg/mol.
+        Return the molecular weight of the molecule in kg/mol. The molecular
+        weight is cached until atoms are added to or removed from the molecule.
         """
         cython.declare(atom=Atom, mass=cython.double)
+        if self._molecularWeight >= 0:
+            return self._molecularWeight
         mass = 0
         for atom in self.vertices:
             mass += atom.element.mass
+        self._molecularWeight = mass
         return mass
     
     def getRadicalCount(self):
@@ -754,15 +910,12 @@ class Molecule(Graph):
         Return the number of atoms in molecule.  If element is given, ie. "H" or "C",
         the number of atoms of that element is returned.
         """
-        cython.declare(numAtoms=cython.int, atom=Atom)
         if element == None:
             return len(self.vertices)
         else:
-            numAtoms = 0
-            for atom in self.vertices:
-                if atom.element.symbol == element:
-                    numAtoms += 1
-            return numAtoms
+            if self._elementCounts is None:
+                self.getElementCounts()
+            return self._elementCounts.get(element, 0)
 
     def getNumberOfRadicalElectrons(self):
         """
@@ -839,7 +992,7 @@ class Molecule(Graph):
         cython.declare(criticalDistance=float, i=int, atom1=Atom, atom2=Atom,
                        bond=Bond, atoms=list, zBoundary=float)
                        # groupBond=GroupBond, 
-        self._fingerprint = None
+        self.resetCache()
         
         atoms = self.vertices
         
@@ -881,9 +1034,30 @@ class Molecule(Graph):
         Iterate through the atoms in the structure, checking their atom types
         to ensure they are correct (i.e. accurately describe their local bond
         environment) and complete (i.e. are as detailed as possible).
+
+        The atom types are only determined again if any atom type, bond order,
+        or number of lone pairs has changed since the last update.
         """
+        cython.declare(atom=Atom, bond=Bond, state=list)
+        
+        # The atom types depend only on the bonds and lone pairs of each atom
+        state = []
+        for atom in self.vertices:
+            state.append(atom.atomType)
+            state.append(atom.lonePairs)
+            for bond in atom.edges.itervalues():
+                state.append(bond.order)
+        if state == self._atomTypeState:
+            return
+
+        state = []
         for atom in self.vertices:
             atom.atomType = getAtomType(atom, atom.edges)
+            state.append(atom.atomType)
+            state.append(atom.lonePairs)
+            for bond in atom.edges.itervalues():
+                state.append(bond.order)
+        self._atomTypeState = state
 
     def clearLabeledAtoms(self):
         """
@@ -936,7 +1110,87 @@ class Molecule(Graph):
         if self._fingerprint is None:
             self._fingerprint = self.getFormula()
         return self._fingerprint
-    
+
+    def getInvariants(self):
+        """
+        Return a tuple of graph invariants used to accelerate graph
+        isomorphism comparisons with other molecules. As with the fingerprint,
+        two invariant tuples matching is a necessary (but not sufficient)
+        condition for the associated molecules to be isomorphic. The tuple
+        contains:
+
+        * the number of rings (the cyclomatic number of the graph)
+        * the sorted element and neighbor elements of each atom, which also
+          determines the degree sequence
+        * the sorted element, radical electrons, spin multiplicity, and charge
+          of each atom
+        * the number of single, double, triple, and benzene bonds
+
+        The first two entries are returned by
+        :meth:`getConnectivityInvariants` and the others by
+        :meth:`getStateInvariants`.
+        """
+        return self.getConnectivityInvariants() + self.getStateInvariants()
+
+    def getConnectivityInvariants(self):
+        """
+        Return the graph invariants that depend solely on the connectivity of
+        the molecule, i.e. the number of rings and the sorted element and
+        neighbor elements of each atom. These are cached and reset when atoms
+        or bonds are added or removed.
+        """
+        cython.declare(atom=Atom, atom2=Atom, atoms=list)
+        cython.declare(numEdges=cython.int, numComponents=cython.int)
+
+        if self._invariants is None:
+            atoms = []
+            numEdges = 0
+            for atom in self.vertices:
+                atoms.append((atom.element.number, tuple(sorted([atom2.element.number for atom2 in atom.edges]))))
+                numEdges += len(atom.edges)
+            numEdges //= 2
+            # Count the connected components with a depth-first search
+            numComponents = 0
+            visited = set()
+            for atom in self.vertices:
+                if atom in visited: continue
+                numComponents += 1
+                stack = [atom]
+                visited.add(atom)
+                while len(stack) > 0:
+                    atom2 = stack.pop()
+                    for neighbor in atom2.edges:
+                        if neighbor not in visited:
+                            visited.add(neighbor)
+                            stack.append(neighbor)
+            atoms.sort()
+            self._invariants = (numEdges - len(self.vertices) + numComponents, tuple(atoms))
+        return self._invariants
+
+    def getStateInvariants(self):
+        """
+        Return the graph invariants that depend on the electronic state of the
+        atoms and the orders of the bonds, i.e. the sorted element, radical
+        electrons, spin multiplicity, and charge of each atom and the number
+        of single, double, triple, and benzene bonds. These are recomputed on
+        each call, since atoms and bonds can be modified in place (e.g. by
+        :meth:`Atom.applyAction`) without the molecule being notified.
+        """
+        cython.declare(atom=Atom, bond=Bond, states=list, bondCounts=list)
+
+        states = []
+        bondCounts = [0, 0, 0, 0]
+        for atom in self.vertices:
+            states.append((atom.element.number, atom.radicalElectrons, atom.spinMultiplicity, atom.charge))
+            for bond in atom.edges.itervalues():
+                if bond.order == 'S': bondCounts[0] += 1
+                elif bond.order == 'D': bondCounts[1] += 1
+                elif bond.order == 'T': bondCounts[2] += 1
+                elif bond.order == 'B': bondCounts[3] += 1
+        states.sort()
+
+        return (tuple(states), tuple(bondCounts))
+
     def isIsomorphic(self, other, initialMap=None):
         """
         Returns :data:`True` if two graphs are isomorphic and :data:`False`
@@ -954,6 +1208,13 @@ class Molecule(Graph):
         # sufficient!) condition for the associated molecules to be isomorphic
         if self.getFingerprint() != other.getFingerprint():
             return False
+        # Compare the more detailed graph invariants, which are again a
+        # necessary (but not sufficient) condition for isomorphism; the cached
+        # connectivity part is checked before building the state part
+        if self.getConnectivityInvariants() != other.getConnectivityInvariants():
+            return False
+        if self.getStateInvariants() != other.getStateInvariants():
+            return False
         # Do the full isomorphism comparison
         result = Graph.isIsomorphic(self, other, initialMap)
         return result
@@ -984,7 +1245,7 @@ class Molecule(Graph):
         while the atoms of `other` are the values). The `other` parameter must
         be a :class:`Group` object, or a :class:`TypeError` is raised.
         """
-        cython.declare(group=Group, atom=Atom)
+        cython.declare(group=Group, atom=Atom, elements=dict)
         cython.declare(carbonCount=cython.short, nitrogenCount=cython.short, oxygenCount=cython.short, sulfurCount=cython.short, radicalCount=cython.short)
         
         # It only makes sense to compare a Molecule to a Group for subgraph
@@ -994,16 +1255,15 @@ class Molecule(Graph):
         group = other
         
         # Count the number of carbons, oxygens, and radicals in the molecule
-        carbonCount = 0; nitrogenCount = 0; oxygenCount = 0; sulfurCount = 0; radicalCount = 0
+        if self._elementCounts is None:
+            self.getElementCounts()
+        elements = self._elementCounts
+        carbonCount = elements.get('C', 0)
+        nitrogenCount = elements.get('N', 0)
+        oxygenCount = elements.get('O', 0)
+        sulfurCount = elements.get('S', 0)
+        radicalCount = 0
         for atom in self.vertices:
-            if atom.element.symbol == 'C':
-                carbonCount += 1
-            elif atom.element.symbol == 'N':
-                nitrogenCount += 1
-            elif atom.element.symbol == 'O':
-                oxygenCount += 1
-            elif atom.element.symbol == 'S':
-                sulfurCount += 1
             radicalCount += atom.radicalElectrons
         # If the molecule has fewer of any of these things than the functional
         # group does, then we know the subgraph isomorphism fails without
@@ -1038,6 +1298,37 @@ class Molecule(Graph):
         result = Graph.findSubgraphIsomorphisms(self, other, initialMap)
         return result
 
+    def getBridges(self):
+        """
+        Return the set of bonds that are not contained in any ring in the
+        molecule. The result is cached, and reset when atoms or bonds are
+        added or removed; this method returns a copy of it, while
+        :meth:`isAtomInCycle`, :meth:`isBondInCycle`, :meth:`isCyclic`, and
+        :meth:`getAllCyclicVertices` use the cached set directly.
+        """
+        return set(self._getBridges())
+
+    def _getBridges(self):
+        """
+        Return the cached set of bonds that are not contained in any ring in
+        the molecule, computing it if necessary. The set is not copied, so it
+        must not be modified.
+        """
+        if self._bridges is None:
+            self._bridges = Graph.getBridges(self)
+        return self._bridges
+
+    def getSmallestSetOfSmallestRings(self):
+        """
+        Return a list of the smallest set of smallest rings in the molecule,
+        each ring being a list of atoms. The result is cached, and reset when
+        atoms or bonds are added or removed.
+        """
+        cython.declare(ring=list)
+        if self._sssr is None:
+            self._sssr = Graph.getSmallestSetOfSmallestRings(self)
+        return [ring[:] for ring in self._sssr]
+
     def isAtomInCycle(self, atom):
         """
         Return :data:`True` if `atom` is in one or more cycles in the structure,
@@ -1132,6 +1423,7 @@ class Molecule(Graph):
         cython.declare(atom=Atom, atom1=Atom, atom2=Atom, bond=Bond)
         
         self.vertices = []
+        self.resetCache()
         
         # Add hydrogen atoms to complete molecule if needed
         rdkitmol = Chem.AddHs(rdkitmol)
@@ -1196,6 +1488,7 @@ class Molecule(Graph):
             print adjlist
             
         self.vertices = fromAdjacencyList(adjlist, False, saturateH=saturateH)
+        self.resetCache()
         self.updateConnectivityValues()
         self.updateAtomTypes()
         
@@ -1249,6 +1542,23 @@ class Molecule(Graph):
         
         Convert a molecular structure to an InChI string. Uses
         `OpenBabel <http://openbabel.org/>`_ to perform the conversion.
+
+        The InChI string is cached, so it is only generated once for each
+        unique structure.
+        """
+        cython.declare(identifiers=dict)
+        identifiers = getCachedIdentifiers(self)
+        try:
+            return identifiers['InChI']
+        except KeyError:
+            pass
+        identifiers['InChI'] = self.__toInChI()
+        return identifiers['InChI']
+
+    def __toInChI(self):
+        """
+        Generate and return the InChI string for this molecule, without
+        consulting the identifier cache.
         """
         try:
             if not Chem.inchi.INCHI_AVAILABLE:
@@ -1290,6 +1600,23 @@ class Molecule(Graph):
         
         Removes check-sum dash (-) and character so that only 
         the 14 + 9 characters remain.
+
+        The InChI key is cached, so it is only generated once for each
+        unique structure.
+        """
+        cython.declare(identifiers=dict)
+        identifiers = getCachedIdentifiers(self)
+        try:
+            return identifiers['InChIKey']
+        except KeyError:
+            pass
+        identifiers['InChIKey'] = self.__toInChIKey()
+        return identifiers['InChIKey']
+
+    def __toInChIKey(self):
+        """
+        Generate and return the InChI key string for this molecule, without
+        consulting the identifier cache.
         """
         try:
             if not Chem.inchi.INCHI_AVAILABLE:
@@ -1347,6 +1674,23 @@ class Molecule(Graph):
         conversion, so it will be canonical SMILES.
         While converting to an RDMolecule it will perceive aromaticity
         and removes Hydrogen atoms.
+
+        The SMILES string is cached, so it is only generated once for each
+        unique structure.
+        """
+        cython.declare(identifiers=dict)
+        identifiers = getCachedIdentifiers(self)
+        try:
+            return identifiers['SMILES']
+        except KeyError:
+            pass
+        identifiers['SMILES'] = self.__toSMILES()
+        return identifiers['SMILES']
+
+    def __toSMILES(self):
+        """
+        Generate and return the SMILES string for this molecule, without
+        consulting the identifier cache.
         """
         
         # If we're going to have to check the formula anyway,
@@ -1583,7 +1927,50 @@ class Molecule(Graph):
     
     def generateResonanceIsomers(self):
         """
-        Generate and return all of the resonance isomers of this molecule.
+        Generate and return all of the resonance isomers of this molecule. The
+        first item in the returned list is the molecule itself.
+
+        The isomers are cached per molecular structure (including atom labels)
+        in a bounded least-recently-used cache, so repeated calls for the same
+        structure cost only an isomorphism check. The other isomers returned
+        are always new copies, so callers are free to modify or label them.
+        """
+        global _resonance_cache_count
+        cython.declare(labeledAtoms=dict, otherLabeledAtoms=dict, initialMap=dict)
+        cython.declare(bucket=list, isomers=list, other=Molecule, isomer=Molecule)
+
+        labeledAtoms = self.getLabeledAtoms()
+        for atom in labeledAtoms.values():
+            if isinstance(atom, list):
+                # Atoms sharing a label have no unique initial mapping,
+                # so don't try to use the cache
+                return self.__generateResonanceIsomers()
+        key = (self.getFingerprint(), tuple(sorted(labeledAtoms.keys())))
+
+        # Reinsert the bucket so it becomes the most recently used one
+        bucket = _resonance_cache.pop(key, [])
+        _resonance_cache[key] = bucket
+        for isomers in bucket:
+            other = isomers[0]
+            otherLabeledAtoms = other.getLabeledAtoms()
+            initialMap = {}
+            for label, atom in labeledAtoms.iteritems():
+                initialMap[atom] = otherLabeledAtoms[label]
+            if self.isMappingValid(other, initialMap) and self.isIsomorphic(other, initialMap):
+                return [self] + [isomer.copy(deep=True) for isomer in isomers[1:]]
+
+        isomers = self.__generateResonanceIsomers()
+        bucket.append([isomer.copy(deep=True) for isomer in isomers])
+        _resonance_cache_count += 1
+        while _resonance_cache_count > _resonance_cache_size:
+            key, bucket = _resonance_cache.popitem(last=False)
+            _resonance_cache_count -= len(bucket)
+        return isomers
+
+    def __generateResonanceIsomers(self):
+        """
+        Generate and return all of the resonance isomers of this molecule,
+        without consulting the resonance isomer cache.
         """
         cython.declare(isomers=list, newIsomers=list, index=cython.int, atom=Atom)
         cython.declare(isomer=Molecule, newIsomer=Molecule, isom=Molecule)
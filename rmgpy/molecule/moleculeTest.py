@@ -220,6 +220,22 @@ class TestAtom(unittest.TestCase):
                 else:
                     self.assertFalse(atom1.isSpecificCaseOf(atom2))
     
+    def testGetMatchLabel(self):
+        """
+        Test that Atom.getMatchLabel() gives equivalent atoms the same label
+        and atoms that are not equivalent different labels.
+        """
+        atoms = []
+        for element in elementList[0:10]:
+            for radicalElectrons, spinMultiplicity in [(0, 1), (1, 2), (2, 1), (2, 3)]:
+                for charge in [-1, 0, 1]:
+                    atoms.append(Atom(element=element, radicalElectrons=radicalElectrons, spinMultiplicity=spinMultiplicity, charge=charge))
+        for atom1 in atoms:
+            self.assertTrue(atom1.getMatchLabel() > 0)
+            for atom2 in atoms:
+                self.assertEqual(atom1.getMatchLabel() == atom2.getMatchLabel(), atom1.equivalent(atom2))
+        self.assertEqual(Atom().getMatchLabel(), 0)
+    
     def testCopy(self):
         """
         Test the Atom.copy() method.
@@ -238,6 +254,7 @@ class TestAtom(unittest.TestCase):
         unpickled with no loss of information.
         """
         import cPickle
+        self.atom.lonePairs = 1
         atom = cPickle.loads(cPickle.dumps(self.atom))
         self.assertEqual(self.atom.element.symbol, atom.element.symbol)
         self.assertEqual(self.atom.atomType, atom.atomType)
@@ -245,6 +262,7 @@ class TestAtom(unittest.TestCase):
         self.assertEqual(self.atom.spinMultiplicity, atom.spinMultiplicity)
         self.assertEqual(self.atom.charge, atom.charge)
         self.assertEqual(self.atom.label, atom.label)
+        self.assertEqual(self.atom.lonePairs, atom.lonePairs)
         
 ################################################################################
 
@@ -537,6 +555,39 @@ class TestMolecule(unittest.TestCase):
         """
         self.assertEqual( self.molecule.getRadicalCount(), sum([atom.radicalElectrons for atom in self.molecule.atoms]) )
         
+    def testGetInvariants(self):
+        """
+        Test the Molecule.getInvariants() method.
+        """
+        # Propene and cyclopropane have the same formula but different rings
+        propene = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,D}
+2 C 0 0 {1,D} {3,S}
+3 C 0 0 {2,S}
+""", saturateH=True)
+        cyclopropane = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S} {3,S}
+2 C 0 0 {1,S} {3,S}
+3 C 0 0 {1,S} {2,S}
+""", saturateH=True)
+        self.assertEqual(propene.getFingerprint(), cyclopropane.getFingerprint())
+        self.assertNotEqual(propene.getInvariants(), cyclopropane.getInvariants())
+        self.assertEqual(propene.getInvariants()[0], 0)
+        self.assertEqual(cyclopropane.getInvariants()[0], 1)
+        self.assertFalse(propene.isIsomorphic(cyclopropane))
+        # The invariants must reflect changes made to atoms in place
+        molecule = propene.copy(deep=True)
+        invariants = molecule.getInvariants()
+        molecule.atoms[0].applyAction(['GAIN_RADICAL', '', 1])
+        self.assertNotEqual(molecule.getInvariants(), invariants)
+        self.assertEqual(molecule.getInvariants()[:2], invariants[:2])
+        self.assertEqual(molecule.getConnectivityInvariants(), invariants[:2])
+        self.assertNotEqual(molecule.getStateInvariants(), invariants[2:])
+        self.assertFalse(molecule.isIsomorphic(propene))
+        molecule.atoms[0].applyAction(['LOSE_RADICAL', '', 1])
+        self.assertEqual(molecule.getInvariants(), invariants)
+        self.assertTrue(molecule.isIsomorphic(propene))
+
     def testGetMolecularWeight(self):
         """
         Test the Molecule.getMolecularWeight() method.
@@ -734,6 +785,110 @@ class TestMolecule(unittest.TestCase):
         sssr = molecule.getSmallestSetOfSmallestRings()
         self.assertEqual( len(sssr), 3)
 
+    def testRingCache(self):
+        """
+        Test that the cached ring perception results of a molecule are
+        updated when bonds are added or removed.
+        """
+        molecule = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S}
+2 C 0 0 {1,S} {3,S}
+3 C 0 0 {2,S} {4,S}
+4 C 0 0 {3,S}
+""")
+        atom1, atom2, atom3, atom4 = molecule.atoms
+        self.assertFalse(molecule.isCyclic())
+        self.assertEqual(molecule.getSmallestSetOfSmallestRings(), [])
+        bond = Bond(atom1, atom4, 'S')
+        molecule.addBond(bond)
+        self.assertTrue(molecule.isCyclic())
+        self.assertTrue(molecule.isBondInCycle(bond))
+        self.assertEqual(len(molecule.getAllCyclicVertices()), 4)
+        sssr = molecule.getSmallestSetOfSmallestRings()
+        self.assertEqual(len(sssr), 1)
+        self.assertEqual(set(sssr[0]), set(molecule.atoms))
+        # Modifying the returned rings must not affect the cached rings
+        sssr[0].pop()
+        self.assertEqual(len(molecule.getSmallestSetOfSmallestRings()[0]), 4)
+        # Likewise for the returned bridges
+        atom5 = Atom(element=getElement('C'))
+        molecule.addAtom(atom5)
+        molecule.addBond(Bond(atom1, atom5, 'S'))
+        bridges = molecule.getBridges()
+        self.assertEqual(len(bridges), 1)
+        bridges.clear()
+        self.assertEqual(len(molecule.getBridges()), 1)
+        self.assertTrue(molecule.isAtomInCycle(atom1))
+        molecule.removeBond(molecule.getBond(atom2, atom3))
+        self.assertFalse(molecule.isCyclic())
+        self.assertFalse(molecule.isAtomInCycle(atom1))
+        self.assertEqual(molecule.getSmallestSetOfSmallestRings(), [])
+
+    def testInvariantCache(self):
+        """
+        Test that the cached formula, element counts, molecular weight, and
+        atom types are updated when the molecule is modified.
+        """
+        molecule = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S}
+2 C 0 0 {1,S}
+""", saturateH=True)
+        self.assertEqual(molecule.getFormula(), 'C2H6')
+        self.assertEqual(molecule.getElementCounts(), {'C': 2, 'H': 6})
+        self.assertEqual(molecule.getNumAtoms('H'), 6)
+        self.assertAlmostEqual(molecule.getMolecularWeight() * 1000, 30.07, 2)
+        # Modifying the returned counts must not affect the cached counts
+        molecule.getElementCounts()['C'] = 3
+        self.assertEqual(molecule.getElementCounts()['C'], 2)
+
+        # Turn ethane into ethene
+        atom1, atom2 = [atom for atom in molecule.atoms if atom.isCarbon()]
+        for atom in [atom1, atom2]:
+            hydrogen = [a for a in atom.edges if a.isHydrogen()][0]
+            molecule.removeAtom(hydrogen)
+        self.assertEqual(molecule.getFormula(), 'C2H4')
+        self.assertEqual(molecule.getNumAtoms('H'), 4)
+        self.assertAlmostEqual(molecule.getMolecularWeight() * 1000, 28.05, 2)
+        molecule.updateAtomTypes()
+        self.assertEqual(atom1.atomType.label, 'Cs')
+        molecule.getBond(atom1, atom2).incrementOrder()
+        molecule.updateAtomTypes()
+        self.assertEqual(atom1.atomType.label, 'Cd')
+        self.assertEqual(atom2.atomType.label, 'Cd')
+        atom1.atomType = None
+        molecule.updateAtomTypes()
+        self.assertEqual(atom1.atomType.label, 'Cd')
+
+    def testIdentifierCache(self):
+        """
+        Test that identifier strings are cached for each unique structure,
+        and that getIdentifiers() converts each unique structure once.
+        """
+        import rmgpy.molecule.molecule
+        ethane = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S}
+2 C 0 0 {1,S}
+""", saturateH=True)
+        propane = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S}
+2 C 0 0 {1,S} {3,S}
+3 C 0 0 {2,S}
+""", saturateH=True)
+        self.assertEqual(ethane.toSMILES(), 'CC')
+        identifiers = getCachedIdentifiers(ethane.copy(deep=True))
+        self.assertEqual(identifiers['SMILES'], 'CC')
+        # Cached strings are returned for isomorphic molecules
+        identifiers['SMILES'] = 'C-C'
+        self.assertEqual(ethane.copy(deep=True).toSMILES(), 'C-C')
+        identifiers['SMILES'] = 'CC'
+
+        count = rmgpy.molecule.molecule._identifier_cache_count
+        molecules = [propane, ethane, propane.copy(deep=True)]
+        self.assertEqual(getIdentifiers(molecules), ['CCC', 'CC', 'CCC'])
+        self.assertEqual(rmgpy.molecule.molecule._identifier_cache_count, count + 1)
+        self.assertEqual(getIdentifiers(molecules, processes=2), ['CCC', 'CC', 'CCC'])
+        self.assertRaises(ValueError, getIdentifiers, molecules, 'SMARTS')
+
     def testIsInCycleEthane(self):
         """
         Test the Molecule.isInCycle() method with ethane.
@@ -825,6 +980,41 @@ class TestMolecule(unittest.TestCase):
         molecule = Molecule().fromSMILES('[CH2]C[CH2]')
         self.assertEqual(molecule.getRadicalCount(), 2)
         
+    def testGenerateResonanceIsomers(self):
+        """
+        Test that resonance isomers are generated correctly, and that repeated
+        calls for the same structure return new copies of the cached isomers.
+        """
+        adjlist = """
+1 C 1 0 {2,S} {4,S}
+2 C 0 0 {1,S} {3,D}
+3 C 0 0 {2,D}
+4 C 0 0 {1,S}
+        """
+        molecule = Molecule().fromAdjacencyList(adjlist, saturateH=True)
+        isomers1 = molecule.generateResonanceIsomers()
+        self.assertEqual(len(isomers1), 2)
+        self.assertTrue(isomers1[0] is molecule)
+        self.assertFalse(isomers1[1].isIsomorphic(molecule))
+
+        # Modifying a returned isomer must not affect later calls
+        isomers1[1].atoms[0].label = '*1'
+        other = Molecule().fromAdjacencyList(adjlist, saturateH=True)
+        isomers2 = other.generateResonanceIsomers()
+        self.assertEqual(len(isomers2), 2)
+        self.assertTrue(isomers2[0] is other)
+        self.assertTrue(isomers2[1] is not isomers1[1])
+        self.assertEqual(isomers2[1].getLabeledAtoms(), {})
+
+        # Labeled atoms are carried over to the isomers
+        for atom in other.atoms:
+            if atom.isCarbon() and atom.radicalElectrons == 1:
+                atom.label = '*1'
+        isomers3 = other.generateResonanceIsomers()
+        self.assertEqual(len(isomers3), 2)
+        self.assertEqual(isomers3[0].getLabeledAtom('*1').radicalElectrons, 1)
+        self.assertEqual(isomers3[1].getLabeledAtom('*1').radicalElectrons, 0)
+
     def testSMILES(self):
         """
         Test that we can generate a few SMILES strings as expected
@@ -25,6 +25,7 @@
 ################################################################################
 
 from .molecule cimport Atom, Bond, Molecule
+from .compact cimport CompactMolecule
 
 ################################################################################
 
@@ -37,3 +38,7 @@ cpdef int calculateAxisSymmetryNumber(Molecule molecule) except -1
 cpdef int calculateCyclicSymmetryNumber(Molecule molecule) except -1
 
 cpdef int calculateSymmetryNumber(Molecule molecule) except -1
+
+cpdef bint isSymmetryEquivalent(CompactMolecule compact1, CompactMolecule compact2) except -2
+
+cpdef int computeSymmetryNumber(Molecule molecule) except -1
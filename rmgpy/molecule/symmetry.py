@@ -32,6 +32,19 @@ This module provides functionality for estimating the symmetry number of a
 molecule from its chemical graph representation.
 """
 
+from collections import OrderedDict
+
+from .compact import CompactMolecule
+
+#: The symmetry numbers of recently seen molecules, keyed by the canonical
+#: certificate of their :class:`CompactMolecule` representation. Each value is
+#: a list of ``(compactMolecule, symmetryNumber)`` pairs.
+_symmetry_cache = OrderedDict()
+#: The number of symmetry numbers currently stored in :data:`_symmetry_cache`.
+_symmetry_cache_count = 0
+#: The maximum number of symmetry numbers to keep in :data:`_symmetry_cache`.
+_symmetry_cache_size = 10000
+
 def calculateAtomSymmetryNumber(molecule, atom):
     """
     Return the symmetry number centered at `atom` in the structure. The
@@ -431,6 +444,52 @@ def calculateSymmetryNumber(molecule):
     """
     Return the symmetry number for the structure. The symmetry number
     includes both external and internal modes.
+
+    Symmetry numbers are memoized using the canonical certificate of the
+    structure, which is computed as part of canonical labeling by
+    :class:`CompactMolecule`, so the symmetry analysis is only performed once
+    for each unique structure.
+    """
+    global _symmetry_cache_count
+
+    compact = CompactMolecule(molecule)
+    key = compact.getCertificate()
+
+    # Reinsert the bucket so it becomes the most recently used one
+    bucket = _symmetry_cache.pop(key, [])
+    _symmetry_cache[key] = bucket
+    for other, symmetryNumber in bucket:
+        if isSymmetryEquivalent(compact, other):
+            return symmetryNumber
+
+    symmetryNumber = computeSymmetryNumber(molecule)
+    bucket.append((compact, symmetryNumber))
+    _symmetry_cache_count += 1
+    while _symmetry_cache_count > _symmetry_cache_size:
+        key, bucket = _symmetry_cache.popitem(last=False)
+        _symmetry_cache_count -= len(bucket)
+    return symmetryNumber
+
+def isSymmetryEquivalent(compact1, compact2):
+    """
+    Return ``True`` if the structures `compact1` and `compact2` are
+    guaranteed to have the same symmetry number, i.e. if they are isomorphic
+    and the isomorphism also preserves atom types and lone pairs, or
+    ``False`` otherwise.
+    """
+    mapping = compact1.findIsomorphism(compact2)
+    if mapping is None:
+        return False
+    for index1, index2 in enumerate(mapping):
+        if compact1.atomTypes[index1] != compact2.atomTypes[index2] or compact1.lonePairs[index1] != compact2.lonePairs[index2]:
+            return False
+    return True
+
+def computeSymmetryNumber(molecule):
+    """
+    Return the symmetry number for the structure, without consulting the
+    symmetry number cache. The symmetry number includes both external and
+    internal modes.
     """
     symmetryNumber = 1
 
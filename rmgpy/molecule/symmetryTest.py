@@ -361,6 +361,36 @@ class TestMoleculeSymmetry(unittest.TestCase):
         """
         self.assertEqual(Molecule().fromSMILES('C=[CH]').calculateSymmetryNumber(), 1)
     
+    def testSymmetryNumberCache(self):
+        """
+        Test that Molecule.calculateSymmetryNumber() returns the memoized
+        symmetry number for structures that have already been analyzed.
+        """
+        import rmgpy.molecule.symmetry as symmetry
+        propane = Molecule().fromAdjacencyList("""
+1 C 0 0 {2,S}
+2 C 0 0 {1,S} {3,S}
+3 C 0 0 {2,S}
+""", saturateH=True)
+        # The same structure, but with the atoms in a different order
+        propane2 = Molecule().fromAdjacencyList("""
+1 C 0 0 {3,S}
+2 C 0 0 {3,S}
+3 C 0 0 {1,S} {2,S}
+""", saturateH=True)
+        propyl = Molecule().fromAdjacencyList("""
+1 C 1 0 {2,S}
+2 C 0 0 {1,S} {3,S}
+3 C 0 0 {2,S}
+""", saturateH=True)
+        self.assertEqual(computeSymmetryNumber(propane), 18)
+        self.assertEqual(propane.calculateSymmetryNumber(), 18)
+        count = symmetry._symmetry_cache_count
+        self.assertEqual(propane2.calculateSymmetryNumber(), 18)
+        self.assertEqual(symmetry._symmetry_cache_count, count)
+        self.assertEqual(propyl.calculateSymmetryNumber(), computeSymmetryNumber(propyl))
+        self.assertEqual(symmetry._symmetry_cache_count, count + 1)
+    
     @work_in_progress
     def testSymmetryNumberCyclic(self):
         """
@@ -26,17 +26,67 @@
 
 from graph cimport Vertex, Edge, Graph
 
-cdef class VF2:
+cdef class VF2State:
 
-    cdef Graph graph1, graph2
-    
-    cdef dict initialMapping
+    cdef list vertices1, vertices2
+    cdef list edges1, edges2
     cdef bint subgraph
     cdef bint findAll
-    
+    cdef int size1, size2, edgeCount1, edgeCount2
+
+    cdef int *order1
+    cdef int *order2
+    cdef int *adjStart1
+    cdef int *adjStart2
+    cdef int *adjacency1
+    cdef int *adjacency2
+    cdef int *edgeIndex1
+    cdef int *edgeIndex2
+    cdef int *connectivity1
+    cdef int *connectivity2
+    cdef int *label1
+    cdef int *label2
+    cdef int *core1
+    cdef int *core2
+    cdef int *terminal1
+    cdef int *terminal2
+    cdef int *matchOrder
+    cdef int *parent
+    cdef int *candidate
+    cdef int *rank
+    cdef int *rarity
+    cdef int *mappedNeighbors
+    cdef signed char *vertexMatch
+    cdef signed char *edgeMatch
+
     cdef bint isMatch
     cdef list mappingList
-    
+    cdef object error
+
+    cdef setGraph(self, Graph graph, bint first)
+
+    cdef int orderVertices(self, int depth) nogil
+
+    cdef int placeVertex(self, int index2, int position) nogil
+
+    cdef int isPartitionMatch(self, int index1, int index2) nogil
+
+    cdef int match(self, int depth) nogil
+
+    cdef int feasible(self, int index1, int index2) nogil
+
+    cdef int isVertexMatch(self, int index1, int index2) nogil
+
+    cdef int isEdgeMatch(self, int index1, int index2) nogil
+
+    cdef int addMapping(self) nogil
+
+    cdef void addToMapping(self, int index1, int index2, int depth) nogil
+
+    cdef void removeFromMapping(self, int index1, int index2, int depth) nogil
+
+cdef class VF2:
+
     cpdef bint isIsomorphic(self, Graph graph1, Graph graph2, dict initialMapping) except -2
         
     cpdef list findIsomorphism(self, Graph graph1, Graph graph2, dict initialMapping)
@@ -45,12 +95,4 @@ cdef class VF2:
 
     cpdef list findSubgraphIsomorphisms(self, Graph graph1, Graph graph2, dict initialMapping)
     
-    cdef isomorphism(self, Graph graph1, Graph graph2, dict initialMapping, bint subgraph, bint findAll)
-
-    cdef bint match(self, int callDepth) except -2
-        
-    cdef bint feasible(self, Vertex vertex1, Vertex vertex2) except -2
-    
-    cdef addToMapping(self, Vertex vertex1, Vertex vertex2)
-        
-    cdef removeFromMapping(self, Vertex vertex1, Vertex vertex2)
+    cdef VF2State isomorphism(self, Graph graph1, Graph graph2, dict initialMapping, bint subgraph, bint findAll)
@@ -27,9 +27,32 @@
 """
 This module contains graph ismorphism functions that implement the VF2
 algorithm of Vento and Foggia.
+
+The state of each search is kept in a :class:`VF2State` object created for
+that search, in arrays indexed by the position of each vertex in its graph.
+Nothing is stored on the vertices or graphs themselves, so searches can be
+nested or run concurrently on the same graphs from multiple threads. The
+search runs with the GIL released; it is only reacquired to evaluate the
+semantic equivalence of a pair of vertices or edges the first time that pair
+is encountered, and to store the mappings found.
+
+The vertices of the second graph are matched in a fixed order chosen before
+the search begins, as in the VF2++ algorithm of Juttner and Madarasi: a
+breadth-first traversal starting from the vertex with the fewest possible
+matches, in which each level is ordered to put the vertices with the most
+neighbors already in the order first. Each vertex after the first in its
+connected component therefore has a neighbor earlier in the order, and its
+candidates are taken from the unmapped neighbors of that neighbor's match.
+Candidates are also partitioned by degree and by the label returned by
+:meth:`Vertex.getMatchLabel`, so most infeasible pairs are rejected without
+evaluating their semantic equivalence.
 """
 
+import sys
+
 cimport cython
+from libc.stdlib cimport malloc, free
+from libc.string cimport memset
 
 ################################################################################
 
@@ -40,23 +63,546 @@ class VF2Error(Exception):
     """
     pass
 
+cdef class VF2State:
+    """
+    The state of a single VF2 search for isomorphisms from graph `graph1`
+    to graph `graph2`. Each graph is converted to a compressed adjacency
+    structure, with vertices and edges identified by their index in the
+    lists `vertices1`/`vertices2` and `edges1`/`edges2`. The current partial
+    mapping is stored in the `core1` and `core2` arrays, which give the index
+    of the mapped vertex in the other graph or -1. The `terminal1` and
+    `terminal2` arrays give the depth at which each vertex became adjacent to
+    a mapped vertex, or 0 if it has not. The results of the semantic checks
+    are stored in the `vertexMatch` and `edgeMatch` arrays as they are
+    evaluated, with -1 indicating a check not yet made.
+
+    The vertices of the second graph are matched in the order given by the
+    `matchOrder` array, which is set by :meth:`orderVertices`. For each
+    position in the order, the `parent` array gives a vertex earlier in the
+    order that is adjacent to the vertex at that position, or -1 if there is
+    none, and the `candidate` array gives the position of the next candidate
+    to try in the list of candidates at that position; together these form
+    the explicit stack of the search.
+    """
+
+    def __cinit__(self, Graph graph1, Graph graph2, bint subgraph, bint findAll):
+        self.order1 = NULL; self.order2 = NULL
+        self.adjStart1 = NULL; self.adjStart2 = NULL
+        self.adjacency1 = NULL; self.adjacency2 = NULL
+        self.edgeIndex1 = NULL; self.edgeIndex2 = NULL
+        self.connectivity1 = NULL; self.connectivity2 = NULL
+        self.label1 = NULL; self.label2 = NULL
+        self.core1 = NULL; self.core2 = NULL
+        self.terminal1 = NULL; self.terminal2 = NULL
+        self.matchOrder = NULL; self.parent = NULL; self.candidate = NULL
+        self.rank = NULL; self.rarity = NULL; self.mappedNeighbors = NULL
+        self.vertexMatch = NULL; self.edgeMatch = NULL
+
+    def __init__(self, Graph graph1, Graph graph2, bint subgraph, bint findAll):
+        self.subgraph = subgraph
+        self.findAll = findAll
+        self.isMatch = False
+        self.mappingList = []
+        self.error = None
+        self.setGraph(graph1, True)
+        self.setGraph(graph2, False)
+        self.matchOrder = <int *> malloc(max(self.size2, 1) * sizeof(int))
+        self.parent = <int *> malloc(max(self.size2, 1) * sizeof(int))
+        self.candidate = <int *> malloc(max(self.size2, 1) * sizeof(int))
+        self.rank = <int *> malloc(max(self.size2, 1) * sizeof(int))
+        self.rarity = <int *> malloc(max(self.size2, 1) * sizeof(int))
+        self.mappedNeighbors = <int *> malloc(max(self.size2, 1) * sizeof(int))
+        self.vertexMatch = <signed char *> malloc(max(self.size1 * self.size2, 1) * sizeof(signed char))
+        self.edgeMatch = <signed char *> malloc(max(self.edgeCount1 * self.edgeCount2, 1) * sizeof(signed char))
+        if (self.matchOrder == NULL or self.parent == NULL or self.candidate == NULL or
+            self.rank == NULL or self.rarity == NULL or self.mappedNeighbors == NULL or
+            self.vertexMatch == NULL or self.edgeMatch == NULL):
+            raise MemoryError()
+        memset(self.vertexMatch, -1, self.size1 * self.size2 * sizeof(signed char))
+        memset(self.edgeMatch, -1, self.edgeCount1 * self.edgeCount2 * sizeof(signed char))
+
+    def __dealloc__(self):
+        free(self.order1); free(self.order2)
+        free(self.adjStart1); free(self.adjStart2)
+        free(self.adjacency1); free(self.adjacency2)
+        free(self.edgeIndex1); free(self.edgeIndex2)
+        free(self.connectivity1); free(self.connectivity2)
+        free(self.label1); free(self.label2)
+        free(self.core1); free(self.core2)
+        free(self.terminal1); free(self.terminal2)
+        free(self.matchOrder); free(self.parent); free(self.candidate)
+        free(self.rank); free(self.rarity); free(self.mappedNeighbors)
+        free(self.vertexMatch); free(self.edgeMatch)
+
+    cdef setGraph(self, Graph graph, bint first):
+        """
+        Build the adjacency structure, connectivity values, and labels of the
+        vertices of `graph`, which is the first graph of the search if `first`
+        is ``True`` or the second graph otherwise. The vertices are also
+        sorted by decreasing connectivity, as in :meth:`Graph.sortVertices`,
+        but the graph itself is not modified; this order is used to break ties
+        when ordering the vertices for matching.
+        """
+        cdef list vertices, edges
+        cdef dict indices, edgeIndices
+        cdef Vertex vertex, vertex2
+        cdef Edge edge
+        cdef int size, count, i, j, k, key
+        cdef int *order
+        cdef int *adjStart
+        cdef int *adjacency
+        cdef int *edgeIndex
+        cdef int *connectivity
+        cdef int *label
+        cdef int *core
+        cdef int *terminal
+
+        vertices = list(graph.vertices)
+        size = len(vertices)
+        indices = {}
+        for i, vertex in enumerate(vertices):
+            indices[vertex] = i
+        count = 0
+        for vertex in vertices:
+            count += len(vertex.edges)
+
+        order = <int *> malloc(max(size, 1) * sizeof(int))
+        adjStart = <int *> malloc((size + 1) * sizeof(int))
+        adjacency = <int *> malloc(max(count, 1) * sizeof(int))
+        edgeIndex = <int *> malloc(max(count, 1) * sizeof(int))
+        connectivity = <int *> malloc(max(3 * size, 1) * sizeof(int))
+        label = <int *> malloc(max(size, 1) * sizeof(int))
+        core = <int *> malloc(max(size, 1) * sizeof(int))
+        terminal = <int *> malloc(max(size, 1) * sizeof(int))
+        if first:
+            self.vertices1 = vertices; self.size1 = size
+            self.order1 = order; self.adjStart1 = adjStart; self.adjacency1 = adjacency
+            self.edgeIndex1 = edgeIndex; self.connectivity1 = connectivity; self.label1 = label
+            self.core1 = core; self.terminal1 = terminal
+        else:
+            self.vertices2 = vertices; self.size2 = size
+            self.order2 = order; self.adjStart2 = adjStart; self.adjacency2 = adjacency
+            self.edgeIndex2 = edgeIndex; self.connectivity2 = connectivity; self.label2 = label
+            self.core2 = core; self.terminal2 = terminal
+        if (order == NULL or adjStart == NULL or adjacency == NULL or edgeIndex == NULL or
+            connectivity == NULL or label == NULL or core == NULL or terminal == NULL):
+            raise MemoryError()
+
+        # Build the compressed adjacency structure, numbering each edge once
+        edges = []
+        edgeIndices = {}
+        k = 0
+        for i, vertex in enumerate(vertices):
+            adjStart[i] = k
+            label[i] = vertex.getMatchLabel()
+            core[i] = -1
+            terminal[i] = 0
+            for vertex2, edge in vertex.edges.iteritems():
+                try:
+                    adjacency[k] = indices[vertex2]
+                except KeyError:
+                    raise VF2Error('Vertex has an edge to a vertex that is not in the graph.')
+                if edge not in edgeIndices:
+                    edgeIndices[edge] = len(edges)
+                    edges.append(edge)
+                edgeIndex[k] = edgeIndices[edge]
+                k += 1
+        adjStart[size] = k
+        if first:
+            self.edges1 = edges; self.edgeCount1 = len(edges)
+        else:
+            self.edges2 = edges; self.edgeCount2 = len(edges)
+
+        # Compute the connectivity values of each vertex
+        for i in range(size):
+            connectivity[3*i] = adjStart[i+1] - adjStart[i]
+        for j in range(1, 3):
+            for i in range(size):
+                count = 0
+                for k in range(adjStart[i], adjStart[i+1]):
+                    count += connectivity[3*adjacency[k]+j-1]
+                connectivity[3*i+j] = count
+
+        # Sort the vertices by decreasing connectivity (a stable insertion
+        # sort, since graphs are small)
+        for i in range(size):
+            key = -256 * connectivity[3*i] - 16 * connectivity[3*i+1] - connectivity[3*i+2]
+            j = i
+            while j > 0 and -256 * connectivity[3*order[j-1]] - 16 * connectivity[3*order[j-1]+1] - connectivity[3*order[j-1]+2] > key:
+                order[j] = order[j-1]
+                j -= 1
+            order[j] = i
+
+    cdef int isPartitionMatch(self, int index1, int index2) nogil:
+        """
+        Return 1 if vertex `index1` from the first graph is in a partition
+        that can match vertex `index2` from the second graph, or 0 if not.
+        The labels of the vertices must be equal, unless either is zero. For
+        isomorphism the connectivity values must also be equal, while for
+        subgraph isomorphism vertex `index1` must have at least as many
+        neighbors as vertex `index2`.
+        """
+        cdef int k
+
+        if self.label1[index1] != self.label2[index2] and self.label1[index1] != 0 and self.label2[index2] != 0:
+            return 0
+        if self.subgraph:
+            return self.connectivity1[3*index1] >= self.connectivity2[3*index2]
+        for k in range(3):
+            if self.connectivity1[3*index1+k] != self.connectivity2[3*index2+k]: return 0
+        return 1
+
+    cdef int placeVertex(self, int index2, int position) nogil:
+        """
+        Put vertex `index2` from the second graph at `position` in the
+        matching order, and set its parent to its neighbor that is earliest in
+        the order, if any. Returns the next position in the order.
+        """
+        cdef int k, j
+
+        self.matchOrder[position] = index2
+        self.rank[index2] = position
+        self.parent[position] = -1
+        for k in range(self.adjStart2[index2], self.adjStart2[index2+1]):
+            j = self.adjacency2[k]
+            self.mappedNeighbors[j] += 1
+            if self.rank[j] >= 0 and self.rank[j] < position:
+                if self.parent[position] < 0 or self.rank[j] < self.rank[self.parent[position]]:
+                    self.parent[position] = j
+        return position + 1
+
+    cdef int orderVertices(self, int depth) nogil:
+        """
+        Set the order in which the vertices of the second graph are matched,
+        given that the first `depth` vertices have already been mapped. The
+        mapped vertices come first. The remaining vertices are visited in a
+        breadth-first traversal, starting from the vertex with the fewest
+        feasible matches in the first graph (and the most neighbors, to break
+        ties); the vertices of each level are added one at a time, choosing
+        the vertex with the most neighbors already in the order, then the
+        most neighbors, then the fewest feasible matches. Returns 1, or 0 if
+        some vertex has no feasible matches at all.
+        """
+        cdef int i, j, k, n, best, count, levelStart, levelEnd
+
+        # Count the vertices of the first graph in a partition that can match
+        # each unmapped vertex of the second graph
+        for i in range(self.size2):
+            self.rank[i] = -1
+            self.mappedNeighbors[i] = 0
+            self.rarity[i] = 0
+            if self.core2[i] >= 0: continue
+            for j in range(self.size1):
+                if self.core1[j] < 0 and self.isPartitionMatch(j, i):
+                    self.rarity[i] += 1
+            if self.rarity[i] == 0:
+                return 0
+
+        # The mapped vertices form the first level
+        n = 0
+        for i in range(self.size2):
+            j = self.order2[i]
+            if self.core2[j] >= 0:
+                n = self.placeVertex(j, n)
+
+        levelStart = 0
+        while n < self.size2:
+            if levelStart == n:
+                # Start a new connected component from its rarest vertex
+                best = -1
+                for i in range(self.size2):
+                    j = self.order2[i]
+                    if self.rank[j] != -1: continue
+                    if (best < 0 or self.rarity[j] < self.rarity[best] or
+                        (self.rarity[j] == self.rarity[best] and self.connectivity2[3*j] > self.connectivity2[3*best])):
+                        best = j
+                n = self.placeVertex(best, n)
+
+            # Mark the unplaced neighbors of the current level (with a rank
+            # of -2) as the next level
+            levelEnd = n
+            count = 0
+            for i in range(levelStart, levelEnd):
+                for k in range(self.adjStart2[self.matchOrder[i]], self.adjStart2[self.matchOrder[i]+1]):
+                    j = self.adjacency2[k]
+                    if self.rank[j] == -1:
+                        self.rank[j] = -2
+                        count += 1
+            levelStart = levelEnd
+
+            # Place the vertices of the next level
+            while count > 0:
+                best = -1
+                for i in range(self.size2):
+                    j = self.order2[i]
+                    if self.rank[j] != -2: continue
+                    if (best < 0 or self.mappedNeighbors[j] > self.mappedNeighbors[best] or
+                        (self.mappedNeighbors[j] == self.mappedNeighbors[best] and
+                            (self.connectivity2[3*j] > self.connectivity2[3*best] or
+                            (self.connectivity2[3*j] == self.connectivity2[3*best] and self.rarity[j] < self.rarity[best])))):
+                        best = j
+                n = self.placeVertex(best, n)
+                count -= 1
+
+        return 1
+
+    cdef int match(self, int depth) nogil:
+        """
+        Search for pairs of vertices to match, until all vertices of the
+        second graph are matched or the viable set of matches is exhausted.
+        The `depth` parameter is the number of vertices already matched by
+        the initial mapping. The search is a depth-first backtracking search
+        over the positions of the matching order; the state of each level is
+        held in the `candidate` array rather than on the call stack. Returns
+        1 if the search is complete, 0 if the search was exhausted, or -1 if
+        an exception was raised.
+        """
+        cdef int position, index1, index2, parent, end, result
+
+        # Done if we have mapped to all vertices in graph
+        if depth == self.size2:
+            self.isMatch = True
+            if self.findAll:
+                return self.addMapping()
+            return 1
+
+        if not self.orderVertices(depth):
+            return 0
+
+        position = depth
+        self.candidate[position] = 0 if self.parent[position] < 0 else self.adjStart1[self.core2[self.parent[position]]]
+        while True:
+            index2 = self.matchOrder[position]
+            parent = self.parent[position]
+            # The candidates are the neighbors of the vertex matched to the
+            # parent, or all vertices of the first graph if there is no parent
+            end = self.size1 if parent < 0 else self.adjStart1[self.core2[parent]+1]
+
+            # Find the next feasible candidate at this position
+            index1 = -1
+            while self.candidate[position] < end:
+                if parent < 0:
+                    index1 = self.order1[self.candidate[position]]
+                else:
+                    index1 = self.adjacency1[self.candidate[position]]
+                self.candidate[position] += 1
+                if self.core1[index1] >= 0:
+                    index1 = -1
+                    continue
+                result = self.feasible(index1, index2)
+                if result < 0: return -1
+                if result: break
+                index1 = -1
+
+            if index1 < 0:
+                # None of the candidates led to a complete isomorphism, so
+                # backtrack to the previous position
+                if position == depth: return 0
+                position -= 1
+                index2 = self.matchOrder[position]
+                self.removeFromMapping(self.core2[index2], index2, position + 1)
+                continue
+
+            # Add proposed match to mapping
+            self.addToMapping(index1, index2, position + 1)
+            position += 1
+            if position < self.size2:
+                parent = self.parent[position]
+                self.candidate[position] = 0 if parent < 0 else self.adjStart1[self.core2[parent]]
+                continue
+
+            # Done if we have mapped to all vertices in graph
+            self.isMatch = True
+            if not self.findAll: return 1
+            if self.addMapping() < 0: return -1
+            # Undo the last match and continue with the next candidate
+            position -= 1
+            self.removeFromMapping(index1, index2, position + 1)
+
+    cdef int feasible(self, int index1, int index2) nogil:
+        """
+        Return 1 if vertex `index1` from the first graph is a feasible match
+        for vertex `index2` from the second graph, 0 if not, or -1 if an
+        exception was raised. The semantic and structural relationship of the
+        vertices is evaluated, including several structural "look-aheads"
+        that cheaply eliminate many otherwise feasible pairs.
+        """
+        cdef int k, j1, j2, edge1, result
+        cdef int term1Count, term2Count, neither1Count, neither2Count
+
+        # To be feasible the vertices must be in matching partitions
+        if not self.isPartitionMatch(index1, index2): return 0
+
+        # Semantic check #1: vertex1 and vertex2 must be equivalent
+        result = self.isVertexMatch(index1, index2)
+        if result <= 0: return result
+
+        # Semantic check #2: adjacent vertices to vertex1 and vertex2 that are
+        # already mapped should be connected by equivalent edges
+        for k in range(self.adjStart2[index2], self.adjStart2[index2+1]):
+            j1 = self.core2[self.adjacency2[k]]
+            if j1 < 0: continue
+            edge1 = -1
+            for j2 in range(self.adjStart1[index1], self.adjStart1[index1+1]):
+                if self.adjacency1[j2] == j1:
+                    edge1 = self.edgeIndex1[j2]
+                    break
+            if edge1 < 0:
+                # The vertices are joined in graph2, but not in graph1
+                return 0
+            result = self.isEdgeMatch(edge1, self.edgeIndex2[k])
+            if result <= 0: return result
+
+        # Count number of terminals adjacent to vertex1 and vertex2; mapped
+        # vertices adjacent to vertex1 must also be adjacent to vertex2 for
+        # exact matching
+        term1Count = 0; term2Count = 0; neither1Count = 0; neither2Count = 0
+        for k in range(self.adjStart1[index1], self.adjStart1[index1+1]):
+            j1 = self.adjacency1[k]
+            if self.core1[j1] >= 0:
+                neither1Count += 1
+            elif self.terminal1[j1] > 0:
+                term1Count += 1
+        for k in range(self.adjStart2[index2], self.adjStart2[index2+1]):
+            j2 = self.adjacency2[k]
+            if self.core2[j2] >= 0:
+                neither2Count += 1
+            elif self.terminal2[j2] > 0:
+                term2Count += 1
+
+        # Level 2 look-ahead: the number of adjacent vertices of vertex1 and
+        # vertex2 that are non-terminals must be equal; since every mapped
+        # neighbor of vertex2 maps to a neighbor of vertex1, this also ensures
+        # that the vertices are not joined in graph1 but not in graph2
+        if self.subgraph:
+            if neither1Count < neither2Count: return 0
+        else:
+            if neither1Count != neither2Count: return 0
+
+        # Level 1 look-ahead: the number of adjacent vertices of vertex1 and
+        # vertex2 that are terminals must be equal
+        if self.subgraph:
+            if term1Count < term2Count: return 0
+        else:
+            if term1Count != term2Count: return 0
+
+        # All of our tests have been passed, so the two vertices are a feasible pair
+        return 1
+
+    cdef int isVertexMatch(self, int index1, int index2) nogil:
+        """
+        Return 1 if vertex `index1` from the first graph is semantically
+        equivalent to (or, for subgraph matching, a specific case of) vertex
+        `index2` from the second graph, 0 if not, or -1 if an exception was
+        raised. The check is only evaluated once for each pair of vertices.
+        """
+        cdef int k = index1 * self.size2 + index2
+        if self.vertexMatch[k] < 0:
+            with gil:
+                try:
+                    if self.subgraph:
+                        self.vertexMatch[k] = (<Vertex>self.vertices1[index1]).isSpecificCaseOf(<Vertex>self.vertices2[index2])
+                    else:
+                        self.vertexMatch[k] = (<Vertex>self.vertices1[index1]).equivalent(<Vertex>self.vertices2[index2])
+                except:
+                    self.error = sys.exc_info()
+                    return -1
+        return self.vertexMatch[k]
+
+    cdef int isEdgeMatch(self, int index1, int index2) nogil:
+        """
+        Return 1 if edge `index1` from the first graph is semantically
+        equivalent to (or, for subgraph matching, a specific case of) edge
+        `index2` from the second graph, 0 if not, or -1 if an exception was
+        raised. The check is only evaluated once for each pair of edges.
+        """
+        cdef int k = index1 * self.edgeCount2 + index2
+        if self.edgeMatch[k] < 0:
+            with gil:
+                try:
+                    if self.subgraph:
+                        self.edgeMatch[k] = (<Edge>self.edges1[index1]).isSpecificCaseOf(<Edge>self.edges2[index2])
+                    else:
+                        self.edgeMatch[k] = (<Edge>self.edges1[index1]).equivalent(<Edge>self.edges2[index2])
+                except:
+                    self.error = sys.exc_info()
+                    return -1
+        return self.edgeMatch[k]
+
+    cdef int addMapping(self) nogil:
+        """
+        Append the current (complete) mapping to the list of mappings found,
+        as a dict with the vertices of the first graph as keys and those of
+        the second graph as values. Returns 0, or -1 if an exception was
+        raised.
+        """
+        cdef int i
+        with gil:
+            try:
+                mapping = {}
+                for i in range(self.size2):
+                    mapping[self.vertices1[self.core2[i]]] = self.vertices2[i]
+                self.mappingList.append(mapping)
+            except:
+                self.error = sys.exc_info()
+                return -1
+        return 0
+
+    cdef void addToMapping(self, int index1, int index2, int depth) nogil:
+        """
+        Add as valid a mapping of vertex `index1` from the first graph to
+        vertex `index2` from the second graph at search depth `depth`, and
+        update the terminals accordingly.
+        """
+        cdef int k, j
+
+        # Map the vertices to one another
+        self.core1[index1] = index2
+        self.core2[index2] = index1
+
+        # Add any neighboring vertices not already in mapping to terminals
+        for k in range(self.adjStart1[index1], self.adjStart1[index1+1]):
+            j = self.adjacency1[k]
+            if self.terminal1[j] == 0: self.terminal1[j] = depth
+        for k in range(self.adjStart2[index2], self.adjStart2[index2+1]):
+            j = self.adjacency2[k]
+            if self.terminal2[j] == 0: self.terminal2[j] = depth
+
+    cdef void removeFromMapping(self, int index1, int index2, int depth) nogil:
+        """
+        Remove as valid a mapping of vertex `index1` from the first graph to
+        vertex `index2` from the second graph at search depth `depth`, and
+        update the terminals accordingly.
+        """
+        cdef int k, j
+
+        # Unmap the vertices from one another
+        self.core1[index1] = -1
+        self.core2[index2] = -1
+
+        # Remove any vertices that only became terminals at this depth
+        for k in range(self.adjStart1[index1], self.adjStart1[index1+1]):
+            j = self.adjacency1[k]
+            if self.terminal1[j] == depth: self.terminal1[j] = 0
+        for k in range(self.adjStart2[index2], self.adjStart2[index2+1]):
+            j = self.adjacency2[k]
+            if self.terminal2[j] == depth: self.terminal2[j] = 0
+
+################################################################################
+
 cdef class VF2:
     """
     An implementation of the second version of the Vento-Foggia (VF2) algorithm
-    for graph and subgraph isomorphism.
+    for graph and subgraph isomorphism. The object itself holds no state, so
+    a single instance can be shared between threads.
     """
     
-    def __init__(self):
-        self.graph1 = None
-        self.graph2 = None
-
     cpdef bint isIsomorphic(self, Graph graph1, Graph graph2, dict initialMapping) except -2:
         """
         Return ``True`` if graph `graph1` is isomorphic to graph `graph2` with
         the optional initial mapping `initialMapping`, or ``False`` otherwise.
         """
-        self.isomorphism(graph1, graph2, initialMapping, False, False)
-        return self.isMatch
+        return self.isomorphism(graph1, graph2, initialMapping, False, False).isMatch
         
     cpdef list findIsomorphism(self, Graph graph1, Graph graph2, dict initialMapping):
         """
@@ -65,8 +611,7 @@ cdef class VF2:
         `initialMapping`. If no valid isomorphisms are found, an empty list is
         returned.
         """
-        self.isomorphism(graph1, graph2, initialMapping, False, True)
-        return self.mappingList
+        return self.isomorphism(graph1, graph2, initialMapping, False, True).mappingList
 
     cpdef bint isSubgraphIsomorphic(self, Graph graph1, Graph graph2, dict initialMapping) except -2:
         """
@@ -74,8 +619,7 @@ cdef class VF2:
         `graph2` with the optional initial mapping `initialMapping`, or
         ``False`` otherwise.
         """
-        self.isomorphism(graph1, graph2, initialMapping, True, False)
-        return self.isMatch
+        return self.isomorphism(graph1, graph2, initialMapping, True, False).isMatch
 
     cpdef list findSubgraphIsomorphisms(self, Graph graph1, Graph graph2, dict initialMapping):
         """
@@ -84,274 +628,49 @@ cdef class VF2:
         `initialMapping`. If no valid subgraph isomorphisms are found, an empty
         list is returned.
         """
-        self.isomorphism(graph1, graph2, initialMapping, True, True)
-        return self.mappingList
+        return self.isomorphism(graph1, graph2, initialMapping, True, True).mappingList
         
-    cdef isomorphism(self, Graph graph1, Graph graph2, dict initialMapping, bint subgraph, bint findAll):
+    cdef VF2State isomorphism(self, Graph graph1, Graph graph2, dict initialMapping, bint subgraph, bint findAll):
         """
         Evaluate the isomorphism relationship between graphs `graph1` and
         `graph2` with optional initial mapping `initialMapping`. If `subgraph`
         is ``True``, `graph2` is treated as a possible subgraph of `graph1`.
         If `findAll` is ``True``, all isomorphisms are found; otherwise only
-        the first is found.
+        the first is found. Returns the :class:`VF2State` object containing
+        the results of the search.
         """
-        cdef int callDepth, index1, index2
-        
-        if self.graph1 is not graph1:
-            self.graph1 = graph1
-            graph1.sortVertices()
-            
-        if self.graph2 is not graph2:
-            self.graph2 = graph2
-            graph2.sortVertices()
-        
-        self.initialMapping = initialMapping
-        self.subgraph = subgraph
-        self.findAll = findAll
-    
-        # Clear previous result
-        self.isMatch = False
-        self.mappingList = []
-        
+        cdef VF2State state
+        cdef Vertex vertex1, vertex2
+        cdef int depth, index1, index2, result
+        cdef dict indices1, indices2
+
         # Some quick isomorphism checks based on graph sizes
-        if not self.subgraph and len(graph2.vertices) != len(graph1.vertices):
+        if not subgraph and len(graph2.vertices) != len(graph1.vertices):
             # The two graphs don't have the same number of vertices, so they
             # cannot be isomorphic
-            return
-        elif not self.subgraph and len(graph2.vertices) == len(graph1.vertices) == 0:
-            # The two graphs don't have any vertices; this means they are
-            # trivially isomorphic
-            self.isMatch = True
-            return
-        elif self.subgraph and len(graph2.vertices) > len(graph1.vertices):
+            return VF2State(Graph(), Graph(), subgraph, findAll)
+        elif subgraph and len(graph2.vertices) > len(graph1.vertices):
             # The second graph has more vertices than the first, so it cannot be
             # a subgraph of the first
-            return
-
-        # Initialize callDepth with the size of the smallest graph
-        # Each recursive call to match() will decrease it by one;
-        # when the whole graph has been explored, it should reach 0
-        # It should never go below zero!
-        callDepth = len(graph2.vertices)
-
-        # Initialize mapping by clearing any previous mapping information
-        for vertex1 in graph1.vertices:
-            vertex1.mapping = None
-            vertex1.terminal = False
-        for vertex2 in graph2.vertices:
-            vertex2.mapping = None
-            vertex2.terminal = False
-        # Set the initial mapping if provided
-        if self.initialMapping is not None:
-            for vertex1, vertex2 in self.initialMapping.items():
-                self.addToMapping(vertex1, vertex2)
-            callDepth -= len(self.initialMapping)
-            
-        self.match(callDepth)
-
-    cdef bint match(self, int callDepth) except -2:
-        """
-        Recursively search for pairs of vertices to match, until all vertices
-        are matched or the viable set of matches is exhausted. The `callDepth`
-        parameter helps ensure we never enter an infinite loop.
-        """
-        cdef Vertex vertex1, vertex2
-        cdef dict mapping
-        cdef bint hasTerminals
-        
-        # The call depth should never be negative!
-        if callDepth < 0:
-            raise VF2Error('Negative call depth encountered in VF2_match().')
-
-        # Done if we have mapped to all vertices in graph
-        if callDepth == 0:
-            if self.findAll:
-                mapping = {}
-                for vertex2 in self.graph2.vertices:
-                    assert vertex2.mapping is not None
-                    assert vertex2.mapping.mapping is vertex2
-                    mapping[vertex2.mapping] = vertex2
-                self.mappingList.append(mapping)
-            self.isMatch = True
-            return True
-
-        # Create list of pairs of candidates for inclusion in mapping
-        hasTerminals = False
-        for vertex2 in self.graph2.vertices:
-            if vertex2.terminal:
-                # graph2 has terminals, so graph1 also must have terminals
-                hasTerminals = True
-                break
-        else:
-            vertex2 = self.graph2.vertices[0]
-            
-        for vertex1 in self.graph1.vertices:
-            # If terminals are available, then skip vertices in the first
-            # graph that are not terminals
-            if hasTerminals and not vertex1.terminal: continue
-            # Propose a pairing
-            if self.feasible(vertex1, vertex2):
-                # Add proposed match to mapping
-                self.addToMapping(vertex1, vertex2)
-                # Recurse
-                isMatch = self.match(callDepth-1)
-                if isMatch and not self.findAll:
-                    return True
-                # Undo proposed match
-                self.removeFromMapping(vertex1, vertex2)
-                
-        # None of the proposed matches led to a complete isomorphism, so return False
-        return False     
-        
-    cdef bint feasible(self, Vertex vertex1, Vertex vertex2) except -2:
-        """
-        Return ``True`` if vertex `vertex1` from the first graph is a feasible
-        match for vertex `vertex2` from the second graph, or ``False`` if not.
-        The semantic and structural relationship of the vertices is evaluated,
-        including several structural "look-aheads" that cheaply eliminate many
-        otherwise feasible pairs.
-        """
-        cdef Vertex vert1, vert2
-        cdef Edge edge1, edge2
-        cdef int term1Count, term2Count, neither1Count, neither2Count
-        
-        if not self.subgraph:
-            # To be feasible the connectivity values must be an exact match
-            if vertex1.connectivity1 != vertex2.connectivity1: return False
-            if vertex1.connectivity2 != vertex2.connectivity2: return False
-            if vertex1.connectivity3 != vertex2.connectivity3: return False
-        
-        # Semantic check #1: vertex1 and vertex2 must be equivalent
-        if self.subgraph:
-            if not vertex1.isSpecificCaseOf(vertex2): return False
-        else:
-            if not vertex1.equivalent(vertex2): return False
-        
-        # Semantic check #2: adjacent vertices to vertex1 and vertex2 that are
-        # already mapped should be connected by equivalent edges
-        for vert2 in vertex2.edges:
-            if vert2.mapping is not None:
-                vert1 = vert2.mapping
-                if vert1 not in vertex1.edges:
-                    # The vertices are joined in graph2, but not in graph1
-                    return False
-                edge1 = vertex1.edges[vert1]
-                edge2 = vertex2.edges[vert2]
-                if self.subgraph:
-                    if not edge1.isSpecificCaseOf(edge2): return False
-                else:
-                    if not edge1.equivalent(edge2): return False
-
-        # There could still be edges in graph1 that aren't in graph2; this is okay
-        # for subgraph matching, but not for exact matching
-        if not self.subgraph:
-            for vert1 in vertex1.edges:
-                if vert1.mapping is not None:
-                    if vert1.mapping not in vertex2.edges: 
-                        # The vertices are joined in graph1, but not in graph2
-                        return False
-
-        # Count number of terminals adjacent to vertex1 and vertex2
-        term1Count = 0; term2Count = 0; neither1Count = 0; neither2Count = 0
-        for vert1 in vertex1.edges:
-            if vert1.terminal: term1Count += 1
-            elif vert1.mapping is not None: neither1Count += 1
-        for vert2 in vertex2.edges:
-            if vert2.terminal: term2Count += 1
-            elif vert2.mapping is not None: neither2Count += 1
+            return VF2State(Graph(), Graph(), subgraph, findAll)
 
-        # Level 2 look-ahead: the number of adjacent vertices of vertex1 and
-        # vertex2 that are non-terminals must be equal
-        if self.subgraph:
-            if neither1Count < neither2Count: return False
-        else:
-            if neither1Count != neither2Count: return False
+        state = VF2State(graph1, graph2, subgraph, findAll)
 
-        # Level 1 look-ahead: the number of adjacent vertices of vertex1 and
-        # vertex2 that are terminals must be equal
-        if self.subgraph:
-            if term1Count < term2Count: return False
-        else:
-            if term1Count != term2Count: return False
-
-        # Level 0 look-ahead: all adjacent vertices of vertex2 already in the
-        # mapping must map to adjacent vertices of vertex1
-        for vert2 in vertex2.edges:
-            if vert2.mapping is not None:
-                if vert2.mapping not in vertex1.edges: return False
-        # Also, all adjacent vertices of vertex1 already in the mapping must map to
-        # adjacent vertices of vertex2, unless we are subgraph matching
-        if not self.subgraph:
-            for vert1 in vertex1.edges:
-                if vert1.mapping is not None:
-                    if vert1.mapping not in vertex2.edges: return False
+        # Set the initial mapping if provided
+        depth = 0
+        if initialMapping is not None:
+            indices1 = dict([(vertex1, index1) for index1, vertex1 in enumerate(state.vertices1)])
+            indices2 = dict([(vertex2, index2) for index2, vertex2 in enumerate(state.vertices2)])
+            for vertex1, vertex2 in initialMapping.iteritems():
+                try:
+                    index1 = indices1[vertex1]; index2 = indices2[vertex2]
+                except KeyError:
+                    raise VF2Error('Initial mapping contains vertices that are not in the graphs.')
+                depth += 1
+                state.addToMapping(index1, index2, depth)
 
-        # All of our tests have been passed, so the two vertices are a feasible pair
-        return True
-    
-    cdef addToMapping(self, Vertex vertex1, Vertex vertex2):
-        """
-        Add as valid a mapping of vertex `vertex1` from the first graph to
-        vertex `vertex2` from the second graph, and update the terminals
-        status accordingly.        
-        """
-        cdef Vertex v
-        
-        # Map the vertices to one another
-        vertex1.mapping = vertex2
-        vertex2.mapping = vertex1
-        
-        # Remove these vertices from the set of terminals
-        vertex1.terminal = False
-        vertex2.terminal = False
-        
-        # Add any neighboring vertices not already in mapping to terminals
-        for v in vertex1.edges:
-            v.terminal = v.mapping is None
-        for v in vertex2.edges:
-            v.terminal = v.mapping is None        
-    
-    cdef removeFromMapping(self, Vertex vertex1, Vertex vertex2):
-        """
-        Remove as valid a mapping of vertex `vertex1` from the first graph to
-        vertex `vertex2` from the second graph, and update the terminals
-        status accordingly.        
-        """
-        cdef Vertex v, v2
-        
-        # Unmap the vertices from one another
-        vertex1.mapping = None
-        vertex2.mapping = None
-        
-        # Restore these vertices to the set of terminals
-        for v in vertex1.edges:
-            if v.mapping is not None:
-                vertex1.terminal = True
-                break
-            else:
-                vertex1.terminal = False
-        for v in vertex2.edges:
-            if v.mapping is not None:
-                vertex2.terminal = True
-                break
-            else:
-                vertex2.terminal = False
-        
-        # Recompute the terminal status of any neighboring atoms
-        for v in vertex1.edges:
-            if v.mapping is not None: continue
-            for v2 in v.edges:
-                if v2.mapping is not None:
-                    v.terminal = True
-                    break
-            else:
-                v.terminal = False
-        for v in vertex2.edges:
-            if v.mapping is not None: continue
-            for v2 in v.edges:
-                if v2.mapping is not None:
-                    v.terminal = True
-                    break
-            else:
-                v.terminal = False
-            
\ No newline at end of file
+        with nogil:
+            result = state.match(depth)
+        if result < 0:
+            raise state.error[0], state.error[1], state.error[2]
+        return state
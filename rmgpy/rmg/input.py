@@ -242,7 +242,7 @@ def pressureDependence(
     rmg.pressureDependence.activeKRotor = True
     rmg.pressureDependence.rmgmode = True
 
-def options(units='si', saveRestartPeriod=None, drawMolecules=False, generatePlots=False, saveConcentrationProfiles=False, verboseComments=False, saveEdgeSpecies=False):
+def options(units='si', saveRestartPeriod=None, drawMolecules=False, generatePlots=False, saveConcentrationProfiles=False, verboseComments=False, saveEdgeSpecies=False, cacheThermo=False, cacheDrawings=False, cacheDatabase=False):
     rmg.units = units
     rmg.saveRestartPeriod = Quantity(saveRestartPeriod) if saveRestartPeriod else None
     rmg.drawMolecules = drawMolecules
@@ -250,6 +250,9 @@ def options(units='si', saveRestartPeriod=None, drawMolecules=False, generatePlo
     rmg.saveConcentrationProfiles = saveConcentrationProfiles
     rmg.verboseComments = verboseComments
     rmg.saveEdgeSpecies = saveEdgeSpecies
+    rmg.cacheThermo = cacheThermo
+    rmg.cacheDrawings = cacheDrawings
+    rmg.cacheDatabase = cacheDatabase
 
 def generatedSpeciesConstraints(**kwargs):
     validConstraints = [
@@ -510,6 +513,9 @@ def saveInputFile(path, rmg):
     f.write('    generatePlots = {0},\n'.format(rmg.generatePlots))
     f.write('    saveConcentrationProfiles = {0},\n'.format(rmg.saveConcentrationProfiles))
     f.write('    verboseComments = {0},\n'.format(rmg.verboseComments))
+    f.write('    cacheThermo = {0},\n'.format(rmg.cacheThermo))
+    f.write('    cacheDrawings = {0},\n'.format(rmg.cacheDrawings))
+    f.write('    cacheDatabase = {0},\n'.format(rmg.cacheDatabase))
     f.write(')\n\n')
         
     f.close()
@@ -46,6 +46,7 @@ try:
 except ImportError:
     logging.warning('Optional package dependency "xlwt" not loaded; Some output features will not work.')
 
+from rmgpy import settings
 from rmgpy.molecule import Molecule
 from rmgpy.solver.base import TerminationTime, TerminationConversion
 from rmgpy.solver.simple import SimpleReactor
@@ -106,6 +107,9 @@ class RMG:
     `generatePlots`             ``True`` to generate plots of the job execution statistics after each iteration, ``False`` otherwise
     `verboseComments`           ``True`` to keep the verbose comments for database estimates, ``False`` otherwise
     `saveEdgeSpecies`           ``True`` to save chemkin and HTML files of the edge species, ``False`` otherwise
+    `cacheThermo`               ``True`` to share group additivity thermo estimates across jobs via an on-disk cache, ``False`` otherwise
+    `cacheDrawings`             ``True`` to share species drawings across jobs via an on-disk cache, ``False`` otherwise
+    `cacheDatabase`             ``True`` to load the RMG database from an on-disk cache when possible, ``False`` otherwise
     `pressureDependence`        Whether to process unimolecular (pressure-dependent) reaction networks
     `quantumMechanics`          Whether to apply quantum mechanical calculations instead of group additivity to certain molecular types.
     `wallTime`                  The maximum amount of CPU time in seconds to expend on this job; used to stop gracefully so we can still get profiling information
@@ -161,6 +165,9 @@ class RMG:
         self.saveConcentrationProfiles = None
         self.verboseComments = None
         self.saveEdgeSpecies = None
+        self.cacheThermo = None
+        self.cacheDrawings = None
+        self.cacheDatabase = None
         self.pressureDependence = None
         self.quantumMechanics = None
         self.speciesConstraints = {}
@@ -228,8 +235,11 @@ class RMG:
         if path is None: path = self.outputFile
         saveInputFile(path, self)
         
-    def loadDatabase(self):
-        
+    def loadDatabase(self, processes=1):
+        """
+        Load the RMG database used by this job, using up to `processes`
+        worker processes.
+        """
         self.database = RMGDatabase()
         self.database.load(
             path = self.databaseDirectory,
@@ -241,7 +251,11 @@ class RMG:
             kineticsDepositories = self.kineticsDepositories,
             #frequenciesLibraries = self.statmechLibraries,
             depository = False, # Don't bother loading the depository information, as we don't use it
+            cacheDirectory = os.path.join(settings['cache.directory'], 'database') if self.cacheDatabase else None,
+            processes = processes,
         )
+        if self.cacheThermo:
+            self.database.thermo.cacheDirectory = os.path.join(settings['cache.directory'], 'thermo')
         if self.kineticsEstimator == 'rate rules':
             if '!training' not in self.kineticsDepositories:
                 logging.info('Adding rate rules from training set in kinetics families...')
@@ -304,7 +318,7 @@ class RMG:
             self.quantumMechanics.initialize()
 
         # Load databases
-        self.loadDatabase()
+        self.loadDatabase(processes=args.processes)
         
         # Do all liquid-phase startup things:
         if self.solvent:
@@ -707,13 +721,14 @@ class RMG:
         Save the current reaction model to a pretty HTML file.
         """
         logging.info('Saving current model core to HTML file...')
+        cacheDirectory = os.path.join(settings['cache.directory'], 'drawings') if self.cacheDrawings else None
         from rmgpy.rmg.output import saveOutputHTML
-        saveOutputHTML(os.path.join(self.outputDirectory, 'output.html'), self.reactionModel, 'core')
+        saveOutputHTML(os.path.join(self.outputDirectory, 'output.html'), self.reactionModel, 'core', cacheDirectory=cacheDirectory)
         
         if self.saveEdgeSpecies ==True:
             logging.info('Saving current model edge to HTML file...')
             from rmgpy.rmg.output import saveOutputHTML
-            saveOutputHTML(os.path.join(self.outputDirectory, 'output_edge.html'), self.reactionModel, 'edge')
+            saveOutputHTML(os.path.join(self.outputDirectory, 'output_edge.html'), self.reactionModel, 'edge', cacheDirectory=cacheDirectory)
         
     def saveChemkinFiles(self):
         """
@@ -1729,24 +1729,30 @@ class CoreEdgeReactionModel:
         else:
             # expects a molecule here
             struct = species
+
+        # Count the atoms of each element in a single pass over the structure
+        counts = {}
+        radicals = 0
+        for atom in struct.atoms:
+            symbol = atom.element.symbol
+            counts[symbol] = counts.get(symbol, 0) + 1
+            radicals += atom.radicalElectrons
+        H = counts.get('H', 0)
+
+        if (counts.get('C', 0) <= maxCarbonAtoms and
+            H <= maxHydrogenAtoms and
+            counts.get('O', 0) <= maxOxygenAtoms and
+            counts.get('N', 0) <= maxNitrogenAtoms and
+            counts.get('Si', 0) <= maxSiliconAtoms and
+            counts.get('S', 0) <= maxSulfurAtoms and
+            len(struct.atoms) - H <= maxHeavyAtoms and
+            radicals <= maxRadicals):
+            return False
+
+        # The structure exceeds at least one constraint, so it fails unless
+        # it was explicitly allowed; only now is the (more expensive)
+        # isomorphism check against the allowed molecules needed
         for molecule in explicitlyAllowedMolecules:
             if struct.isIsomorphic(molecule):
-                return False        
-        H = struct.getNumAtoms('H')
-        if struct.getNumAtoms('C') > maxCarbonAtoms:
-            return True
-        if H > maxHydrogenAtoms:
-            return True
-        if struct.getNumAtoms('O') > maxOxygenAtoms:
-            return True
-        if struct.getNumAtoms('N') > maxNitrogenAtoms:
-            return True
-        if struct.getNumAtoms('Si') > maxSiliconAtoms:
-            return True
-        if struct.getNumAtoms('S') > maxSulfurAtoms:
-            return True
-        if len(struct.atoms) - H > maxHeavyAtoms:
-            return True
-        if (struct.getNumberOfRadicalElectrons() > maxRadicals):
-            return True
-        return False
\ No newline at end of file
+                return False
+        return True
\ No newline at end of file
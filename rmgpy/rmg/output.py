@@ -49,20 +49,44 @@ class OutputError(Exception):
 
 ################################################################################
 
-def saveOutputHTML(path, reactionModel, partCoreEdge='core'):
+def drawSpecies(drawings, processes=1, cacheDirectory=None):
+    """
+    Draw the species in `drawings`, a list of (species, path) tuples, to
+    the given paths on disk using :func:`rmgpy.molecule.draw.drawMolecules`.
+    Species whose drawing already exists are skipped. Drawings are
+    distributed over `processes` worker processes, and if a
+    `cacheDirectory` is given, they are shared across jobs via the drawing
+    cache in that directory.
+    """
+    from rmgpy.molecule.draw import drawMolecules
+    from rmgpy.chemkin import getSpeciesIdentifier
+
+    molecules = []; paths = []
+    for spec, fstr in drawings:
+        if os.path.exists(fstr) or fstr in paths:
+            continue
+        try:
+            molecules.append(spec.molecule[0])
+        except IndexError:
+            raise OutputError("{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.".format(getSpeciesIdentifier(spec)))
+        paths.append(fstr)
+
+    if molecules:
+        drawMolecules(molecules, paths, 'png', processes=processes, cacheDirectory=cacheDirectory)
+
+def saveOutputHTML(path, reactionModel, partCoreEdge='core', processes=1, cacheDirectory=None):
     """
     Save the current set of  species and reactions of `reactionModel` to
     an HTML file `path` on disk. As part of this process, drawings of all 
     species are created in the species folder (if they don't already exist)
-    using the :mod:`rmgpy.molecule.draw` module. The :mod:`jinja`
+    using the :mod:`rmgpy.molecule.draw` module, with up to `processes`
+    worker processes and reusing the drawings in the optional
+    `cacheDirectory`. The :mod:`jinja`
     package is used to generate the HTML; if this package is not found, no
     HTML will be generated (but the program will carry on).
     """
 
     from model import PDepReaction
-    
-    from rmgpy.molecule.draw import MoleculeDrawer
-    from rmgpy.chemkin import getSpeciesIdentifier
 
     try:
         import jinja2
@@ -87,6 +111,7 @@ def saveOutputHTML(path, reactionModel, partCoreEdge='core'):
 
     re_index_search = re.compile(r'\((\d+)\)$').search
     
+    drawings = []
     for spec in species:
         # if the species dictionary came from an RMG-Java job, make them prettier
         # We use the presence of a trailing index on the label to discern this
@@ -100,11 +125,8 @@ def saveOutputHTML(path, reactionModel, partCoreEdge='core'):
             fstr = os.path.join(dirname, 'species', '{0}.png'.format(spec))
         elif partCoreEdge == 'edge':
             fstr = os.path.join(dirname, 'species_edge', '{0}.png'.format(spec))
-        if not os.path.exists(fstr):
-            try:
-                MoleculeDrawer().draw(spec.molecule[0], 'png', fstr)
-            except IndexError:
-                raise OutputError("{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.".format(getSpeciesIdentifier(spec)))
+        drawings.append((spec, fstr))
+    drawSpecies(drawings, processes, cacheDirectory)
                 
     # We want to keep species sorted in the original order in which they were added to the RMG core.
     # Rather than ordered by index
@@ -592,7 +614,6 @@ def saveDiffHTML(path, commonSpeciesList, speciesList1, speciesList2, commonReac
     from model import PDepReaction
     from rmgpy.kinetics import Arrhenius, MultiArrhenius, MultiPDepArrhenius
 
-    from rmgpy.molecule.draw import MoleculeDrawer
     try:
         import jinja2
     except ImportError:
@@ -615,6 +636,7 @@ def saveDiffHTML(path, commonSpeciesList, speciesList1, speciesList2, commonReac
     if not os.path.isdir(os.path.join(dirname,'species2')):
         os.makedirs(os.path.join(dirname,'species2'))
 
+    drawings = []
     for spec1, spec2 in commonSpeciesList:
         # if the species dictionary came from an RMG-Java job, make them prettier
         # We use the presence of a trailing index on the label to discern this
@@ -630,20 +652,8 @@ def saveDiffHTML(path, commonSpeciesList, speciesList1, speciesList2, commonReac
             spec2.label = spec2.label[0:match2.start()]            
         
         # Draw molecules if necessary
-        fstr = os.path.join(dirname, 'species1', '{0}.png'.format(spec1))
-        if not os.path.exists(fstr):
-            try:
-                MoleculeDrawer().draw(spec1.molecule[0], 'png', fstr)
-            except IndexError:
-                raise OutputError('{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.'.format(getSpeciesIdentifier(spec1)))
-
-            
-        fstr = os.path.join(dirname, 'species2', '{0}.png'.format(spec2))
-        if not os.path.exists(fstr):
-            try:
-                MoleculeDrawer().draw(spec2.molecule[0], 'png', fstr)
-            except IndexError:
-                raise OutputError('{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.'.format(getSpeciesIdentifier(spec2)))
+        drawings.append((spec1, os.path.join(dirname, 'species1', '{0}.png'.format(spec1))))
+        drawings.append((spec2, os.path.join(dirname, 'species2', '{0}.png'.format(spec2))))
     
                 
     for spec in speciesList1:
@@ -652,12 +662,7 @@ def saveDiffHTML(path, commonSpeciesList, speciesList1, speciesList2, commonReac
             spec.index = int(match.group(0)[1:-1])
             spec.label = spec.label[0:match.start()]
         # Draw molecules if necessary
-        fstr = os.path.join(dirname, 'species1', '{0}.png'.format(spec))
-        if not os.path.exists(fstr):
-            try:
-                MoleculeDrawer().draw(spec.molecule[0], 'png', fstr)
-            except IndexError:
-                raise OutputError('{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.'.format(getSpeciesIdentifier(spec)))
+        drawings.append((spec, os.path.join(dirname, 'species1', '{0}.png'.format(spec))))
     
     for spec in speciesList2:
         match = re_index.search(spec.label)
@@ -665,13 +670,8 @@ def saveDiffHTML(path, commonSpeciesList, speciesList1, speciesList2, commonReac
             spec.index = int(match.group(0)[1:-1])
             spec.label = spec.label[0:match.start()]
         # Draw molecules if necessary
-        fstr = os.path.join(dirname, 'species2', '{0}.png'.format(spec))
-        if not os.path.exists(fstr):
-            try:
-                MoleculeDrawer().draw(spec.molecule[0], 'png', fstr)
-            except IndexError:
-                raise OutputError('{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.'.format(getSpeciesIdentifier(spec)))
-    
+        drawings.append((spec, os.path.join(dirname, 'species2', '{0}.png'.format(spec))))
+    drawSpecies(drawings)
 
 
     familyCount1 = {}
@@ -6,9 +6,17 @@ This script runs stand-alone thermo estimation using RMG for a list of species i
 thermo input file.  It generates an output.txt file containing the chemkin format
 thermochemistry as well as a ThermoLibrary file containing the enthalpy, entropy, and
 heat capacity data in RMG-database format.
+
+In batch mode, the species in the input file and in an optional species list file
+are estimated using a pool of worker processes, and the results are written to a
+tab-separated thermo.txt file as they are obtained. A batch that was interrupted
+can be resumed, skipping the species already in the output file.
 """
 
 import os.path
+import re
+import logging
+import itertools
 from rmgpy.rmg.main import RMG
 from rmgpy.data.thermo import ThermoLibrary
 from rmgpy.chemkin import writeThermoEntry
@@ -51,6 +59,162 @@ def runThermoEstimator(inputFile):
 
 ################################################################################
 
+# The temperatures at which heat capacities are written in batch mode, in K
+Tlist = [300, 400, 500, 600, 800, 1000, 1500]
+
+def readSpeciesList(path, labels=None):
+    """
+    Read a list of species from the file at `path` on disk, returning a list
+    of ``(label, format, string)`` tuples, where `format` is ``'SMILES'``,
+    ``'InChI'``, or ``'adjacencyList'``. Species are separated by blank
+    lines, and lines starting with ``#`` are ignored. A species given as one
+    or two words on a single line is a SMILES or InChI string, optionally
+    preceded by a label; otherwise it is an adjacency list, optionally
+    starting with a label line.
+    Species without a label are labeled by their SMILES or InChI string, or
+    by their adjacency list written on one line, so that their labels do not
+    change when species are added to or removed from the list.
+    Species whose label is in the set of `labels` already in use (e.g. by the
+    species in the input file) or repeats that of an earlier species in the
+    list are skipped; the labels of the species read are added to `labels`.
+    """
+    speciesList = []
+    if labels is None:
+        labels = set()
+    with open(path, 'r') as f:
+        blocks = re.split(r'\n\s*\n', '\n'.join([line.rstrip() for line in f if not line.startswith('#')]))
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+        lines = block.splitlines()
+        tokens = lines[0].split()
+        if len(lines) == 1 and len(tokens) <= 2:
+            string = tokens[-1]
+            label = tokens[0]
+            format = 'InChI' if string.startswith('InChI=') else 'SMILES'
+        else:
+            string = block
+            label = lines[0] if len(tokens) == 1 else '; '.join([' '.join(line.split()) for line in lines])
+            format = 'adjacencyList'
+        if label in labels:
+            logging.warning('Skipping species in species list {1} with label "{0}", which is already in use.'.format(label, path))
+            continue
+        labels.add(label)
+        speciesList.append((label, format, string))
+    return speciesList
+
+def readEstimatedLabels(path):
+    """
+    Return the set of labels of the species whose thermo is saved in the
+    batch output file at `path` on disk. A partial row left at the end of the
+    file by an interrupted batch is removed, so that new rows can be appended.
+    """
+    with open(path, 'r+b') as f:
+        content = f.read()
+        f.truncate(content.rfind('\n') + 1)
+    return set([line.split('\t', 1)[0] for line in content.splitlines()[:content.count('\n')] if line and not line.startswith('#')])
+
+# The RMG job used by _estimateThermo(); this is set before the worker
+# processes are started, so that they use the database loaded by the parent
+_rmg = None
+
+def _estimateThermo(args):
+    """
+    Estimate the thermo of a species, where `args` is the tuple
+    ``(label, format, string)`` as returned by :func:`readSpeciesList`.
+    Returns the tuple ``(label, row, error)``, where `row` is the line of
+    the batch output file for the species, or ``None`` if the estimate
+    failed with the given `error` message. Used by
+    :func:`runThermoEstimatorBatch` as the task run by each worker process.
+    """
+    from rmgpy.molecule import Molecule
+    from rmgpy.rmg.model import Species
+    label, format, string = args
+    try:
+        if format == 'SMILES':
+            molecule = Molecule().fromSMILES(string)
+        elif format == 'InChI':
+            molecule = Molecule().fromInChI(string)
+        else:
+            molecule = Molecule().fromAdjacencyList(string)
+        species = Species(label=label, molecule=[molecule])
+        species.generateResonanceIsomers()
+        species.generateThermoData(_rmg.database, quantumMechanics=_rmg.reactionModel.quantumMechanics)
+    except Exception, e:
+        return label, None, '{0}: {1}'.format(e.__class__.__name__, e)
+    thermo = species.thermo
+    values = [thermo.getEnthalpy(298) / 4184., thermo.getEntropy(298) / 4.184]
+    values.extend([thermo.getHeatCapacity(T) / 4.184 for T in Tlist])
+    comment = ' '.join(thermo.comment.split())
+    return label, '{0}\t{1}\t{2}\n'.format(label, '\t'.join(['{0:.2f}'.format(value) for value in values]), comment), None
+
+def runThermoEstimatorBatch(inputFile, speciesFile=None, outputFile=None, processes=1, resume=False):
+    """
+    Estimate thermo for the species in a thermo input file and, if given, in
+    the species list file `speciesFile` (see :func:`readSpeciesList`),
+    loading the database only once. The estimates are distributed over
+    `processes` worker processes and written to the tab-separated file
+    `outputFile` (by default ``thermo.txt`` in the output directory) as they
+    are obtained, along with the source of each estimate. If `resume` is
+    ``True``, the species already in an existing output file are skipped and
+    the new rows are appended to it.
+    """
+    global _rmg
+
+    rmg = RMG()
+    rmg.loadThermoInput(inputFile)
+    if outputFile is None:
+        outputFile = os.path.join(rmg.outputDirectory, 'thermo.txt')
+
+    speciesList = [(species.label, 'adjacencyList', species.molecule[0].toAdjacencyList()) for species in rmg.initialSpecies]
+    if speciesFile is not None:
+        speciesList.extend(readSpeciesList(speciesFile, labels=set([label for label, format, string in speciesList])))
+    
+    if resume and os.path.exists(outputFile):
+        estimated = readEstimatedLabels(outputFile)
+        tasks = [task for task in speciesList if task[0] not in estimated]
+        logging.info('Skipping {0:d} species already in {1}.'.format(len(speciesList) - len(tasks), outputFile))
+        output = open(outputFile, 'ab')
+    else:
+        tasks = speciesList
+        output = open(outputFile, 'wb')
+        output.write('# Label\tH298 (kcal/mol)\tS298 (cal/(mol*K))\t{0}\tComment\n'.format(
+            '\t'.join(['Cp{0:d} (cal/(mol*K))'.format(T) for T in Tlist])))
+    
+    # initialize and load the database as well as any QM settings
+    rmg.loadDatabase(processes=processes)
+    if rmg.quantumMechanics:
+        rmg.quantumMechanics.initialize()
+    _rmg = rmg
+
+    pool = None
+    try:
+        if processes > 1 and len(tasks) > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(processes)
+            results = pool.imap_unordered(_estimateThermo, tasks, chunksize=8)
+        else:
+            results = itertools.imap(_estimateThermo, tasks)
+        count = 0
+        for label, row, error in results:
+            if row is None:
+                logging.error('Unable to estimate thermo for species {0}: {1}'.format(label, error))
+                continue
+            # Flush each row so the batch can be resumed if it is interrupted
+            output.write(row)
+            output.flush()
+            count += 1
+        logging.info('Estimated thermo for {0:d} of {1:d} species.'.format(count, len(tasks)))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        output.close()
+        _rmg = None
+
+################################################################################
+
 if __name__ == '__main__':
 
     import argparse
@@ -58,8 +222,25 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('input', metavar='INPUT', type=str, nargs=1,
         help='Thermo input file')
+    parser.add_argument('-s', '--species', type=str, nargs=1, default=None,
+        metavar='FILE', help='estimate the species listed in FILE in batch mode')
+    parser.add_argument('-o', '--output', type=str, nargs=1, default=None,
+        metavar='FILE', help='write the batch mode results to FILE')
+    parser.add_argument('-n', '--processes', type=int, default=1,
+        metavar='N', help='use N processes in batch mode')
+    parser.add_argument('-r', '--resume', action='store_true',
+        help='skip the species already in the batch mode output file')
     args = parser.parse_args()
     
     inputFile = os.path.abspath(args.input[0])
     
-    runThermoEstimator(inputFile)
\ No newline at end of file
+    if args.species or args.output or args.processes > 1 or args.resume:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        runThermoEstimatorBatch(inputFile,
+            speciesFile = os.path.abspath(args.species[0]) if args.species else None,
+            outputFile = os.path.abspath(args.output[0]) if args.output else None,
+            processes = args.processes,
+            resume = args.resume,
+        )
+    else:
+        runThermoEstimator(inputFile)
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+This module contains unit tests of the batch mode of thermoEstimator.py.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from thermoEstimator import readSpeciesList, readEstimatedLabels
+
+################################################################################
+
+class TestThermoEstimatorBatch(unittest.TestCase):
+    """
+    Contains unit tests of the functions used by the batch mode of
+    thermoEstimator.py.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'species.txt')
+
+    def tearDown(self):
+        """
+        A function run after each unit test in this class.
+        """
+        shutil.rmtree(self.directory)
+
+    def testReadSpeciesList(self):
+        """
+        Test that species lists are read with the right labels and formats.
+        """
+        with open(self.path, 'w') as f:
+            f.write("""# Comment
+CCO
+
+ethane CC
+
+InChI=1S/CH4/h1H4
+
+methyl
+1 C 1 0
+
+1 C 0 0 {2,D}
+2 C 0 0 {1,D}
+
+ethanol OCC
+""")
+        self.assertEqual(readSpeciesList(self.path), [
+            ('CCO', 'SMILES', 'CCO'),
+            ('ethane', 'SMILES', 'CC'),
+            ('InChI=1S/CH4/h1H4', 'InChI', 'InChI=1S/CH4/h1H4'),
+            ('methyl', 'adjacencyList', 'methyl\n1 C 1 0'),
+            ('1 C 0 0 {2,D}; 2 C 0 0 {1,D}', 'adjacencyList', '1 C 0 0 {2,D}\n2 C 0 0 {1,D}'),
+            ('ethanol', 'SMILES', 'OCC'),
+        ])
+
+    def testReadSpeciesListLabels(self):
+        """
+        Test that the labels of unlabeled adjacency lists do not depend on
+        their position, and that species with duplicate labels are skipped.
+        """
+        with open(self.path, 'w') as f:
+            f.write("""1 C 0 0 {2,D}
+2 C 0 0 {1,D}
+
+ethane CC
+
+ethane C=C
+
+methane C
+""")
+        labels = set(['methane'])
+        speciesList = readSpeciesList(self.path, labels)
+        self.assertEqual([label for label, format, string in speciesList], ['1 C 0 0 {2,D}; 2 C 0 0 {1,D}', 'ethane'])
+        self.assertEqual(speciesList[1][2], 'CC')
+        self.assertEqual(labels, set(['methane', 'ethane', '1 C 0 0 {2,D}; 2 C 0 0 {1,D}']))
+
+        with open(self.path, 'w') as f:
+            f.write("""CCO
+
+1 C 0 0 {2,D}
+2 C 0 0 {1,D}
+""")
+        self.assertEqual(readSpeciesList(self.path)[1][0], '1 C 0 0 {2,D}; 2 C 0 0 {1,D}')
+
+    def testReadEstimatedLabels(self):
+        """
+        Test that the labels of the species in a batch output file are read,
+        and that a partial row at the end of the file is removed.
+        """
+        path = os.path.join(self.directory, 'thermo.txt')
+        with open(path, 'w') as f:
+            f.write('# Label\tH298 (kcal/mol)\n')
+            f.write('ethane\t-20.04\tGroup additivity\n')
+            f.write('1 C 0 0 {2,D}; 2 C 0 0 {1,D}\t12.54\tGroup additivity\n')
+            f.write('meth')
+        self.assertEqual(readEstimatedLabels(path), set(['ethane', '1 C 0 0 {2,D}; 2 C 0 0 {1,D}']))
+        with open(path, 'r') as f:
+            self.assertTrue(f.read().endswith('Group additivity\n'))
+        self.assertEqual(readEstimatedLabels(path), set(['ethane', '1 C 0 0 {2,D}; 2 C 0 0 {1,D}']))
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))